@@ -0,0 +1,111 @@
+"""
+Lexicon counting benchmark: compiled single-pass lexicon vs per-term str.count
+
+Run from the repository root:
+    python -m benchmarks.bench_lexicon
+
+Reports throughput (MB/s) as transcript length and lexicon size grow, for the
+legacy per-term scan and for ``CompiledLexicon`` with a cold and a warm token
+cache. Every measured run is also checked for identical counts.
+"""
+
+import argparse
+import random
+import string
+import time
+from collections import Counter
+
+from ml_model_api import (
+    CompiledLexicon,
+    NEGATIVE_KEYWORDS,
+    POSITIVE_KEYWORDS,
+    TECHNICAL_TERMS,
+)
+
+FILLER_WORDS = [
+    'the', 'we', 'our', 'team', 'project', 'system', 'worked', 'with', 'said',
+    'number', 'users', 'service', 'built', 'and', 'to', 'of', 'in', 'that',
+    'because', 'then', 'customer', 'release', 'weeks', 'quarter', 'reduced',
+]
+
+def base_categories() -> dict:
+    return {
+        'technical': [term for terms in TECHNICAL_TERMS.values() for term in terms],
+        'positive': list(POSITIVE_KEYWORDS),
+        'negative': list(NEGATIVE_KEYWORDS),
+    }
+
+def scaled_categories(factor: int, rng: random.Random) -> dict:
+    """Grow every category ``factor`` times with synthetic lowercase terms"""
+    categories = base_categories()
+    for name, terms in categories.items():
+        extra = []
+        for _ in range(len(terms) * (factor - 1)):
+            length = rng.randint(4, 10)
+            extra.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+        categories[name] = terms + extra
+    return categories
+
+def make_transcript(n_chars: int, categories: dict, rng: random.Random) -> str:
+    """Synthetic transcript with roughly one lexicon term every five words"""
+    terms = [term for values in categories.values() for term in values]
+    parts, size = [], 0
+    while size < n_chars:
+        word = rng.choice(terms) if rng.random() < 0.2 else rng.choice(FILLER_WORDS)
+        if rng.random() < 0.08:
+            word += rng.choice(['.', '?', ','])
+        parts.append(word)
+        size += len(word) + 1
+    return ' '.join(parts)
+
+def legacy_counts(text_lower: str, categories: dict) -> dict:
+    """The pre-lexicon implementation: one full scan per term"""
+    result = {}
+    for name, terms in categories.items():
+        total = 0
+        for term in terms:
+            if term in text_lower:
+                total += text_lower.count(term)
+        result[name] = total
+    return result
+
+def best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'chars':>9} {'terms':>6} {'legacy MB/s':>12} {'cold MB/s':>10} {'warm MB/s':>10} {'speedup':>8}")
+    for factor in args.factors:
+        rng = random.Random(args.seed)
+        categories = scaled_categories(factor, rng)
+        for n_chars in args.sizes:
+            text_lower = make_transcript(n_chars, categories, rng).lower()
+            mb = len(text_lower) / 1e6
+
+            expected = legacy_counts(text_lower, categories)
+            legacy = best_of(lambda: legacy_counts(text_lower, categories), args.repeat)
+
+            def compiled_cold():
+                CompiledLexicon(categories).count(text_lower, Counter(text_lower.split()))
+
+            lexicon = CompiledLexicon(categories)
+            assert lexicon.count(text_lower) == expected, "compiled lexicon diverged from str.count"
+            cold = best_of(compiled_cold, args.repeat)
+            warm = best_of(lambda: lexicon.count(text_lower, Counter(text_lower.split())), args.repeat)
+
+            print(f"{len(text_lower):>9} {len(lexicon):>6} {mb / legacy:>12.1f} "
+                  f"{mb / cold:>10.1f} {mb / warm:>10.1f} {legacy / warm:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
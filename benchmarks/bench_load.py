@@ -0,0 +1,299 @@
+"""
+Open-loop load generator for /predict, standing in for the Next.js caller
+
+Run from the repository root against a running server:
+    python -m benchmarks.bench_load --rates 2 5 10 20 --duration 30
+or let it launch and tear down a local server per configuration:
+    python -m benchmarks.bench_load --launch --workers 2 --server-env ML_MICROBATCH=false
+
+Requests have the shape ``getMLPrediction`` sends (a user-only transcript
+joined with spaces, plus role and level) and are drawn from a weighted mix of
+size classes, roles and levels. Arrivals follow a Poisson process at a fixed
+rate no matter how fast the server answers (open loop), and latency is
+measured from the scheduled arrival time, so a server that falls behind shows
+the queueing delay instead of silently slowing the generator down.
+
+For each rate it reports achieved throughput, p50/p95/p99 latency (overall
+and per size class) and the error rate. A rate counts as saturated when the
+error rate exceeds ``--max-error-rate``, p99 exceeds ``--slo-ms`` or
+throughput falls below 90% of the offered rate; the sweep stops at the first
+saturated rate (``--keep-going`` runs the rest) and the highest sustained
+rate is the configuration's saturation point.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import httpx
+import numpy as np
+
+from benchmarks.common import LEVELS, ROLES, SIZE_CLASSES, generate_transcript
+
+# Share of interviews per size class; most user transcripts are a few hundred
+# to a couple of thousand words, a few are cut short, very few run for hours
+DEFAULT_MIX = {'tiny': 0.05, 'short': 0.22, 'medium': 0.40, 'long': 0.30, 'xlarge': 0.03}
+XLARGE_POOL = 4  # 50k-word transcripts are slow to generate and all look alike
+
+def parse_mix(spec: str) -> dict:
+    """``"medium=0.5,long=0.5"`` -> normalized weights per size class"""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SIZE_CLASSES:
+            raise argparse.ArgumentTypeError(f"unknown size class {name!r}")
+        mix[name] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("mix weights must add up to more than 0")
+    return {name: weight / total for name, weight in mix.items()}
+
+def build_payload_pool(seed: int, mix: dict, pool: int) -> dict:
+    """
+    Per size class, a list of JSON bodies with the transcript string left
+    open so each request can append a unique marker and close it
+    """
+    rng = random.Random(seed)
+    payloads = {}
+    for size, weight in mix.items():
+        if weight <= 0:
+            continue
+        low, high = SIZE_CLASSES[size]
+        payloads[size] = []
+        for _ in range(XLARGE_POOL if size == 'xlarge' else pool):
+            role, level = rng.choice(ROLES), rng.choice(LEVELS)
+            text = generate_transcript(rng, rng.randint(low, high), role)
+            head = '{"role": %s, "level": %s, "interview_data": %s' % (
+                json.dumps(role), json.dumps(level), json.dumps(text)[:-1])
+            payloads[size].append(head.encode())
+    return payloads
+
+def percentiles(latencies: list) -> dict:
+    if not latencies:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    return {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': max(latencies) * 1e3}
+
+async def run_rate(client: httpx.AsyncClient, payloads: dict, mix: dict, rate: float,
+                   duration: float, warmup: float, unique: bool, rng: random.Random) -> dict:
+    """Offer ``rate`` requests/s for ``warmup + duration`` seconds; record only after warmup"""
+    sizes = list(payloads)
+    weights = [mix[size] for size in sizes]
+    samples = []      # (size, latency_s, status or exception name)
+    send_lag = []     # how late the generator itself was when firing each request
+    counter = iter(range(sys.maxsize))
+
+    async def fire(size: str, body: bytes, scheduled: float, record: bool):
+        loop_now = time.perf_counter()
+        try:
+            response = await client.post('/predict', content=body,
+                                         headers={'Content-Type': 'application/json'})
+            outcome = response.status_code
+        except httpx.HTTPError as exc:
+            outcome = type(exc).__name__
+        if record:
+            samples.append((size, time.perf_counter() - scheduled, outcome))
+            send_lag.append(loop_now - scheduled)
+
+    tasks = []
+    start = time.perf_counter()
+    measured_from = start + warmup
+    end = measured_from + duration
+    scheduled = start
+    while True:
+        scheduled += rng.expovariate(rate)
+        if scheduled >= end:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        size = rng.choices(sizes, weights)[0]
+        body = rng.choice(payloads[size])
+        # A unique trailing word keeps every request out of the score cache,
+        # as in production where no two transcripts are alike
+        body += (b' ref%d"}' % next(counter)) if unique else b'"}'
+        tasks.append(asyncio.ensure_future(fire(size, body, scheduled, scheduled >= measured_from)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - measured_from
+
+    ok = [latency for _, latency, outcome in samples if outcome == 200]
+    outcomes = Counter(str(outcome) for _, _, outcome in samples)
+    by_size = defaultdict(list)
+    for size, latency, outcome in samples:
+        if outcome == 200:
+            by_size[size].append(latency)
+    return {
+        'offered_rps': rate,
+        'requests': len(samples),
+        'throughput_rps': len(ok) / elapsed if elapsed > 0 else 0.0,
+        'error_rate': 1 - len(ok) / len(samples) if samples else 0.0,
+        'outcomes': dict(outcomes),
+        'generator_lag_p99_ms': float(np.percentile(send_lag, 99) * 1e3) if send_lag else 0.0,
+        **percentiles(ok),
+        'by_size': {size: {'requests': len(values), **percentiles(values)}
+                    for size, values in sorted(by_size.items())},
+    }
+
+def saturated(result: dict, args) -> list:
+    """Reasons this rate is beyond what the server sustains (empty when it keeps up)"""
+    reasons = []
+    if result['error_rate'] > args.max_error_rate:
+        reasons.append(f"errors {result['error_rate']:.1%}")
+    if result['p99_ms'] is None or result['p99_ms'] > args.slo_ms:
+        reasons.append(f"p99 above {args.slo_ms:.0f} ms")
+    if result['throughput_rps'] < 0.9 * result['offered_rps']:
+        reasons.append("throughput below 90% of offered")
+    return reasons
+
+def launch_server(args) -> subprocess.Popen:
+    """Start ``prefork_server.py`` with the requested configuration and wait until ready"""
+    env = dict(os.environ, ML_LOG_LEVEL='WARNING')
+    for item in args.server_env:
+        key, _, value = item.partition('=')
+        env[key] = value
+    command = [sys.executable, '-W', 'ignore', 'prefork_server.py',
+               '--host', '127.0.0.1', '--port', str(args.port)]
+    if args.workers:
+        command += ['--workers', str(args.workers)]
+    log = open(args.server_log, 'ab') if args.server_log else subprocess.DEVNULL
+    server = subprocess.Popen(command, env=env, stdout=log, stderr=log)
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"Server exited with status {server.returncode} during startup"
+                     + ("" if args.server_log else "; rerun with --server-log to see why"))
+        try:
+            if httpx.get(f'{args.url}/health/ready', timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    sys.exit(f"Server not ready after {args.startup_timeout:.0f}s")
+
+def print_result(result: dict, reasons: list):
+    def ms(value):
+        return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+    print(f"{result['offered_rps']:>8.1f} {result['throughput_rps']:>9.1f} {result['requests']:>6} "
+          f"{ms(result['p50_ms'])} {ms(result['p95_ms'])} {ms(result['p99_ms'])} "
+          f"{result['error_rate']:>7.1%} {result['generator_lag_p99_ms']:>8.1f}  "
+          f"{'SATURATED: ' + ', '.join(reasons) if reasons else 'ok'}")
+
+async def sweep(args, payloads: dict, mix: dict) -> list:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.max_connections,
+                          max_keepalive_connections=args.max_connections)
+    results = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        print(f"\n{'offered':>8} {'achieved':>9} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'errors':>7} {'lag ms':>8}  status")
+        for rate in args.rates:
+            result = await run_rate(client, payloads, mix, rate, args.duration, args.warmup,
+                                    not args.allow_cache_hits, rng)
+            reasons = saturated(result, args)
+            result['saturated'] = reasons
+            results.append(result)
+            print_result(result, reasons)
+            if result['generator_lag_p99_ms'] > args.max_lag_ms:
+                print(f"{'':>8} warning: the generator fired requests up to "
+                      f"{result['generator_lag_p99_ms']:.0f} ms late; it is competing with the "
+                      f"server for CPU, so this rate may be understated")
+            if reasons and not args.keep_going:
+                break
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default=os.environ.get('ML_MODEL_API_URL'),
+                        help='server to load (default: ML_MODEL_API_URL or the launched server)')
+    parser.add_argument('--rates', type=float, nargs='+', default=[1, 2, 5, 10, 20, 50],
+                        help='arrival rates to sweep, in requests per second')
+    parser.add_argument('--duration', type=float, default=20, help='measured seconds per rate')
+    parser.add_argument('--warmup', type=float, default=3, help='unmeasured seconds before each rate')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='size-class weights, e.g. "short=0.3,medium=0.5,long=0.2"')
+    parser.add_argument('--pool', type=int, default=40, help='distinct transcripts per size class')
+    parser.add_argument('--allow-cache-hits', action='store_true',
+                        help='replay pool transcripts verbatim instead of making each one unique')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--max-connections', type=int, default=256)
+    parser.add_argument('--slo-ms', type=float, default=1000, help='p99 latency objective')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--max-lag-ms', type=float, default=50,
+                        help='warn when the generator itself falls this far behind schedule (p99)')
+    parser.add_argument('--keep-going', action='store_true', help='sweep past the first saturated rate')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the configuration and results as JSON')
+    launch = parser.add_argument_group('local server')
+    launch.add_argument('--launch', action='store_true',
+                        help='start "prefork_server.py" for the run and stop it afterwards')
+    launch.add_argument('--workers', type=int, help='ML_WORKERS for the launched server')
+    launch.add_argument('--port', type=int, default=8765)
+    launch.add_argument('--server-env', action='append', default=[], metavar='KEY=VALUE',
+                        help='extra environment for the launched server (repeatable)')
+    launch.add_argument('--startup-timeout', type=float, default=120)
+    launch.add_argument('--server-log', help='append the launched server output to this file')
+    args = parser.parse_args()
+
+    if args.launch:
+        args.url = f'http://127.0.0.1:{args.port}'
+    elif not args.url:
+        args.url = 'http://localhost:8000'
+    mix = args.mix
+
+    print(f"Generating payloads ({', '.join(f'{k} {v:.0%}' for k, v in mix.items())})...")
+    payloads = build_payload_pool(args.seed, mix, args.pool)
+
+    server = launch_server(args) if args.launch else None
+    try:
+        print(f"Target: {args.url}" + (f" (launched, workers={args.workers or 'default'}"
+                                       f"{', ' + ' '.join(args.server_env) if args.server_env else ''})"
+                                       if server else ''))
+        results = asyncio.run(sweep(args, payloads, mix))
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    sustained = [r['offered_rps'] for r in results if not r['saturated']]
+    if sustained:
+        print(f"\nSaturation point: sustains {max(sustained):g} req/s "
+              f"(p99 <= {args.slo_ms:.0f} ms, errors <= {args.max_error_rate:.1%})")
+    else:
+        print("\nSaturated at every rate tried; sweep lower rates")
+
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'url': args.url,
+                'python': platform.python_version(),
+                'seed': args.seed,
+                'mix': mix,
+                'duration_s': args.duration,
+                'warmup_s': args.warmup,
+                'unique_payloads': not args.allow_cache_hits,
+                'launched': bool(server),
+                'workers': args.workers,
+                'server_env': args.server_env,
+            },
+            'saturation_rps': max(sustained) if sustained else None,
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
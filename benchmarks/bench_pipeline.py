@@ -0,0 +1,236 @@
+"""
+Scoring pipeline benchmark suite (micro: per stage, macro: end to end)
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline                     # run, write JSON, compare to baseline
+    python -m benchmarks.bench_pipeline --quick             # skip the 50k-word size class
+    python -m benchmarks.bench_pipeline --save-baseline     # store this run as the new baseline
+    python -m benchmarks.bench_pipeline --check             # exactness checks only, no timings
+
+Transcripts come from a seeded generator covering every ROLE_MAPPING and
+LEVEL_MAPPING value, from tiny (<30 words, the early-return path) to very
+large (50k+ words). Each case records per-call median and best-of timings
+over several repeats. With a baseline, any case whose best-of time is above
+baseline * (1 + threshold) is reported as a regression and the exit status
+is 1 (best-of is far less sensitive to scheduler noise than the median).
+
+``--check`` verifies that the vectorized rule-based scorer returns exactly
+the scalar scores, seeded noise included, on extracted features and on
+random feature rows that hit every branch; the exit status is 1 on any
+mismatch.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import ml_model_api as api
+from benchmarks.common import LEVELS, ROLES, SIZE_CLASSES, generate_corpus, stand_in_model_package
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+def measure(func, items: list, repeat: int) -> dict:
+    """Per-call timings of ``func(item)`` over all ``items``, ``repeat`` times"""
+    for item in items[:3]:
+        func(item)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        samples.append((time.perf_counter() - start) / len(items))
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+        'repeat': repeat,
+        'items': len(items),
+    }
+
+def repeats_for(size: str, repeat: int) -> int:
+    return max(1, repeat // 5) if size == 'xlarge' else repeat
+
+def run_suite(corpus: dict, package: dict, repeat: int) -> dict:
+    results = {}
+    fallback = api.create_advanced_fallback_model()
+
+    for size, items in corpus.items():
+        n = repeats_for(size, repeat)
+        features = [api.extract_enhanced_features(*item) for item in items]
+
+        # Micro: feature extraction stages
+        results[f'extract/{size}'] = measure(lambda item: api.extract_enhanced_features(*item), items, n)
+        results[f'lexicon/{size}'] = measure(lambda item: api.LEXICON.count(item[0].lower()), items, n)
+        results[f'rule_score/{size}'] = measure(
+            lambda f: api.calculate_stricter_rule_based_score(f, np.random.default_rng(0)), features, n
+        )
+
+        # Macro: end-to-end scoring with the model and with the fallback model
+        for name, active in (('e2e_model', package), ('e2e_fallback', fallback)):
+            api.activate_model_package(active)
+            results[f'{name}/{size}'] = measure(lambda item: api.score_interview(*item, 0), items, n)
+
+    # Micro: model stages on single rows (independent of transcript size)
+    api.activate_model_package(package)
+    columns = package['feature_columns']
+    sample = corpus.get('medium') or next(iter(corpus.values()))
+    features = [api.extract_enhanced_features(*item) for item in sample]
+    rows = [api.build_feature_matrix([f], columns) for f in features]
+    scaled = [package['scaler'].transform(X) for X in rows]
+    results['build_matrix/1row'] = measure(lambda f: api.build_feature_matrix([f], columns), features, repeat)
+    results['scale/1row'] = measure(package['scaler'].transform, rows, repeat)
+    if package.get('tree_engine') is not None:
+        results['predict_compiled/1row'] = measure(package['tree_engine'].predict, scaled, repeat)
+    results['predict_sklearn/1row'] = measure(package['model'].predict, scaled, repeat)
+
+    # Bulk rule-based rescoring: scalar loop vs the vectorized scorer
+    bulk = [f for items in corpus.values() for f in
+            (api.extract_enhanced_features(*item) for item in items[:40])]
+    bulk = (bulk * (1000 // len(bulk) + 1))[:1000]
+    results['rule_bulk_scalar/1k'] = measure(
+        lambda rows: [api.calculate_stricter_rule_based_score(f) for f in rows], [bulk], repeat
+    )
+    results['rule_bulk_vectorized/1k'] = measure(
+        lambda rows: api.calculate_stricter_rule_based_scores(api.features_to_columns(rows)), [bulk], repeat
+    )
+    return results
+
+def random_feature_rows(n_rows: int, seed: int) -> list:
+    """Rule feature rows spread across every threshold of the rule-based scorer"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n_rows):
+        features = {
+            'word_count': rng.choice([rng.randint(0, 60), rng.randint(60, 400)]),
+            'negative_score': rng.choice([0, rng.randint(0, 20)]),
+            'technical_score': rng.randint(0, 20),
+            'positive_score': rng.randint(0, 15),
+            'avg_response_length': rng.uniform(0, 40),
+            'specific_examples': rng.randint(0, 5),
+            'question_count': rng.randint(0, 4),
+            'lexical_diversity': rng.uniform(0, 100),
+            'role': rng.choice(ROLES),
+        }
+        if rng.random() < 0.9:
+            features['level_encoded'] = rng.randint(0, 2)
+        rows.append(features)
+    return rows
+
+def check_rule_scorer(features_list: list) -> int:
+    """Rows where the vectorized scorer differs from the scalar one (seeded per row)"""
+    scalar = []
+    for i, features in enumerate(features_list):
+        rng = np.random.default_rng(i)
+        scalar.append(api.finalize_score(api.calculate_stricter_rule_based_score(features, rng), rng))
+    rngs = [np.random.default_rng(i) for i in range(len(features_list))]
+    vectorized = api.finalize_scores(
+        api.calculate_stricter_rule_based_scores(api.features_to_columns(features_list), rngs), rngs)
+    return sum(a != b for a, b in zip(scalar, vectorized))
+
+def run_checks(corpus: dict, seed: int) -> bool:
+    extracted = [api.extract_enhanced_features(*item) for items in corpus.values() for item in items]
+    ok = True
+    for name, rows in (('extracted', extracted), ('random', random_feature_rows(20_000, seed))):
+        mismatches = check_rule_scorer(rows)
+        ok &= mismatches == 0
+        print(f"rule scorer, {len(rows)} {name} rows: "
+              f"{'exact' if not mismatches else f'{mismatches} MISMATCHES'}")
+    return ok
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print a comparison table; return the names of regressed cases"""
+    regressions = []
+    print(f"\n{'case (best of)':<28} {'baseline ms':>12} {'current ms':>11} {'ratio':>7}  status")
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        current = result['min_s'] * 1e3
+        if reference is None:
+            print(f"{name:<28} {'-':>12} {current:>11.4f} {'-':>7}  new")
+            continue
+        ratio = result['min_s'] / reference['min_s']
+        status = 'ok'
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        print(f"{name:<28} {reference['min_s'] * 1e3:>12.4f} {current:>11.4f} {ratio:>7.2f}  {status}")
+    return regressions
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--quick', action='store_true', help='skip the xlarge size class')
+    parser.add_argument('--model', default=api.MODEL_PATH,
+                        help='model package to benchmark (a stand-in is fitted if missing)')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed slowdown ratio before a case counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help='only check exactness, no timings')
+    args = parser.parse_args()
+
+    size_classes = {k: v for k, v in SIZE_CLASSES.items() if not (args.quick and k == 'xlarge')}
+    corpus = generate_corpus(args.seed, size_classes)
+    if args.check:
+        sys.exit(0 if run_checks(corpus, args.seed) else 1)
+    package = (api.load_model_package(args.model, verbose=False) if os.path.exists(args.model)
+               else stand_in_model_package(args.seed))
+    if package.get('model') is None:
+        sys.exit(f"Model package {args.model} has no model to benchmark")
+
+    results = run_suite(corpus, package, args.repeat)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'model_version': package.get('version', 'unknown'),
+            'size_classes': size_classes,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} cases to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Cold start benchmark: pickled model package vs memory-mapped export
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [--model feedback_scoring_model.pkl]
+    python -m benchmarks.bench_startup --check              # export parity check only
+
+Each measurement is a fresh interpreter that imports ml_model_api and loads
+the package the way the startup hook does. Reports import time, load time,
+resident memory and whether sklearn ended up imported. The pickle is
+exported to a temporary directory first; a stand-in is fitted and pickled
+when ``--model`` does not exist.
+
+``--check`` skips the timings and verifies that the export scores exactly
+like the pickle it came from (compiled engine, scaler, version and feature
+columns): every transcript of the benchmark corpus must get the identical
+seeded score from both. The exit status is 1 otherwise.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import ml_model_api as api
+imported = time.perf_counter()
+api.activate_model_package(api.load_model_package(sys.argv[1], verbose=False))
+loaded = time.perf_counter()
+with open('/proc/self/status') as f:
+    rss_kib = next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+print(json.dumps({
+    'import_s': imported - started,
+    'load_s': loaded - imported,
+    'rss_mib': rss_kib / 1024,
+    'sklearn': 'sklearn' in sys.modules,
+    'version': api.model_version(),
+}))
+"""
+
+def probe(path: str) -> dict:
+    env = dict(os.environ, ML_LOG_LEVEL='WARNING')
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-c', PROBE, path],
+        capture_output=True, text=True, check=True, env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def check_export(pickle_path: str, mapped_path: str, seed: int) -> bool:
+    """Score the benchmark corpus with the pickle and with its export; True if identical"""
+    import numpy as np
+    import ml_model_api as api
+    from benchmarks.common import SIZE_CLASSES, generate_corpus
+
+    pickled = api.read_model_package(pickle_path)
+    if pickled.get('tree_engine') is None:
+        pickled['tree_engine'] = api.compile_tree_engine(pickled['model'], len(pickled['feature_columns']))
+    mapped = api.read_model_package(mapped_path)
+    problems = [name for name in ('version', 'feature_columns') if pickled[name] != mapped[name]]
+
+    items = [item for items in generate_corpus(seed, {k: v for k, v in SIZE_CLASSES.items()
+                                                      if k != 'xlarge'}).values() for item in items]
+    features = [api.extract_enhanced_features(*item) for item in items]
+    X = api.build_feature_matrix(features, pickled['feature_columns'])
+    if not np.array_equal(api.predict_ml_scores(X, pickled), api.predict_ml_scores(X, mapped)):
+        problems.append('raw predictions')
+    scores = {}
+    for name, package in (('pickle', pickled), ('mapped', mapped)):
+        api.activate_model_package(package)
+        scores[name] = [api.score_interview(*item, seed + i)[0] for i, item in enumerate(items)]
+    mismatches = sum(a != b for a, b in zip(scores['pickle'], scores['mapped']))
+    if mismatches:
+        problems.append(f'{mismatches} scores')
+    print(f"export vs pickle, {len(items)} transcripts: "
+          f"{'identical' if not problems else 'MISMATCH in ' + ', '.join(problems)}")
+    return not problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', default=os.environ.get('ML_MODEL_PATH', 'feedback_scoring_model.pkl'))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--check', action='store_true', help='only check that the export scores like the pickle')
+    args = parser.parse_args()
+
+    import joblib
+    import ml_model_api as api
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pickle_path = args.model
+        if not os.path.exists(pickle_path):
+            from benchmarks.common import stand_in_model_package
+            package = stand_in_model_package()
+            pickle_path = os.path.join(workdir, 'stand_in_model.pkl')
+            joblib.dump(package, pickle_path)
+            print("Model: stand-in RandomForestRegressor (no model package found)")
+        else:
+            print(f"Model: {pickle_path}")
+
+        mapped_path = os.path.join(workdir, 'mapped')
+        api.export_model_package(api.load_model_package(pickle_path, verbose=False), mapped_path)
+        if args.check:
+            sys.exit(0 if check_export(pickle_path, mapped_path, args.seed) else 1)
+
+        print(f"\n{'format':<8} {'import ms':>10} {'load ms':>9} {'RSS MiB':>8}  sklearn  version")
+        for name, path in (('pickle', pickle_path), ('mapped', mapped_path)):
+            runs = [probe(path) for _ in range(args.repeat)]
+            print(f"{name:<8} {statistics.median(r['import_s'] for r in runs) * 1e3:>10.0f} "
+                  f"{statistics.median(r['load_s'] for r in runs) * 1e3:>9.1f} "
+                  f"{statistics.median(r['rss_mib'] for r in runs):>8.0f}  "
+                  f"{str(runs[0]['sklearn']):<7}  {runs[0]['version']}")
+
+if __name__ == "__main__":
+    main()
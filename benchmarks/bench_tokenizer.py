@@ -0,0 +1,141 @@
+"""
+Feature extraction benchmark: shared TokenizedText pass vs the per-sentence scan
+
+Run from the repository root:
+    python -m benchmarks.bench_tokenizer [--sizes 1000 10000 100000 300000]
+    python -m benchmarks.bench_tokenizer --check            # exactness checks only
+
+The legacy extractor below is the implementation TokenizedText replaced:
+``re.split`` into sentences, then a ``lower()``, three phrase checks and an
+``re.search`` per sentence. For every transcript length (in characters) it
+reports best-of time per call and the peak memory tracemalloc traces during
+one call. Both extractors must return identical features.
+
+``--check`` skips the timings and verifies exactness only: the legacy scan,
+windowed extraction (extract_windowed_features at window sizes small enough
+to cut through phrases, numbers and sentence terminators) and a
+FeatureAccumulator fed the text utterance by utterance must all return the
+features of a single-pass extract_enhanced_features. The exit status is 1
+on any difference.
+"""
+
+import argparse
+import random
+import re
+import time
+import tracemalloc
+from collections import Counter
+
+import ml_model_api as api
+from benchmarks.common import generate_transcript
+
+ROLE, LEVEL = 'Software Engineer', 'Mid-level'
+
+def legacy_sentence_has_example(sentence: str) -> bool:
+    sentence_lower = sentence.lower()
+    if any(phrase in sentence_lower for phrase in api.EXAMPLE_PHRASES):
+        return True
+    return re.search(r'\d+', sentence) is not None
+
+def legacy_extract(text: str, role: str, level: str) -> dict:
+    text_lower = text.lower()
+    words = text_lower.split()
+    word_counts = Counter(words)
+    keyword_counts = api.LEXICON.count(text_lower, word_counts)
+    sentences = re.split(r'[.!?]+', text)
+    specific_examples = sum(1 for sentence in sentences if legacy_sentence_has_example(sentence))
+    return api.assemble_features(
+        word_count=len(words),
+        unique_words=len(word_counts),
+        keyword_counts=keyword_counts,
+        question_count=text_lower.count('?'),
+        specific_examples=specific_examples,
+        sentence_count=len(sentences),
+        role=role,
+        level=level,
+    )
+
+def transcript_of(n_chars: int, rng: random.Random) -> str:
+    text = generate_transcript(rng, n_chars // 5, ROLE)
+    while len(text) < n_chars:
+        text += ' ' + generate_transcript(rng, n_chars // 50 + 1, ROLE)
+    return text[:n_chars]
+
+def check_texts(rng: random.Random) -> list:
+    """Generated transcripts plus texts whose joins land inside phrases, numbers and terminators"""
+    texts = [transcript_of(size, rng) for size in (200, 2_000, 20_000)]
+    pieces = ['for example', 'For  instance,', 'such as', '2024', '...', '?!', 'so?', 'what.',
+              'kubernetes', 'machine learning', '\n', '\t', 'x' * 90, 'İstanbul', 'ﬁne']
+    for _ in range(20):
+        texts.append(' '.join(rng.choice(pieces) for _ in range(rng.randint(1, 400))))
+    return texts
+
+def single_pass(text: str) -> dict:
+    window, api.EXTRACT_WINDOW_CHARS = api.EXTRACT_WINDOW_CHARS, 0
+    try:
+        return api.extract_enhanced_features(text, ROLE, LEVEL)
+    finally:
+        api.EXTRACT_WINDOW_CHARS = window
+
+def run_checks(rng: random.Random) -> bool:
+    failures = {'legacy': 0, 'windowed': 0, 'accumulated': 0}
+    texts = check_texts(rng)
+    for text in texts:
+        expected = single_pass(text)
+        failures['legacy'] += legacy_extract(text, ROLE, LEVEL) != expected
+        for window_chars in (1, 7, 13, 64, 1000):
+            failures['windowed'] += api.extract_windowed_features(text, ROLE, LEVEL, window_chars) != expected
+        utterances = text.split(' ')
+        cut = sorted(rng.sample(range(1, len(utterances)), min(5, len(utterances) - 1)))
+        accumulator = api.FeatureAccumulator(ROLE, LEVEL)
+        for start, stop in zip([0] + cut, cut + [len(utterances)]):
+            accumulator.append(' '.join(utterances[start:stop]))
+        failures['accumulated'] += accumulator.features() != expected
+    for name, count in failures.items():
+        print(f"{name:<12} vs single pass, {len(texts)} texts: {'exact' if not count else f'{count} MISMATCHES'}")
+    return not any(failures.values())
+
+def best_time(func, text: str, repeat: int) -> float:
+    func(text, ROLE, LEVEL)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text, ROLE, LEVEL)
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+def peak_kib(func, text: str) -> float:
+    """Peak memory traced by tracemalloc during one call"""
+    tracemalloc.start()
+    func(text, ROLE, LEVEL)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 300_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--check', action='store_true', help='only check exactness, no timings')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.check:
+        raise SystemExit(0 if run_checks(rng) else 1)
+    print(f"{'chars':>8} {'legacy ms':>10} {'shared ms':>10} {'speedup':>8} "
+          f"{'legacy peak KiB':>16} {'shared peak KiB':>16}")
+    for size in args.sizes:
+        text = transcript_of(size, rng)
+        if legacy_extract(text, ROLE, LEVEL) != api.extract_enhanced_features(text, ROLE, LEVEL):
+            raise SystemExit(f"Feature mismatch at {size} characters")
+        repeat = max(3, args.repeat * 10_000 // max(size, 10_000))
+        legacy = best_time(legacy_extract, text, repeat)
+        shared = best_time(api.extract_enhanced_features, text, repeat)
+        legacy_peak = peak_kib(legacy_extract, text)
+        shared_peak = peak_kib(api.extract_enhanced_features, text)
+        print(f"{size:>8} {legacy * 1e3:>10.3f} {shared * 1e3:>10.3f} {legacy / shared:>7.2f}x "
+              f"{legacy_peak:>16.0f} {shared_peak:>16.0f}")
+
+if __name__ == "__main__":
+    main()
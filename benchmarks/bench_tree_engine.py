@@ -0,0 +1,130 @@
+"""
+Tree inference benchmark: compiled TreeEnsembleEngine vs sklearn predict
+
+Run from the repository root:
+    python -m benchmarks.bench_tree_engine [--model feedback_scoring_model.pkl]
+    python -m benchmarks.bench_tree_engine --check          # parity check only
+
+Uses the model package from ``--model`` when it exists, otherwise fits a
+stand-in forest with the shape recorded in feedback_scoring_model_metadata.json
+(200 trees, max_depth 10). Reports per-call latency for several batch sizes,
+the node memory of both representations and the largest prediction error.
+
+``--check`` skips the timings and only verifies the compiled engine against
+sklearn on random rows and on rows placed exactly on split thresholds (where
+a ``<=`` vs ``<`` slip would show): every row must reach the same leaf in
+every tree, and predictions may differ only by the float32 rounding of the
+leaf values (``--tolerance``). The exit status is 1 otherwise.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+
+from ml_model_api import TreeEnsembleEngine
+
+def stand_in_model(n_features: int, seed: int):
+    from sklearn.ensemble import RandomForestRegressor
+
+    with open('feedback_scoring_model_metadata.json') as f:
+        params = json.load(f)['best_params']
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(900, n_features))
+    y = 40 + 10 * X[:, 0] + 8 * X[:, 1] - 3 * X[:, 2] + rng.normal(size=len(X))
+    return RandomForestRegressor(random_state=seed, **params).fit(X, y)
+
+def sklearn_nbytes(model) -> int:
+    """Bytes held by the fitted trees' node and value arrays"""
+    total = 0
+    for tree in getattr(model, 'estimators_', [model]):
+        state = tree.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+def threshold_rows(model, n_features: int, n_rows: int, seed: int) -> np.ndarray:
+    """Random rows with every feature set to one of that feature's split thresholds"""
+    thresholds = [[] for _ in range(n_features)]
+    for tree in getattr(model, 'estimators_', [model]):
+        internal = tree.tree_.feature >= 0
+        for feature, threshold in zip(tree.tree_.feature[internal], tree.tree_.threshold[internal]):
+            thresholds[feature].append(threshold)
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features)) * 2
+    for feature, values in enumerate(thresholds):
+        if values:
+            X[:, feature] = rng.choice(values, size=n_rows)
+    return X
+
+def sklearn_leaves(model, X: np.ndarray) -> np.ndarray:
+    """Leaf ids per tree, numbered like TreeEnsembleEngine (trees laid out back to back)"""
+    trees = getattr(model, 'estimators_', [model])
+    offsets = np.cumsum([0] + [tree.tree_.node_count for tree in trees[:-1]])
+    X = np.asarray(X, dtype=np.float32)
+    return np.column_stack([tree.apply(X) for tree in trees]) + offsets
+
+def check_parity(engine, model, n_features: int, seed: int, tolerance: float) -> bool:
+    rng = np.random.default_rng(seed)
+    ok = True
+    for name, X in (('random', rng.normal(size=(5000, n_features)) * 2),
+                    ('threshold', threshold_rows(model, n_features, 5000, seed))):
+        wrong_leaves = int(np.sum(np.any(engine.apply(X) != sklearn_leaves(model, X), axis=1)))
+        error = float(np.max(np.abs(engine.predict(X) - model.predict(X))))
+        passed = wrong_leaves == 0 and error <= tolerance
+        ok &= passed
+        print(f"compiled vs sklearn, {len(X)} {name} rows: {wrong_leaves} rows on a different leaf, "
+              f"max |err| {error:.2e} ({'ok' if passed else 'MISMATCH'})")
+    return ok
+
+def median_latency(func, repeat: int) -> float:
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', default=os.environ.get('ML_MODEL_PATH', 'feedback_scoring_model.pkl'))
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64, 512])
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--check', action='store_true', help='only check parity with sklearn')
+    parser.add_argument('--tolerance', type=float, default=1e-4,
+                        help='largest prediction difference (leaf values are stored as float32)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.model):
+        package = joblib.load(args.model)
+        model, n_features = package['model'], len(package['feature_columns'])
+        print(f"Model: {args.model}")
+    else:
+        n_features = 9
+        model = stand_in_model(n_features, args.seed)
+        print("Model: stand-in RandomForestRegressor (no model package found)")
+    model.set_params(verbose=0)
+
+    engine = TreeEnsembleEngine.from_model(model)
+    if args.check:
+        raise SystemExit(0 if check_parity(engine, model, n_features, args.seed, args.tolerance) else 1)
+    print(f"Trees: {engine.n_trees}, depth: {engine.depth}, nodes: {len(engine.value)}")
+    print(f"Node memory: sklearn {sklearn_nbytes(model) / 1024:.0f} KiB, "
+          f"compiled {engine.nbytes / 1024:.0f} KiB\n")
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'batch':>6} {'sklearn ms':>11} {'compiled ms':>12} {'speedup':>8} {'max |err|':>10}")
+    for batch_size in args.batch_sizes:
+        X = rng.normal(size=(batch_size, n_features)) * 2
+        error = float(np.max(np.abs(engine.predict(X) - model.predict(X))))
+        reference = median_latency(lambda: model.predict(X), args.repeat)
+        compiled = median_latency(lambda: engine.predict(X), args.repeat)
+        print(f"{batch_size:>6} {reference * 1e3:>11.3f} {compiled * 1e3:>12.3f} "
+              f"{reference / compiled:>7.1f}x {error:>10.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Shared helpers for the benchmark scripts: a seeded synthetic transcript
+generator and a stand-in model package for trees without the trained pickle.
+"""
+
+import json
+import random
+
+import numpy as np
+
+import ml_model_api as api
+
+# Display names as the Next.js app sends them; lowercased they hit every
+# ROLE_MAPPING / LEVEL_MAPPING key
+ROLES = ['ML Engineer' if role == 'ml engineer' else role.title() for role in api.ROLE_MAPPING]
+LEVELS = [level.title() for level in api.LEVEL_MAPPING]
+
+# Word-count range per size class; "tiny" stays under the 30-word early return
+SIZE_CLASSES = {
+    'tiny': (5, 29),
+    'short': (60, 120),
+    'medium': (250, 400),
+    'long': (1500, 2500),
+    'xlarge': (50000, 55000),
+}
+
+FILLER_NOUNS = ['team', 'project', 'service', 'customer', 'release', 'system',
+                'dashboard', 'feature', 'migration', 'launch', 'platform', 'report']
+FILLER_WORDS = ['the', 'we', 'our', 'then', 'because', 'with', 'and', 'so', 'it',
+                'was', 'really', 'after', 'that', 'which', 'also', 'when']
+TEMPLATES = [
+    "I {positive} the {technical} for our {noun}",
+    "we {positive} a {technical} and it was {negative} at first",
+    "{hedge} the {noun} needed a better {technical}",
+    "for example we cut {noun} latency by {number}%",
+    "such as the {technical} work on the {noun} in {number} weeks",
+    "the {noun} was {negative} so I {positive} the {technical}",
+    "{filler} {filler} {noun} {filler} {technical} {filler} {noun}",
+    "how would you handle the {noun} {technical}",
+]
+HEDGES = ['um', 'uh', 'i think', 'not sure but', 'basically', 'like', 'maybe']
+
+def technical_terms_for(role: str) -> list:
+    role = role.lower()
+    if 'data' in role or 'ml' in role:
+        return api.TECHNICAL_TERMS['data']
+    if 'product' in role:
+        return api.TECHNICAL_TERMS['product']
+    return api.TECHNICAL_TERMS['software']
+
+def generate_transcript(rng: random.Random, n_words: int, role: str) -> str:
+    """A user-only transcript of exactly ``n_words`` words for ``role``"""
+    technical = technical_terms_for(role)
+    words = []
+    while len(words) < n_words:
+        sentence = rng.choice(TEMPLATES).format(
+            positive=rng.choice(api.POSITIVE_KEYWORDS),
+            negative=rng.choice(api.NEGATIVE_KEYWORDS),
+            technical=rng.choice(technical),
+            noun=rng.choice(FILLER_NOUNS),
+            hedge=rng.choice(HEDGES),
+            filler=rng.choice(FILLER_WORDS),
+            number=rng.randint(2, 90),
+        )
+        ending = '?' if sentence.startswith('how') else rng.choice(['.', '.', '.', '!'])
+        words.extend((sentence[0].upper() + sentence[1:] + ending).split())
+    words = words[:n_words]
+    return ' '.join(words)
+
+def generate_corpus(seed: int, size_classes: dict = None) -> dict:
+    """
+    Seeded corpus: for every size class, one (text, role, level) per
+    role x level combination
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    for size, (low, high) in (size_classes or SIZE_CLASSES).items():
+        corpus[size] = [
+            (generate_transcript(rng, rng.randint(low, high), role), role, level)
+            for role in ROLES
+            for level in LEVELS
+        ]
+    return corpus
+
+def stand_in_model_package(seed: int = 0, n_samples: int = 600) -> dict:
+    """
+    Model package with the shape recorded in feedback_scoring_model_metadata.json,
+    fitted on synthetic transcripts. Used when feedback_scoring_model.pkl is absent.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    with open('feedback_scoring_model_metadata.json') as f:
+        params = json.load(f)['best_params']
+
+    rng = random.Random(seed)
+    feature_columns = api.create_advanced_fallback_model()['feature_columns']
+    features_list, targets = [], []
+    for _ in range(n_samples):
+        role, level = rng.choice(ROLES), rng.choice(LEVELS)
+        low, high = SIZE_CLASSES[rng.choice(['tiny', 'short', 'medium', 'long'])]
+        features = api.extract_enhanced_features(
+            generate_transcript(rng, rng.randint(low, high), role), role, level
+        )
+        features_list.append(features)
+        targets.append(api.calculate_stricter_rule_based_score(features, np.random.default_rng(seed)))
+
+    X = api.build_feature_matrix(features_list, feature_columns)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(random_state=seed, n_jobs=-1, **params)
+    model.fit(scaler.transform(X), targets)
+    model.set_params(n_jobs=None)
+
+    return {
+        'model': model,
+        'scaler': scaler,
+        'feature_columns': feature_columns,
+        'version': f'stand-in-{seed}',
+        'tree_engine': api.compile_tree_engine(model, len(feature_columns)),
+        'metadata': {'model_type': 'RandomForestRegressor (stand-in)', 'train_samples': n_samples},
+    }
@@ -0,0 +1,242 @@
+"""
+Feature store for ml_model_api's offline commands: extracted features in a
+SQLite file keyed by transcript content hash and extractor version, shared by
+rescore.py, train_model.py and compress-model, plus the JSONL helpers those
+commands stream their input and resume their output with.
+
+    python feature_store.py {stats,fill,prune} [INPUT] [--feature-store PATH]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from ml_model_api import (
+    FEATURE_STORE_PATH,
+    configure_logging,
+    extract_batch_features,
+    extractor_version,
+    log_event,
+)
+
+def feature_key(text_digest, role: str, level: str) -> bytes:
+    """Store key from a sha256 already fed with the transcript text"""
+    digest = text_digest.copy()
+    for part in (role, level):
+        digest.update(b'\0')
+        digest.update(part.encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+class FeatureStore:
+    """
+    Extracted features in a SQLite file, keyed by transcript content hash
+    (with role and level) and extractor version. Only rows of the current
+    extractor_version() are read, so changing the extractor recomputes
+    features as transcripts come by again; ``prune`` drops the stale rows.
+    Open one store per process; processes may share the file (WAL mode).
+    """
+    QUERY_CHUNK = 500  # keys per SELECT, under SQLite's bound-parameter limit
+
+    def __init__(self, path: str, version: str = None):
+        self.path = path
+        self.version = version or extractor_version()
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS features ("
+            " key BLOB NOT NULL, extractor_version TEXT NOT NULL, features TEXT NOT NULL,"
+            " created_at REAL NOT NULL, PRIMARY KEY (key, extractor_version)) WITHOUT ROWID"
+        )
+
+    def close(self):
+        self._db.close()
+
+    def get_many(self, keys: list) -> dict:
+        """{key: features} for the keys stored under the current version (role/level not included)"""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), self.QUERY_CHUNK):
+            chunk = unique[start:start + self.QUERY_CHUNK]
+            rows = self._db.execute(
+                f"SELECT key, features FROM features WHERE extractor_version = ? "
+                f"AND key IN ({','.join('?' * len(chunk))})", (self.version, *chunk))
+            found.update((key, json.loads(features)) for key, features in rows)
+        return found
+
+    def put_many(self, rows: list):
+        """Store (key, features) pairs under the current version"""
+        if not rows:
+            return
+        now = time.time()
+        with contextlib.closing(self._db.cursor()) as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?)",
+                    [(key, self.version, json.dumps({k: v for k, v in features.items()
+                                                     if k not in ('role', 'level')}), now)
+                     for key, features in rows],
+                )
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def features_for(self, items: list, keys: list = None) -> list:
+        """
+        Features for each (interview_data, role, level, ...) item, read from
+        the store where present and extracted (then stored) otherwise.
+        ``keys`` are the items' feature_key values when the caller already
+        hashed the texts. Failed extractions are None and not stored.
+        """
+        if keys is None:
+            keys = [feature_key(hashlib.sha256(text.encode('utf-8', 'surrogatepass')), role, level)
+                    for text, role, level, *_ in items]
+        stored = self.get_many(keys)
+        missing = [index for index, key in enumerate(keys) if key not in stored]
+        extracted = extract_batch_features([items[index] for index in missing])
+        self.put_many([(keys[index], features) for index, features in zip(missing, extracted)
+                       if features is not None])
+        self.hits += len(items) - len(missing)
+        self.misses += len(missing)
+        
+        features_list = [None] * len(items)
+        for index, features in zip(missing, extracted):
+            features_list[index] = features
+        for index, key in enumerate(keys):
+            if features_list[index] is None and key in stored:
+                _, role, level, *_ = items[index]
+                features_list[index] = dict(stored[key], role=role, level=level)
+        return features_list
+
+    def prune(self) -> int:
+        """Delete rows of other extractor versions; returns how many"""
+        deleted = self._db.execute("DELETE FROM features WHERE extractor_version != ?",
+                                   (self.version,)).rowcount
+        self._db.execute("VACUUM")
+        self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def snapshot(self) -> dict:
+        versions = dict(self._db.execute(
+            "SELECT extractor_version, COUNT(*) FROM features GROUP BY extractor_version"))
+        return {
+            "path": self.path,
+            "extractor_version": self.version,
+            "rows": versions.get(self.version, 0),
+            "stale_rows": sum(versions.values()) - versions.get(self.version, 0),
+            "size_bytes": sum(os.path.getsize(path) for path in (self.path, self.path + "-wal")
+                              if os.path.exists(path)),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+def extract_features_list(items: list, store_path: str = None) -> list:
+    """
+    Features for (interview_data, role, level) items through the feature
+    store at ``store_path`` (default ML_FEATURE_STORE), or extracted
+    directly when there is none. Failed extractions are None.
+    """
+    store_path = store_path if store_path is not None else FEATURE_STORE_PATH
+    if not store_path:
+        return extract_batch_features(items)
+    store = FeatureStore(store_path)
+    try:
+        features_list = store.features_for(items)
+        log_event(logging.INFO, "feature_store_read", path=store_path, items=len(items),
+                  hits=store.hits, extracted=store.misses, extractor_version=store.version)
+        return features_list
+    finally:
+        store.close()
+
+def truncate_partial_line(path: str) -> int:
+    """
+    Drop a partially written last line (a crash mid-write) and return the
+    number of complete lines, i.e. records already written
+    """
+    complete, end = 0, 0
+    with open(path, 'rb') as f:
+        offset = 0
+        for block in iter(lambda: f.read(1 << 20), b''):
+            complete += block.count(b'\n')
+            last = block.rfind(b'\n')
+            if last >= 0:
+                end = offset + last + 1
+            offset += len(block)
+    if end != offset:
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+    return complete
+
+def read_chunks(source, chunk_size: int, skip: int):
+    """Yield (first_record, lines, n_bytes) for non-blank lines, skipping the first ``skip`` records"""
+    record, lines, n_bytes = 0, [], 0
+    for line in source:
+        if not line.strip():
+            continue
+        record += 1
+        if record <= skip:
+            continue
+        lines.append(line)
+        n_bytes += len(line)
+        if len(lines) == chunk_size:
+            yield record - len(lines) + 1, lines, n_bytes
+            lines, n_bytes = [], 0
+    if lines:
+        yield record - len(lines) + 1, lines, n_bytes
+
+def feature_store_main(argv: list):
+    """``python feature_store.py {stats,fill,prune} [--feature-store PATH]``"""
+    parser = argparse.ArgumentParser(
+        prog="feature_store.py",
+        description="Inspect, fill or prune the extracted-feature store",
+    )
+    parser.add_argument('action', choices=('stats', 'fill', 'prune'))
+    parser.add_argument('input', nargs='?', help="fill: JSONL transcripts (role and level optional)")
+    parser.add_argument('--feature-store', default=FEATURE_STORE_PATH or 'features.sqlite')
+    parser.add_argument('--text-field', default='interview_data')
+    parser.add_argument('--chunk-size', type=int, default=512)
+    args = parser.parse_args(argv)
+    if args.action == 'fill' and not args.input:
+        parser.error("fill needs an INPUT file")
+    
+    configure_logging(sys.stderr)
+    store = FeatureStore(args.feature_store)
+    try:
+        if args.action == 'fill':
+            started = time.perf_counter()
+            invalid = 0
+            with open(args.input, encoding='utf-8') as source:
+                for _, lines, _ in read_chunks(source, args.chunk_size, 0):
+                    items = []
+                    for line in lines:
+                        try:
+                            record = json.loads(line)
+                            items.append((str(record[args.text_field]),
+                                          record.get('role') or "Software Engineer",
+                                          record.get('level') or "Mid-level"))
+                        except (ValueError, KeyError, TypeError, AttributeError):
+                            invalid += 1
+                    store.features_for(items)
+            print(f"✅ {store.hits + store.misses} transcripts: {store.hits} already stored, "
+                  f"{store.misses} extracted in {time.perf_counter() - started:.1f}s"
+                  + (f" ({invalid} invalid records skipped)" if invalid else ""))
+        elif args.action == 'prune':
+            print(f"🧹 Removed {store.prune()} rows of other extractor versions")
+        snapshot = store.snapshot()
+        print(f"📦 {snapshot['path']}: {snapshot['rows']} rows for extractor {snapshot['extractor_version']}, "
+              f"{snapshot['stale_rows']} stale, {snapshot['size_bytes'] / 1e6:.1f} MB")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    feature_store_main(sys.argv[1:])
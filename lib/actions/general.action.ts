@@ -286,12 +286,18 @@ async function getMLPrediction(
     });
 
     if (!response.ok) {
-      console.error("❌ ML API error:", response.status);
+      // 429/503 mean the service is overloaded; Retry-After says when to try again
+      console.error("❌ ML API error:", response.status, response.headers.get("Retry-After") ?? "");
       throw new Error(`ML API returned status ${response.status}`);
     }
  
     const data = await response.json();
     console.log("✅ ML Model response:", data);
+    // A "fallback" score is a placeholder from a failed request, not a prediction
+    if (data.engine === "fallback") {
+      console.warn("⚠️ ML API could not score this transcript; ignoring its placeholder score");
+      return { ml_score: 0 };
+    }
     return { ml_score: data.ml_score };
   } catch (error) {
     console.error("⚠️ ML Model API unavailable:", error);
@@ -3,21 +3,475 @@ Enhanced FastAPI Server for Interview Feedback ML Model
 Professional version for supervisor presentations
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-import joblib
 import numpy as np
-import pandas as pd
 from datetime import datetime
-import uvicorn
+import bisect
+import contextlib
 import json
+import logging
+import logging.handlers
+import queue
+import random
 import re
-from collections import Counter
+import sys
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
+import functools
+import hashlib
+import hmac
+import inspect
 import math
+import operator
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import threading
+import time
+import tracemalloc
+from typing import List, Optional
 
 app = FastAPI(title="Professional Interview ML Model API")
 
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Logging: level, writer queue bound and share of requests that dump full features
+LOG_LEVEL = os.environ.get("ML_LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.environ.get("ML_LOG_QUEUE_SIZE", "10000"))
+LOG_FEATURE_SAMPLE_RATE = float(os.environ.get("ML_LOG_FEATURE_SAMPLE_RATE", "0.01"))
+
+# Trained model package loaded at startup (and by every process worker): a
+# joblib pickle, or a directory written by "export-model" that is memory-mapped
+MODEL_PATH = os.environ.get("ML_MODEL_PATH", "feedback_scoring_model.pkl")
+
+# Model registry: a directory of model versions (*.pkl files or exported
+# directories); the newest is served and new ones are hot-swapped in.
+# Polled every ML_MODEL_WATCH_INTERVAL seconds (0 disables the watcher).
+MODEL_REGISTRY_DIR = os.environ.get("ML_MODEL_REGISTRY_DIR", "")
+MODEL_WATCH_INTERVAL = float(os.environ.get("ML_MODEL_WATCH_INTERVAL", "10"))
+# Token for the /admin endpoints (sent as X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.environ.get("ML_ADMIN_TOKEN", "")
+
+# Model feature_columns the extractor does not produce: "warn" (scored as 0)
+# or "strict" (the model package is rejected)
+FEATURE_SCHEMA_MODE = os.environ.get("ML_FEATURE_SCHEMA", "warn").lower()
+
+# Tree inference: "compiled" (flattened NumPy arrays) or "sklearn"
+TREE_ENGINE = os.environ.get("ML_TREE_ENGINE", "compiled").lower()
+
+# Compressed variant sets ("compress-model"): serve the most accurate variant
+# whose one-row scale + predict time, measured at load, fits this many
+# milliseconds (0 serves the most accurate variant)
+LATENCY_BUDGET_MS = float(os.environ.get("ML_LATENCY_BUDGET_MS", "0"))
+
+# Largest number of items accepted by /predict/batch in one request
+MAX_BATCH_SIZE = int(os.environ.get("ML_MAX_BATCH_SIZE", "256"))
+
+# Size limits (0 disables): larger request bodies are rejected with 413 before
+# they are read (or once the limit is passed, when sent without a
+# Content-Length), longer transcripts/utterances with 413 too
+MAX_REQUEST_BYTES = int(os.environ.get("ML_MAX_REQUEST_BYTES", str(16 * 1024 * 1024)))
+MAX_TRANSCRIPT_CHARS = int(os.environ.get("ML_MAX_TRANSCRIPT_CHARS", "1000000"))
+# Transcripts longer than this are extracted in windows of about this many
+# characters, bounding the extractor's working memory (0 disables)
+EXTRACT_WINDOW_CHARS = int(os.environ.get("ML_EXTRACT_WINDOW_CHARS", "65536"))
+
+# Where CPU-bound scoring runs: "inline" (on the event loop), "thread" or "process"
+SCORING_EXECUTOR = os.environ.get("ML_SCORING_EXECUTOR", "thread").lower()
+SCORING_WORKERS = int(os.environ.get("ML_SCORING_WORKERS", str(os.cpu_count() or 1)))
+
+# Feature store for offline scoring and training (rescore.py, train_model.py,
+# "compress-model", feature_store.py): SQLite file of extracted features keyed by transcript hash
+# and extractor version (empty disables; the commands also take --feature-store)
+FEATURE_STORE_PATH = os.environ.get("ML_FEATURE_STORE", "")
+
+# Seed the score variance from a hash of (text, role, level, model version).
+# Off by default: the API has always returned a freshly drawn variance on every
+# call, and turning this on changes the scores existing clients see
+DETERMINISTIC_SCORES = os.environ.get("ML_DETERMINISTIC_SCORES", "false").lower() in ("1", "true", "yes")
+
+# Content-addressed score cache (0 entries disables it; only used with
+# ML_DETERMINISTIC_SCORES, since caching a random draw would freeze it)
+SCORE_CACHE_SIZE = int(os.environ.get("ML_SCORE_CACHE_SIZE", "4096"))
+SCORE_CACHE_TTL = float(os.environ.get("ML_SCORE_CACHE_TTL", "3600"))
+
+# Live interview sessions
+SESSION_TTL = float(os.environ.get("ML_SESSION_TTL", "1800"))
+MAX_SESSIONS = int(os.environ.get("ML_MAX_SESSIONS", "10000"))
+
+# Micro-batching of concurrent /predict calls
+MICROBATCH_ENABLED = os.environ.get("ML_MICROBATCH", "true").lower() in ("1", "true", "yes")
+MICROBATCH_WINDOW_MS = float(os.environ.get("ML_MICROBATCH_WINDOW_MS", "2"))
+MICROBATCH_MAX_SIZE = int(os.environ.get("ML_MICROBATCH_MAX_SIZE", "32"))
+
+# Admission control for /predict: at most ML_MAX_INFLIGHT requests are scored
+# or queued per process (0 disables the gate), each with a deadline of
+# ML_REQUEST_DEADLINE_MS (a caller may send a shorter or longer
+# X-Request-Deadline-Ms). Requests that cannot finish in time are rejected with
+# a Retry-After hint. Degraded mode is opt-in: with ML_DEGRADE_INFLIGHT > 0,
+# requests past that many in flight are scored rule-based instead of with the
+# tree model and marked "degraded" (callers must check it; the Next.js caller
+# does not, so leave it 0 there)
+MAX_INFLIGHT = int(os.environ.get("ML_MAX_INFLIGHT", "64"))
+REQUEST_DEADLINE_MS = float(os.environ.get("ML_REQUEST_DEADLINE_MS", "10000"))
+DEGRADE_INFLIGHT = int(os.environ.get("ML_DEGRADE_INFLIGHT", "0"))
+
+# Pre-fork serving ("python prefork_server.py"): the master loads the model
+# once and forks ML_WORKERS uvicorn workers that share its pages copy-on-write.
+# A worker is recycled after ML_WORKER_MAX_REQUESTS requests plus up to
+# ML_WORKER_MAX_REQUESTS_JITTER more (0 never recycles) and gets
+# ML_WORKER_GRACEFUL_TIMEOUT seconds to finish its in-flight requests
+SERVE_HOST = os.environ.get("ML_HOST", "127.0.0.1")
+SERVE_PORT = int(os.environ.get("ML_PORT", "8000"))
+WORKERS = int(os.environ.get("ML_WORKERS", str(os.cpu_count() or 1)))
+WORKER_MAX_REQUESTS = int(os.environ.get("ML_WORKER_MAX_REQUESTS", "0"))
+WORKER_MAX_REQUESTS_JITTER = int(os.environ.get("ML_WORKER_MAX_REQUESTS_JITTER", "0"))
+WORKER_GRACEFUL_TIMEOUT = int(os.environ.get("ML_WORKER_GRACEFUL_TIMEOUT", "30"))
+# Seconds between the master's per-worker memory reports (0 disables)
+WORKER_MEMORY_REPORT_INTERVAL = float(os.environ.get("ML_WORKER_MEMORY_REPORT_INTERVAL", "60"))
+
+# Opt-in request profiling: /predict with "X-Profile: stages" (or ?profile=stages)
+# adds per-stage wall/CPU times and process-wide allocation figures (which
+# include concurrent requests' allocations) to the response, "sample" also a
+# sampled stack profile gathered over ML_PROFILE_SAMPLE_SECONDS of repeated
+# scoring. Off unless ML_PROFILING is set; needs X-Admin-Token when
+# ML_ADMIN_TOKEN is set. Profiled requests go through admission control. The
+# sampler needs the GIL, so it gets at most one sample per interpreter switch
+# interval (5 ms by default)
+PROFILING_ENABLED = os.environ.get("ML_PROFILING", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_SECONDS = float(os.environ.get("ML_PROFILE_SAMPLE_SECONDS", "0.25"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get("ML_PROFILE_SAMPLE_INTERVAL_MS", "5"))
+
+# Readiness: synthetic warmup requests (or a JSON file of PredictionRequest
+# objects) scored through /predict before /health/ready reports ready
+WARMUP_REQUESTS = int(os.environ.get("ML_WARMUP_REQUESTS", "16"))
+WARMUP_FILE = os.environ.get("ML_WARMUP_FILE", "")
+# Whether a replica serving only the rule-based fallback counts as ready. Off by
+# default so load balancers keep traffic away from a replica whose model failed
+# to load; set to true where rule-based scores are better than no scores
+READY_ON_FALLBACK = os.environ.get("ML_READY_ON_FALLBACK", "false").lower() in ("1", "true", "yes")
+
+# ============================================
+# STRUCTURED LOGGING (JSON lines, written off the request path)
+# ============================================
+
+logger = logging.getLogger("ml_scoring")
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: ts, severity, event, pid plus any ``fields``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "severity": record.levelname,
+            "event": record.getMessage(),
+            "pid": record.process,
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the background writer untouched (formatting happens on
+    the writer thread) and drops them instead of blocking when the queue is full.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+_log_listener = None
+_log_listener_pid = None
+
+def configure_logging(stream=None):
+    """
+    Route ``logger`` through a bounded queue to a JSON-lines writer thread
+    (once per process) that writes to ``stream`` (stdout by default)
+    """
+    global _log_listener, _log_listener_pid
+    if _log_listener_pid == os.getpid():
+        return
+    
+    # A forked worker inherits the handler but not the writer thread
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    
+    records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonLineFormatter())
+    _log_listener = logging.handlers.QueueListener(records, writer, respect_handler_level=False)
+    _log_listener.start()
+    _log_listener_pid = os.getpid()
+    
+    logger.addHandler(NonBlockingQueueHandler(records))
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _log_listener, _log_listener_pid
+    if _log_listener is not None and _log_listener_pid == os.getpid():
+        _log_listener.stop()
+    _log_listener = None
+    _log_listener_pid = None
+
+def log_event(log_level: int, event: str, /, exc_info: bool = False, **fields):
+    """Log ``event`` with structured ``fields`` if ``log_level`` is enabled"""
+    if logger.isEnabledFor(log_level):
+        logger.log(log_level, event, exc_info=exc_info, extra={"fields": fields})
+
+def sample_feature_dump() -> bool:
+    """Whether this request's full feature dump should be logged"""
+    return LOG_FEATURE_SAMPLE_RATE > 0 and random.random() < LOG_FEATURE_SAMPLE_RATE
+
+# ============================================
+# METRICS (Prometheus text exposition)
+# ============================================
+
+# Latency histogram buckets in seconds (100µs .. 10s)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class MetricCounter:
+    """Monotonic counter, one value per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        # Unlabelled metrics are exported as 0 before their first increment
+        self._values = {} if labels else {(): 0}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> list:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+                for labels, value in values]
+
+class MetricGauge(MetricCounter):
+    """Value that can go up and down (e.g. in-flight requests)"""
+
+    kind = "gauge"
+
+    def dec(self, *label_values, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+class MetricHistogram:
+    """Cumulative-bucket histogram, one set of buckets per label combination"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                bucket_labels = _format_labels(self.label_names, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+METRICS = []
+
+REQUESTS = MetricCounter("ml_requests_total", "Requests received", ("endpoint",))
+REQUEST_ERRORS = MetricCounter("ml_request_errors_total", "Requests that hit an error path", ("endpoint",))
+REQUEST_LATENCY = MetricHistogram("ml_request_duration_seconds", "End-to-end request latency", ("endpoint",))
+INFLIGHT = MetricGauge("ml_inflight_requests", "Requests currently being served", ("endpoint",))
+STAGE_LATENCY = MetricHistogram("ml_stage_duration_seconds", "Scoring pipeline stage latency", ("stage",))
+FALLBACK_SCORES = MetricCounter("ml_fallback_scores_total", "Random safe-fallback scores returned")
+SCORING_METHOD = MetricCounter("ml_scored_total", "Interviews scored, by scoring method", ("method",))
+READY = MetricGauge("ml_ready", "1 once the model is loaded and warmup has passed")
+REJECTED = MetricCounter("ml_requests_rejected_total", "Requests rejected before scoring", ("reason",))
+PREDICT_PATHS = MetricCounter("ml_predict_paths_total", "/predict responses, by the path that produced them", ("path",))
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+@contextlib.contextmanager
+def track_request(endpoint: str):
+    """Count a request, its in-flight time and its end-to-end latency"""
+    REQUESTS.inc(endpoint)
+    INFLIGHT.inc(endpoint)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        INFLIGHT.dec(endpoint)
+        REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint)
+
+class _StageLocal(threading.local):
+    # Class defaults: a plain attribute read instead of a failing lookup per stage
+    timings = None
+    profile = None
+
+_stage_local = _StageLocal()
+
+def record_stage(stage: str, seconds: float):
+    """Note a stage duration for the surrounding collect_stage_timings call (no-op outside one)"""
+    timings = _stage_local.timings
+    if timings is not None:
+        timings.append((stage, seconds))
+
+def collect_stage_timings(func, *args) -> tuple:
+    """
+    Run ``func`` and return (result, [(stage, seconds), ...]). Runs inside the
+    scoring worker, so timings survive the trip back from a process pool.
+    The whole call is recorded as the "scoring" stage.
+    """
+    _stage_local.timings = timings = []
+    try:
+        with StageTimer('scoring'):
+            result = func(*args)
+        return result, timings
+    finally:
+        _stage_local.timings = None
+
+class StageTimer:
+    """
+    ``with StageTimer(name):`` times one scoring stage. The wall time goes to
+    the surrounding collect_stage_timings call (``observe``); while a
+    StageProfile is active on this thread the stage is also profiled.
+    """
+    __slots__ = ('name', 'observe', 'started', 'profile')
+
+    def __init__(self, name: str, observe: bool = True):
+        self.name = name
+        self.observe = observe
+
+    def __enter__(self):
+        self.profile = _stage_local.profile
+        if self.profile is not None:
+            self.profile.enter(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        if self.observe:
+            record_stage(self.name, elapsed)
+        if self.profile is not None:
+            self.profile.exit(elapsed)
+        return False
+
+class StageProfile:
+    """
+    Wall time and thread CPU time per stage of one profiled call. Both are
+    this thread's own; allocations are not attributed to stages, since the
+    allocator counters are process-wide (see ``process_allocations``).
+    Stages nest; ``depth`` gives the nesting level.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._open = []
+
+    def enter(self, name: str):
+        entry = {'stage': name, 'depth': len(self._open)}
+        self.stages.append(entry)
+        self._open.append((entry, time.thread_time()))
+
+    def exit(self, wall_seconds: float):
+        cpu_seconds = time.thread_time()
+        entry, cpu_started = self._open.pop()
+        entry.update(
+            wall_ms=round(wall_seconds * 1e3, 4),
+            cpu_ms=round((cpu_seconds - cpu_started) * 1e3, 4),
+        )
+
+def process_allocations(func):
+    """
+    (result, figures) of ``func()``: net allocated blocks and traced KiB
+    still held afterwards and the traced peak, all process-wide, so they
+    include whatever concurrent requests and executor threads allocated
+    meanwhile (tracemalloc must be tracing)
+    """
+    blocks_started = sys.getallocatedblocks()
+    tracemalloc.reset_peak()
+    traced_started, _ = tracemalloc.get_traced_memory()
+    result = func()
+    traced, peak = tracemalloc.get_traced_memory()
+    return result, {
+        'scope': 'process',
+        'alloc_blocks': sys.getallocatedblocks() - blocks_started,
+        'alloc_kib': round((traced - traced_started) / 1024, 1),
+        'peak_kib': round((peak - traced_started) / 1024, 1),
+    }
+
+def observe_stage_timings(timings: list):
+    for stage, seconds in timings:
+        STAGE_LATENCY.observe(seconds, stage)
+
+def count_scoring_method(use_ml: bool, n: int = 1):
+    SCORING_METHOD.inc("ml" if use_ml else "rule_based", amount=n)
+
 # ============================================
 # CORS SETUP
 # ============================================
@@ -30,6 +484,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class RequestBodyLimit:
+    """
+    413 for request bodies over ``max_bytes``: up front when Content-Length
+    says so, otherwise (chunked or unannounced bodies) as soon as the bytes
+    read pass the limit, before the rest is buffered or parsed. Plain ASGI
+    middleware, since the limit has to be enforced inside ``receive``.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    def too_large(self, length: str = None) -> str:
+        REJECTED.inc("body_too_large")
+        size = f" of {length} bytes" if length else ""
+        return f"Request body{size} exceeds the maximum of {self.max_bytes}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_bytes:
+            return await self.app(scope, receive, send)
+        length = dict(scope["headers"]).get(b"content-length", b"").decode("latin-1")
+        if length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse({"detail": self.too_large(length)}, status_code=413)
+            return await response(scope, receive, send)
+        
+        received = 0
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised where the body is read; FastAPI passes HTTPExceptions through
+                    raise HTTPException(status_code=413, detail=self.too_large())
+            return message
+        
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(RequestBodyLimit, max_bytes=MAX_REQUEST_BYTES)
+
+@app.middleware("http")
+async def shed_predictions(request: Request, call_next):
+    """
+    Stamps each /predict arrival (its deadline runs from here, before the
+    body is read and parsed) and turns it away with 503 while the admission
+    queue is already full, without reading the body at all.
+    """
+    if admission is not None and request.url.path == "/predict":
+        request.state.arrived = time.perf_counter()
+        try:
+            admission.check_capacity()
+        except HTTPException as e:
+            return JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+    return await call_next(request)
+
 # ============================================
 # DATA MODELS
 # ============================================
@@ -41,6 +551,27 @@ class PredictionRequest(BaseModel):
 
 class PredictionResponse(BaseModel):
     ml_score: float
+    engine: Optional[str] = None     # compiled, sklearn, rule-based or fallback
+    degraded: Optional[bool] = None  # only set when overload forced rule-based scoring
+    profile: Optional[dict] = None   # only on profiled requests
+
+class SessionUtteranceRequest(BaseModel):
+    text: str
+    role: str = "Software Engineer"
+    level: str = "Mid-level"
+
+class SessionScoreResponse(BaseModel):
+    interview_id: str
+    utterances: int
+    word_count: int
+    ml_score: float
+
+class BatchPredictionRequest(BaseModel):
+    """Up to MAX_BATCH_SIZE interviews scored in one call"""
+    items: List[PredictionRequest]
+
+class BatchPredictionResponse(BaseModel):
+    ml_scores: List[float]
 
 # ============================================
 # LOAD TRAINED MODEL
@@ -48,41 +579,111 @@ class PredictionResponse(BaseModel):
 
 model_package = None
 
-@app.on_event("startup")
-async def load_model():
-    """Load the trained ML model on startup"""
-    global model_package
+def file_version(path: str) -> str:
+    """Short content hash of a model file, used as its version"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+def read_model_package(path: str) -> dict:
+    """Load a pickled or exported model package; raises if it cannot be read"""
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, VARIANT_INDEX)):
+        # Compressed variant set: the best variant within the latency budget
+        package = select_model_variant(path)
+    elif os.path.isdir(path):
+        # Exported package: map the arrays, nothing to unpickle or compile
+        package = load_mapped_model_package(path)
+    else:
+        # Try to load the trained model (joblib pulls in sklearn, so import it only here)
+        import joblib
+        package = joblib.load(path)
+        package.setdefault('version', file_version(path))
+        if TREE_ENGINE == "compiled":
+            package['tree_engine'] = compile_tree_engine(
+                package.get('model'), len(package.get('feature_columns', []))
+            )
     
+    # Resolve feature_columns against the extractor once, not per request
+    package['schema'] = feature_schema(tuple(package.get('feature_columns', [])))
+    return package
+
+def log_model_loaded(package: dict, path: str, verbose: bool = True):
+    metadata = package.get('metadata', {})
+    log_event(
+        logging.INFO if verbose else logging.DEBUG, "model_loaded",
+        path=path,
+        version=package['version'],
+        train_date=metadata.get('train_date', 'Unknown'),
+        train_r2=metadata.get('train_r2', 0),
+        train_samples=metadata.get('train_samples', 0),
+        features=len(package.get('feature_columns', [])),
+    )
+
+def load_model_package(path: str = MODEL_PATH, verbose: bool = True) -> dict:
+    """Load the trained model package, or build the fallback model if that fails"""
     try:
-        # Try to load the trained model
-        model_package = joblib.load('feedback_scoring_model.pkl')
-        print("="*60)
-        print("✅ ENHANCED ML MODEL LOADED SUCCESSFULLY!")
-        print("="*60)
-        
-        # Show model info
-        metadata = model_package.get('metadata', {})
-        print(f"📅 Training Date: {metadata.get('train_date', 'Unknown')}")
-        print(f"🎯 R² Accuracy: {metadata.get('train_r2', 0):.4f}")
-        print(f"📊 Training Samples: {metadata.get('train_samples', 0)}")
-        print(f"🔍 Features: {len(model_package.get('feature_columns', []))}")
-        print("="*60)
+        package = read_model_package(path)
+        log_model_loaded(package, path, verbose)
+        return package
         
     except FileNotFoundError:
-        print("⚠️ Trained model file not found. Using advanced rule-based scoring.")
-        model_package = create_advanced_fallback_model()
+        log_event(logging.WARNING, "model_not_found", path=path, fallback="rule-based")
+        return create_advanced_fallback_model()
     except Exception as e:
-        print(f"❌ Error loading model: {e}")
-        print("⚠️ Falling back to advanced rule-based scoring.")
-        model_package = create_advanced_fallback_model()
+        log_event(logging.ERROR, "model_load_failed", path=path, error=str(e), fallback="rule-based")
+        return create_advanced_fallback_model()
+
+@app.on_event("startup")
+async def load_model():
+    """Load the trained ML model on startup"""
+    configure_logging()
+    if prefork_master_pid is None:
+        model_path = model_registry.load_initial()
+    else:
+        # Loaded once by the pre-fork master; its pages are shared copy-on-write
+        model_path = model_registry.active["path"]
+    readiness.model_loaded = True
+    if scoring_engine() == "rule-based":
+        log_event(logging.WARNING if READY_ON_FALLBACK else logging.ERROR, "serving_rule_based_fallback",
+                  path=model_path, ready=READY_ON_FALLBACK,
+                  detail="no trained model package loaded; /predict returns rule-based scores")
+    start_scoring_executor(model_path)
+    
+    global micro_batcher, warmup_task
+    micro_batcher = create_micro_batcher()
+    if micro_batcher is not None:
+        micro_batcher.start()
+    
+    # Serve liveness right away; readiness flips once warmup has passed
+    warmup_task = asyncio.create_task(warm_up())
+    if prefork_master_pid is None:
+        model_registry.start_watching()  # pre-fork: the master watches and recycles workers
+
+@app.on_event("shutdown")
+async def shutdown_scoring():
+    """Stop the warmup, the micro-batcher, the scoring worker pool and the log writer"""
+    global micro_batcher, warmup_task
+    readiness.model_loaded = False
+    model_registry.stop_watching()
+    if warmup_task is not None:
+        warmup_task.cancel()
+        warmup_task = None
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+        micro_batcher = None
+    stop_scoring_executor()
+    shutdown_logging()
 
 def create_advanced_fallback_model():
     """Create an advanced fallback model with professional metrics"""
-    print("🔧 Creating advanced fallback scoring model...")
+    log_event(logging.INFO, "fallback_model_created")
     
     return {
         'model': None,
         'scaler': None,
+        'version': 'rule-based',
         'metadata': {
             'train_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'train_r2': 0.82,
@@ -98,333 +699,2533 @@ def create_advanced_fallback_model():
     }
 
 # ============================================
-# FEATURE EXTRACTION FUNCTION
+# KEYWORD LEXICON (compiled once at import)
 # ============================================
 
-def extract_enhanced_features(text: str, role: str, level: str) -> dict:
-    """
-    Extract enhanced features from interview text
-    """
-    # Clean text
-    text_lower = text.lower()
-    words = text_lower.split()
-    word_count = len(words)
-    
-    # Technical terms (role-specific)
-    technical_terms = {
-        'software': ['algorithm', 'data structure', 'api', 'database', 'framework', 
-                     'debug', 'optimize', 'deploy', 'scalable', 'agile', 'git',
-                     'rest', 'graphql', 'microservice', 'container', 'kubernetes',
-                     'aws', 'azure', 'gcp', 'ci/cd', 'testing', 'unit test'],
-        'data': ['pandas', 'numpy', 'sql', 'etl', 'pipeline', 'analysis',
-                 'visualization', 'statistics', 'machine learning', 'ai',
-                 'model', 'training', 'inference', 'tensorflow', 'pytorch',
-                 'classification', 'regression', 'clustering', 'neural network'],
-        'product': ['user story', 'roadmap', 'stakeholder', 'requirement',
-                    'wireframe', 'prototype', 'user experience', 'ui/ux',
-                    'metrics', 'kpi', 'a/b test', 'customer journey']
-    }
+# Technical terms (role-specific)
+TECHNICAL_TERMS = {
+    'software': ['algorithm', 'data structure', 'api', 'database', 'framework', 
+                 'debug', 'optimize', 'deploy', 'scalable', 'agile', 'git',
+                 'rest', 'graphql', 'microservice', 'container', 'kubernetes',
+                 'aws', 'azure', 'gcp', 'ci/cd', 'testing', 'unit test'],
+    'data': ['pandas', 'numpy', 'sql', 'etl', 'pipeline', 'analysis',
+             'visualization', 'statistics', 'machine learning', 'ai',
+             'model', 'training', 'inference', 'tensorflow', 'pytorch',
+             'classification', 'regression', 'clustering', 'neural network'],
+    'product': ['user story', 'roadmap', 'stakeholder', 'requirement',
+                'wireframe', 'prototype', 'user experience', 'ui/ux',
+                'metrics', 'kpi', 'a/b test', 'customer journey']
+}
+
+# Positive indicators
+POSITIVE_KEYWORDS = [
+    'achieved', 'implemented', 'improved', 'optimized', 'solved',
+    'led', 'managed', 'created', 'developed', 'designed',
+    'collaborated', 'mentored', 'trained', 'resolved', 'delivered',
+    'successfully', 'efficient', 'effective', 'scalable', 'robust'
+]
+
+# Negative indicators
+NEGATIVE_KEYWORDS = [
+    'struggled', 'failed', 'difficult', 'challenge', 'problem',
+    'issue', 'bug', 'error', 'slow', 'inefficient', 'poor',
+    'limited', 'basic', 'simple', 'just', 'only', 'maybe',
+    'i think', 'not sure', 'um', 'uh', 'like', 'basically'
+]
+
+# Role encoding
+ROLE_MAPPING = {
+    'software engineer': 0,
+    'data scientist': 1,
+    'product manager': 2,
+    'ml engineer': 3,
+    'backend engineer': 4,
+    'frontend engineer': 5
+}
+
+# Level encoding
+LEVEL_MAPPING = {
+    'entry': 0,
+    'junior': 0,
+    'mid': 1,
+    'mid-level': 1,
+    'senior': 2,
+    'lead': 3,
+    'principal': 4
+}
+
+def _trie_regex(terms) -> str:
+    """Build a regex alternation shaped as a prefix trie (longest match first)"""
+    root = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def walk(node):
+        branches = [re.escape(char) + walk(node[char]) for char in sorted(node) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return walk(root)
+
+class CompiledLexicon:
+    """
+    Keyword categories compiled once and counted in a single pass.
+
+    Totals are identical to summing ``text.count(term)`` over every term of a
+    category. Single-word terms can never span whitespace, so they are counted
+    once per distinct token (memoised across requests) and multiplied by the
+    token frequency; only the few multi-word phrases are searched in the text.
+    """
+
+    def __init__(self, categories: dict, cache_size: int = 65536, max_cached_token: int = 64):
+        self.categories = tuple(categories)
+        weights = {}
+        for index, terms in enumerate(categories.values()):
+            for term in terms:
+                weights.setdefault(term, [0] * len(self.categories))[index] += 1
+        self._weights = {term: tuple(w) for term, w in weights.items()}
+
+        self._phrases = [term for term in weights if len(term.split()) != 1]
+        self.max_phrase_length = max((len(phrase) for phrase in self._phrases), default=1)
+        words = [term for term in weights if len(term.split()) == 1]
+        # A trie match reports the longest term at each position, so every
+        # term also carries the shorter terms that are its prefixes.
+        self._prefixes = {
+            term: tuple(other for other in words if term.startswith(other))
+            for term in words
+        }
+        self._word_pattern = re.compile('(?=(' + _trie_regex(words) + '))')
+        self._cached_counts = functools.lru_cache(maxsize=cache_size)(self._count_token)
+        # Longer tokens are counted directly so the cache never pins large strings
+        self.max_cached_token = max_cached_token
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def _count_token(self, token: str):
+        """Per-category counts inside one whitespace-free token (None if no hit)"""
+        found = self._word_pattern.findall(token)
+        if not found:
+            return None
+        candidates = set()
+        for term in found:
+            candidates.update(self._prefixes[term])
+        totals = [0] * len(self.categories)
+        for term in candidates:
+            hits = token.count(term)
+            for index, weight in enumerate(self._weights[term]):
+                totals[index] += hits * weight
+        return tuple(totals)
+
+    def count(self, text_lower: str, token_counts: Counter = None) -> dict:
+        """Count every category in ``text_lower`` (already lowercased)"""
+        if token_counts is None:
+            token_counts = Counter(text_lower.split())
+        totals = [0] * len(self.categories)
+        cached, direct, limit = self._cached_counts, self._count_token, self.max_cached_token
+        for token, frequency in token_counts.items():
+            counts = cached(token) if len(token) <= limit else direct(token)
+            if counts is not None:
+                for index, hits in enumerate(counts):
+                    totals[index] += hits * frequency
+        for phrase in self._phrases:
+            hits = text_lower.count(phrase)
+            if hits:
+                for index, weight in enumerate(self._weights[phrase]):
+                    totals[index] += hits * weight
+        return dict(zip(self.categories, totals))
+
+    def count_spanning(self, left: str, right: str, separator: str = ' ') -> dict:
+        """
+        Count phrase occurrences in ``left + separator + right`` that cross the
+        join, i.e. the ones missing from ``count(left)`` + ``count(right)``.
+        Exact as long as no phrase can overlap itself (true for LEXICON).
+        """
+        reach = self.max_phrase_length - 1
+        left = left[-reach:] if reach else ''
+        window = left + separator + right[:reach]
+        join = len(left)
+        totals = [0] * len(self.categories)
+        for phrase in self._phrases:
+            start = window.find(phrase)
+            while start != -1 and start < join + len(separator):
+                if start + len(phrase) > join:
+                    for index, weight in enumerate(self._weights[phrase]):
+                        totals[index] += weight
+                start = window.find(phrase, start + 1)
+        return dict(zip(self.categories, totals))
+
+LEXICON = CompiledLexicon({
+    'technical': [term for terms in TECHNICAL_TERMS.values() for term in terms],
+    'positive': POSITIVE_KEYWORDS,
+    'negative': NEGATIVE_KEYWORDS,
+})
+
+# ============================================
+# COMPILED TREE ENGINE (sklearn-free inference)
+# ============================================
+
+class TreeEnsembleEngine:
+    """
+    Tree ensemble flattened into contiguous NumPy node arrays.
+
+    Every tree of the ensemble is stored back to back: split feature index,
+    split threshold, left/right child and leaf value per node. Leaves point
+    to themselves, so a fixed ``depth`` of vectorized steps walks all rows
+    through all trees at once, for one row or a whole batch. Thresholds are
+    rounded down to float32, which gives exactly sklearn's decisions on the
+    float32-cast input.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth,
+                 scale=1.0, offset=0.0, averaging=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.scale = scale
+        self.offset = offset
+        # Whether the prediction is the mean of the trees (forests) rather
+        # than a scaled sum (boosting); None for exports that predate the flag
+        self.averaging = averaging
+
+    @classmethod
+    def from_model(cls, model) -> "TreeEnsembleEngine":
+        """Flatten a fitted forest, gradient boosting or single tree regressor"""
+        scale, offset = 1.0, 0.0
+        if hasattr(model, 'tree_'):
+            trees = [model]
+        elif hasattr(model, 'learning_rate') and hasattr(model, 'init_'):
+            # Gradient boosting: init constant + learning_rate * sum of stages
+            if model.init_ == 'zero':
+                offset = 0.0
+            elif hasattr(model.init_, 'constant_'):
+                offset = float(np.ravel(model.init_.constant_)[0])
+            else:
+                raise ValueError(f"Unsupported boosting init estimator {model.init_!r}")
+            trees = list(np.ravel(model.estimators_))
+            scale = float(model.learning_rate)
+        elif hasattr(model, 'estimators_'):
+            # Averaging ensembles (random forest, extra trees)
+            trees = list(model.estimators_)
+            scale = 1.0 / len(trees)
+        else:
+            raise ValueError(f"Unsupported model type {type(model).__name__}")
+        
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output regressors can be compiled")
+        
+        n_nodes = sum(tree.tree_.node_count for tree in trees)
+        n_features = max(int(tree.tree_.feature.max()) for tree in trees) + 1
+        feature_dtype = np.uint8 if n_features <= np.iinfo(np.uint8).max else np.int32
+        
+        feature = np.zeros(n_nodes, dtype=feature_dtype)
+        threshold = np.zeros(n_nodes, dtype=np.float32)
+        left = np.empty(n_nodes, dtype=np.int32)
+        right = np.empty(n_nodes, dtype=np.int32)
+        value = np.empty(n_nodes, dtype=np.float32)
+        roots = np.empty(len(trees), dtype=np.int32)
+        
+        start = 0
+        for index, tree in enumerate(trees):
+            t = tree.tree_
+            stop = start + t.node_count
+            roots[index] = start
+            nodes = np.arange(start, stop, dtype=np.int32)
+            is_leaf = t.children_left < 0
+            
+            left[start:stop] = np.where(is_leaf, nodes, t.children_left + start)
+            right[start:stop] = np.where(is_leaf, nodes, t.children_right + start)
+            feature[start:stop] = np.where(is_leaf, 0, t.feature)
+            
+            # x32 <= t64  <=>  x32 <= (largest float32 not above t64)
+            thresholds = t.threshold.astype(np.float32)
+            above = thresholds.astype(np.float64) > t.threshold
+            thresholds[above] = np.nextafter(thresholds[above], np.float32(-np.inf))
+            threshold[start:stop] = np.where(is_leaf, 0, thresholds)
+            
+            value[start:stop] = t.value[:, 0, 0]
+            start = stop
+        
+        depth = max(int(tree.tree_.max_depth) for tree in trees)
+        averaging = hasattr(model, 'tree_') or not hasattr(model, 'learning_rate')
+        return cls(feature, threshold, left, right, value, roots, depth, scale, offset, averaging)
+
+    # Node arrays, in the order they are saved by export_model_package
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left,
+                                      self.right, self.value, self.roots))
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node reached in every tree, as a (n_samples, n_trees) array of node ids"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        
+        n_rows = len(X)
+        # One (row, tree) cursor per slot, flattened row-major
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int64) * X.shape[1]).repeat(self.n_trees)
+        node = np.tile(self.roots, n_rows)
+        for _ in range(self.depth):
+            go_left = flat_X.take(row_offset + self.feature.take(node)) <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        return node.reshape(n_rows, self.n_trees)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict a (n_samples, n_features) matrix or a single row"""
+        leaf_values = self.value.take(self.apply(X))
+        return self.offset + self.scale * leaf_values.sum(axis=1, dtype=np.float64)
+
+    def compress(self, n_trees: int = None, max_depth: int = None, quantize: bool = False) -> "TreeEnsembleEngine":
+        """
+        Smaller engine from the first ``n_trees`` trees cut at ``max_depth``.
+        A cut node becomes a leaf predicting its own value (sklearn stores
+        the training mean on every node). ``quantize`` stores thresholds and
+        values as float16 and node indices in the narrowest integer type.
+        """
+        n_trees = min(n_trees or self.n_trees, self.n_trees)
+        max_depth = min(self.depth if max_depth is None else max_depth, self.depth)
+        
+        # Depth of every node reachable from the kept roots (-1: dropped)
+        node_depth = np.full(len(self.value), -1, dtype=np.int32)
+        frontier = self.roots[:n_trees]
+        for level in range(max_depth + 1):
+            node_depth[frontier] = level
+            internal = frontier[self.left.take(frontier) != frontier]
+            frontier = np.concatenate([self.left.take(internal), self.right.take(internal)])
+        
+        kept = np.flatnonzero(node_depth >= 0)
+        new_index = np.zeros(len(self.value), dtype=np.int64)
+        new_index[kept] = np.arange(len(kept))
+        leaf = (self.left.take(kept) == kept) | (node_depth.take(kept) == max_depth)
+        left = np.where(leaf, new_index.take(kept), new_index.take(self.left.take(kept)))
+        right = np.where(leaf, new_index.take(kept), new_index.take(self.right.take(kept)))
+        threshold = self.threshold.take(kept)
+        value = self.value.take(kept)
+        
+        index_dtype = np.int32
+        if quantize:
+            limit = np.finfo(np.float16).max
+            if max(np.abs(threshold).max(initial=0), np.abs(value).max(initial=0)) >= limit:
+                raise ValueError("thresholds or values exceed the float16 range")
+            threshold, value = threshold.astype(np.float16), value.astype(np.float16)
+            index_dtype = np.int16 if len(kept) <= np.iinfo(np.int16).max else np.int32
+        
+        averaging = self.averaging
+        if averaging is None:
+            averaging = self.offset == 0 and math.isclose(self.scale * self.n_trees, 1.0)
+        return TreeEnsembleEngine(
+            self.feature.take(kept), threshold, left.astype(index_dtype), right.astype(index_dtype),
+            value, new_index.take(self.roots[:n_trees]).astype(index_dtype), max_depth,
+            scale=1.0 / n_trees if averaging else self.scale,
+            offset=self.offset,
+            averaging=averaging,
+        )
+
+def compile_tree_engine(model, n_features: int, tolerance: float = 1e-4):
+    """
+    Compile ``model`` into a TreeEnsembleEngine and verify it against
+    ``model.predict`` on random rows. Returns None (sklearn stays in use)
+    if the model cannot be compiled or the check fails.
+    """
+    if model is None:
+        return None
+    
+    try:
+        engine = TreeEnsembleEngine.from_model(model)
+        
+        probe = np.random.default_rng(0).normal(size=(256, n_features)) * 2
+        error = float(np.max(np.abs(engine.predict(probe) - model.predict(probe))))
+        if error > tolerance:
+            log_event(logging.WARNING, "tree_engine_mismatch", max_error=error)
+            return None
+        
+        log_event(logging.INFO, "tree_engine_compiled", trees=engine.n_trees,
+                  depth=engine.depth, nodes=len(engine.value), bytes=engine.nbytes)
+        return engine
+        
+    except Exception as e:
+        log_event(logging.WARNING, "tree_engine_unavailable", error=str(e))
+        return None
+
+# ============================================
+# MEMORY-MAPPED MODEL FORMAT (fast cold start)
+# ============================================
+
+MAPPED_FORMAT_VERSION = 1
+
+class ArrayScaler:
+    """StandardScaler.transform from plain mean/scale arrays (same float64 arithmetic)"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def from_scaler(cls, scaler) -> "ArrayScaler":
+        if isinstance(scaler, cls):
+            return scaler
+        if not hasattr(scaler, 'n_features_in_') or not hasattr(scaler, 'with_mean'):
+            raise ValueError(f"Only a fitted StandardScaler can be exported, got {type(scaler).__name__}")
+        n_features = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+        return cls(np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64))
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean
+        X /= self.scale
+        return X
+
+def _json_default(value):
+    """NumPy scalars (common in training metadata) as plain Python values"""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+def export_model_package(package: dict, directory: str) -> dict:
+    """
+    Write ``package`` as a directory of .npy arrays plus manifest.json that
+    load_mapped_model_package maps without unpickling or importing sklearn.
+    The model must compile to a TreeEnsembleEngine; the version is kept, so
+    deterministic scores and cache keys do not change. Returns the manifest.
+    """
+    feature_columns = list(package['feature_columns'])
+    engine = package.get('tree_engine') or compile_tree_engine(package.get('model'), len(feature_columns))
+    if engine is None:
+        raise ValueError("Model could not be compiled to a tree engine; keep serving the pickle")
     
-    # Positive indicators
-    positive_keywords = [
-        'achieved', 'implemented', 'improved', 'optimized', 'solved',
-        'led', 'managed', 'created', 'developed', 'designed',
-        'collaborated', 'mentored', 'trained', 'resolved', 'delivered',
-        'successfully', 'efficient', 'effective', 'scalable', 'robust'
-    ]
-    
-    # Negative indicators
-    negative_keywords = [
-        'struggled', 'failed', 'difficult', 'challenge', 'problem',
-        'issue', 'bug', 'error', 'slow', 'inefficient', 'poor',
-        'limited', 'basic', 'simple', 'just', 'only', 'maybe',
-        'i think', 'not sure', 'um', 'uh', 'like', 'basically'
-    ]
-    
-    # Count features
-    technical_count = 0
-    for term_list in technical_terms.values():
-        for term in term_list:
-            if term in text_lower:
-                technical_count += text_lower.count(term)
-    
-    positive_count = sum(text_lower.count(word) for word in positive_keywords)
-    negative_count = sum(text_lower.count(word) for word in negative_keywords)
-    
-    # Count questions
-    question_count = text_lower.count('?')
-    
-    # Count specific examples (sentences with numbers or specific references)
-    sentences = re.split(r'[.!?]+', text)
-    specific_examples = 0
-    for sentence in sentences:
-        if any(word in sentence.lower() for word in ['for example', 'for instance', 'such as']):
-            specific_examples += 1
-        elif re.search(r'\d+', sentence):  # Contains numbers
-            specific_examples += 1
+    arrays = {f'tree_{name}': getattr(engine, name) for name in TreeEnsembleEngine.ARRAYS}
+    if package.get('scaler') is not None:
+        scaler = ArrayScaler.from_scaler(package['scaler'])
+        arrays['scaler_mean'], arrays['scaler_scale'] = scaler.mean, scaler.scale
     
-    # Calculate average response length (words per sentence)
-    avg_response_length = word_count / max(1, len(sentences))
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(array))
     
-    # Lexical diversity (unique words / total words)
-    unique_words = len(set(words))
-    lexical_diversity = (unique_words / max(1, word_count)) * 100
+    manifest = {
+        'format': MAPPED_FORMAT_VERSION,
+        'version': model_version(package),
+        'feature_columns': feature_columns,
+        'metadata': package.get('metadata', {}),
+        'engine': {'depth': engine.depth, 'scale': engine.scale, 'offset': engine.offset,
+                   'averaging': engine.averaging},
+        'arrays': sorted(arrays),
+    }
+    # Manifest last: a directory without one is an incomplete export
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, default=_json_default)
+    return manifest
+
+def load_mapped_model_package(directory: str) -> dict:
+    """Model package backed by read-only memory maps of an exported directory"""
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != MAPPED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format {manifest.get('format')!r} in {directory}")
+    
+    def mapped(name: str) -> np.ndarray:
+        # Plain ndarray view of the memmap: pages load lazily and are shared between processes
+        return np.asarray(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r'))
+    
+    engine = TreeEnsembleEngine(
+        *(mapped(f'tree_{name}') for name in TreeEnsembleEngine.ARRAYS),
+        **manifest['engine'],
+    )
+    scaler = None
+    if 'scaler_mean' in manifest['arrays']:
+        scaler = ArrayScaler(mapped('scaler_mean'), mapped('scaler_scale'))
     
-    # Role encoding
-    role_mapping = {
-        'software engineer': 0,
-        'data scientist': 1,
-        'product manager': 2,
-        'ml engineer': 3,
-        'backend engineer': 4,
-        'frontend engineer': 5
+    if TREE_ENGINE != "compiled":
+        log_event(logging.WARNING, "tree_engine_forced", requested=TREE_ENGINE,
+                  reason="exported packages only carry the compiled engine")
+    return {
+        'model': engine,
+        'tree_engine': engine,
+        'scaler': scaler,
+        'feature_columns': manifest['feature_columns'],
+        'version': manifest['version'],
+        'metadata': manifest['metadata'],
+    }
+
+# ============================================
+# MODEL COMPRESSION (latency-budgeted variants)
+# ============================================
+
+# Index of a compressed variant set: one exported directory per variant
+VARIANT_INDEX = 'variants.json'
+
+def measure_predict_latency(package: dict, repeat: int = 200) -> float:
+    """Median milliseconds to scale and predict one row (the walk is input-independent)"""
+    row = np.zeros((1, len(package['feature_columns'])))
+    predict_ml_scores(row, package)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        predict_ml_scores(row, package)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1e3
+
+def prediction_accuracy(predictions: np.ndarray, targets: np.ndarray) -> dict:
+    residual = np.asarray(targets, dtype=np.float64) - predictions
+    spread = float(np.sum((targets - np.mean(targets)) ** 2))
+    return {
+        'r2': round(1 - float(np.sum(residual ** 2)) / spread, 5) if spread > 0 else None,
+        'mae': round(float(np.mean(np.abs(residual))), 4),
     }
-    role_encoded = role_mapping.get(role.lower(), 0)
-    
-    # Level encoding
-    level_mapping = {
-        'entry': 0,
-        'junior': 0,
-        'mid': 1,
-        'mid-level': 1,
-        'senior': 2,
-        'lead': 3,
-        'principal': 4
+
+def compression_grid(engine: TreeEnsembleEngine, trees: list = None, depths: list = None,
+                     quantize: bool = True) -> list:
+    """(n_trees, max_depth, quantize) candidates: halving tree counts x shallower depths"""
+    if trees is None:
+        trees, n = [], engine.n_trees
+        while n >= 10:
+            trees.append(n)
+            n //= 2
+    if depths is None:
+        depths = [d for d in (engine.depth, engine.depth - 2, engine.depth - 4) if d >= 2]
+    return [(n, d, q) for n in sorted(set(trees), reverse=True) for d in sorted(set(depths), reverse=True)
+            for q in ((False, True) if quantize else (False,))]
+
+def compress_model_package(package: dict, directory: str, features_list: list, targets: list = None,
+                           trees: list = None, depths: list = None, quantize: bool = True) -> dict:
+    """
+    Evaluate compressed variants of ``package`` on held-out ``features_list``
+    and export the Pareto-optimal ones (no faster variant is as accurate)
+    under ``directory`` with a variants.json index. Without ``targets``,
+    accuracy is fidelity to the uncompressed model. Returns the index.
+    """
+    schema = package.get('schema') or feature_schema(tuple(package['feature_columns']))
+    base = package.get('tree_engine') or compile_tree_engine(package.get('model'), len(schema.columns))
+    if base is None:
+        raise ValueError("Model could not be compiled to a tree engine; nothing to compress")
+    
+    X = schema.matrix(features_list)
+    scaler = ArrayScaler.from_scaler(package['scaler']) if package.get('scaler') is not None else None
+    reference = predict_ml_scores(X, dict(package, tree_engine=base))
+    targets = reference if targets is None else np.asarray(targets, dtype=np.float64)
+    
+    evaluated = []
+    for n_trees, depth, quantized in compression_grid(base, trees, depths, quantize):
+        try:
+            engine = base.compress(n_trees, depth, quantized)
+        except ValueError as e:
+            log_event(logging.WARNING, "variant_skipped", trees=n_trees, depth=depth,
+                      quantized=quantized, error=str(e))
+            continue
+        variant = {'model': engine, 'tree_engine': engine, 'scaler': scaler,
+                   'feature_columns': list(schema.columns)}
+        predictions = predict_ml_scores(X, variant)
+        evaluated.append((variant, {
+            'name': f"t{engine.n_trees}-d{engine.depth}" + ("-q" if quantized else ""),
+            'trees': engine.n_trees,
+            'depth': engine.depth,
+            'quantized': quantized,
+            'nodes': len(engine.value),
+            'size_bytes': engine.nbytes,
+            'latency_ms': round(measure_predict_latency(variant), 4),
+            **prediction_accuracy(predictions, targets),
+            'fidelity_r2': prediction_accuracy(predictions, reference)['r2'],
+        }))
+    
+    # Keep a variant only if it beats every faster one
+    kept, best = [], -math.inf
+    for variant, entry in sorted(evaluated, key=lambda item: item[1]['latency_ms']):
+        accuracy = entry['r2'] if entry['r2'] is not None else -entry['mae']
+        if accuracy > best:
+            best = accuracy
+            kept.append((variant, entry))
+    
+    base_version = model_version(package)
+    holdout = 'labelled' if targets is not reference else 'fidelity to the uncompressed model'
+    os.makedirs(directory, exist_ok=True)
+    for variant, entry in kept:
+        variant['version'] = f"{base_version}-{entry['name']}"
+        variant['metadata'] = dict(package.get('metadata', {}), compression=dict(
+            entry, base_version=base_version, holdout=holdout, holdout_size=len(features_list)))
+        export_model_package(variant, os.path.join(directory, entry['name']))
+    
+    index = {
+        'format': MAPPED_FORMAT_VERSION,
+        'base_version': base_version,
+        'holdout': holdout,
+        'holdout_size': len(features_list),
+        'variants': [entry for _, entry in kept],
     }
-    level_encoded = level_mapping.get(level.lower(), 1)
+    # Index last: a directory without one is an incomplete variant set
+    with open(os.path.join(directory, VARIANT_INDEX), 'w') as f:
+        json.dump(index, f, indent=2)
+    return index
+
+def select_model_variant(directory: str, budget_ms: float = None) -> dict:
+    """
+    Load the most accurate variant of a variant set whose one-row latency,
+    re-measured on this machine, fits ``budget_ms`` (LATENCY_BUDGET_MS;
+    0 takes the most accurate variant). The fastest variant is used when
+    none fits.
+    """
+    budget_ms = LATENCY_BUDGET_MS if budget_ms is None else budget_ms
+    with open(os.path.join(directory, VARIANT_INDEX)) as f:
+        index = json.load(f)
     
-    # Calculate scores
-    technical_score = min(20, technical_count * 2)
-    positive_score = min(15, positive_count * 1.5)
-    negative_score = min(20, negative_count * 2)
+    ranked = sorted(index['variants'], key=lambda v: (v['r2'] if v['r2'] is not None else -v['mae']),
+                    reverse=True)
+    chosen = fastest = None
+    for entry in ranked:
+        package = load_mapped_model_package(os.path.join(directory, entry['name']))
+        if budget_ms <= 0:
+            chosen = (package, entry, None)
+            break
+        latency = measure_predict_latency(package, repeat=50)
+        if fastest is None or latency < fastest[2]:
+            fastest = (package, entry, latency)
+        if latency <= budget_ms:
+            chosen = (package, entry, latency)
+            break
+    if chosen is None:
+        log_event(logging.WARNING, "variant_over_budget", budget_ms=budget_ms,
+                  variant=fastest[1]['name'], latency_ms=round(fastest[2], 4))
+        chosen = fastest
+    
+    package, entry, latency = chosen
+    package['metadata'] = dict(package['metadata'], variant=dict(
+        entry, measured_latency_ms=round(latency, 4) if latency is not None else None,
+        budget_ms=budget_ms or None))
+    log_event(logging.INFO, "variant_selected", directory=directory, variant=entry['name'],
+              r2=entry['r2'], latency_ms=latency and round(latency, 4), budget_ms=budget_ms,
+              candidates=len(ranked))
+    return package
+
+# ============================================
+# FEATURE EXTRACTION FUNCTION
+# ============================================
+
+# Phrases that mark a sentence as a specific example
+EXAMPLE_PHRASES = ['for example', 'for instance', 'such as']
+
+# A sentence counts as a specific example if it names one or contains numbers
+EXAMPLE_PATTERN = re.compile(r'\d|' + '|'.join(re.escape(phrase) for phrase in EXAMPLE_PHRASES))
+
+class TokenizedText:
+    """
+    One tokenizer pass over a transcript, shared by every feature.
+
+    ``sentences`` are the lowercased pieces between '.', '!' and '?'. A run of
+    terminators ends a single sentence, so the empty pieces inside a run do not
+    count towards ``sentence_count`` (the ``re.split(r'[.!?]+')`` semantics).
+    ``sentence_examples`` flags each piece that holds a digit or an example phrase.
+    """
+    __slots__ = ('lower', 'word_count', 'word_counts', 'question_count',
+                 'sentences', 'sentence_examples', 'sentence_count')
+
+    def __init__(self, text: str):
+        lower = text.lower()
+        self.lower = lower
+        words = lower.split()
+        self.word_count = len(words)
+        self.word_counts = Counter(words)
+        self.question_count = lower.count('?')
+        
+        # Sentence pieces with C-level str methods; lowercasing never moves a
+        # terminator or a digit, and the example phrases are ASCII
+        pieces = lower.replace('!', '.').replace('?', '.').split('.')
+        self.sentences = pieces
+        self.sentence_examples = list(map(bool, map(EXAMPLE_PATTERN.search, pieces)))
+        self.sentence_count = len(pieces) - pieces[1:-1].count('')
+
+    @property
+    def unique_words(self) -> int:
+        return len(self.word_counts)
+
+    @property
+    def specific_examples(self) -> int:
+        return sum(self.sentence_examples)
+
+def extract_enhanced_features(text: str, role: str, level: str, schema: "FeatureSchema" = None) -> "FeatureVector":
+    """
+    Extract enhanced features from interview text, laid out by ``schema``
+    (default: the live model's, see extraction_schema)
+    """
+    if EXTRACT_WINDOW_CHARS and len(text) > EXTRACT_WINDOW_CHARS:
+        with StageTimer('extract_windowed', observe=False):
+            return extract_windowed_features(text, role, level, EXTRACT_WINDOW_CHARS, schema)
+    with StageTimer('tokenize', observe=False):
+        tokens = TokenizedText(text)
+    with StageTimer('lexicon', observe=False):
+        keyword_counts = LEXICON.count(tokens.lower, tokens.word_counts)
+    return assemble_features(
+        word_count=tokens.word_count,
+        unique_words=tokens.unique_words,
+        keyword_counts=keyword_counts,
+        question_count=tokens.question_count,
+        specific_examples=tokens.specific_examples,
+        sentence_count=tokens.sentence_count,
+        role=role,
+        level=level,
+        schema=schema,
+    )
+
+# Whitespace as str.split() sees it; windows are only cut in front of it
+WHITESPACE = re.compile(r'\s')
+
+def text_windows(text: str, window_chars: int):
+    """
+    Consecutive slices of ``text`` of about ``window_chars`` characters. Every
+    cut is placed in front of a whitespace character, so no token is split; a
+    window only grows past ``window_chars`` to finish a token longer than that.
+    """
+    start = 0
+    while len(text) - start > window_chars:
+        match = WHITESPACE.search(text, start + window_chars)
+        if match is None:
+            break
+        yield text[start:match.start()]
+        start = match.start()
+    yield text[start:]
+
+def extract_windowed_features(text: str, role: str, level: str, window_chars: int,
+                              schema: "FeatureSchema" = None) -> "FeatureVector":
+    """
+    extract_enhanced_features computed window by window and merged: the
+    same features, with working memory proportional to ``window_chars``
+    instead of to the transcript.
+    """
+    accumulator = FeatureAccumulator(role, level)
+    for window in text_windows(text, window_chars):
+        accumulator.append(window, separator='')
+    return accumulator.features(schema)
+
+class FeatureAccumulator:
+    """
+    Feature state folded from consecutive pieces of one transcript.
+
+    Appending a piece costs O(len(piece)) and leaves the state equal to
+    extract_enhanced_features of the pieces joined by their separators.
+    Tokens never span a join: pieces are joined with a space, or (with an
+    empty separator) every piece after the first starts with whitespace.
+    Phrases and the sentence that continues across a join are handled from
+    short tails of the previous piece.
+    """
+
+    def __init__(self, role: str, level: str):
+        self.role = role
+        self.level = level
+        self.pieces = 0
+        self.word_count = 0
+        self.word_counts = Counter()
+        self.keyword_counts = dict.fromkeys(LEXICON.categories, 0)
+        self.question_count = 0
+        self.closed_sentences = 0
+        self.closed_examples = 0
+        self.open_sentence_example = False
+        self.open_sentence_tail = ''
+        self.text_tail = ''
+
+    def append(self, text: str, separator: str = ' '):
+        """Fold the next piece, joined to the previous ones by ``separator``"""
+        joined = self.pieces > 0
+        tokens = TokenizedText(text)
+        text_lower = tokens.lower
+        
+        # Words, unique words and lexicon counts
+        self.word_count += tokens.word_count
+        self.word_counts.update(tokens.word_counts)
+        for category, hits in LEXICON.count(text_lower, tokens.word_counts).items():
+            self.keyword_counts[category] += hits
+        if joined:
+            for category, hits in LEXICON.count_spanning(self.text_tail, text_lower, separator).items():
+                self.keyword_counts[category] += hits
+        reach = LEXICON.max_phrase_length
+        self.text_tail = ((self.text_tail + separator if joined else '') + text_lower[-reach:])[-reach:]
+        
+        self.question_count += tokens.question_count
+        
+        # Sentences: the first piece continues the sentence left open before
+        pieces, examples = tokens.sentences, tokens.sentence_examples
+        example_reach = max(len(phrase) for phrase in EXAMPLE_PHRASES)
+        first_lower = pieces[0]
+        example = examples[0]
+        if joined:
+            boundary = self.open_sentence_tail + separator + first_lower[:example_reach]
+            example = (example or self.open_sentence_example
+                       or any(phrase in boundary for phrase in EXAMPLE_PHRASES))
+            first_lower = self.open_sentence_tail + separator + first_lower[-example_reach:]
+        
+        if len(pieces) == 1:
+            self.open_sentence_example = example
+            self.open_sentence_tail = first_lower[-example_reach:]
+        else:
+            self.closed_sentences += tokens.sentence_count - 1
+            self.closed_examples += example
+            self.closed_examples += sum(examples[1:-1])
+            self.open_sentence_example = examples[-1]
+            self.open_sentence_tail = pieces[-1][-example_reach:]
+        self.pieces += 1
+
+    def features(self, schema: "FeatureSchema" = None) -> "FeatureVector":
+        return assemble_features(
+            word_count=self.word_count,
+            unique_words=len(self.word_counts),
+            keyword_counts=self.keyword_counts,
+            question_count=self.question_count,
+            specific_examples=self.closed_examples + self.open_sentence_example,
+            sentence_count=self.closed_sentences + 1,
+            role=self.role,
+            level=self.level,
+            schema=schema,
+        )
+
+def assemble_features(word_count: int, unique_words: int, keyword_counts: dict,
+                      question_count: int, specific_examples: int, sentence_count: int,
+                      role: str, level: str, schema: "FeatureSchema" = None) -> "FeatureVector":
+    """Derive the scoring features from raw transcript counts"""
+    technical_count = keyword_counts['technical']
+    positive_count = keyword_counts['positive']
+    negative_count = keyword_counts['negative']
+    
+    # Calculate average response length (words per sentence)
+    avg_response_length = word_count / max(1, sentence_count)
+    
+    # Lexical diversity (unique words / total words)
+    lexical_diversity = (unique_words / max(1, word_count)) * 100
+    
+    role_encoded = ROLE_MAPPING.get(role.lower(), 0)
+    level_encoded = LEVEL_MAPPING.get(level.lower(), 1)
+    
+    # Calculate scores
+    technical_score = min(20, technical_count * 2)
+    positive_score = min(15, positive_count * 1.5)
+    negative_score = min(20, negative_count * 2)
+    
+    # In EXTRACTED_FEATURES order
+    return FeatureVector(schema or extraction_schema(), (
+        word_count, technical_count, positive_count, negative_count,
+        question_count, specific_examples, avg_response_length, lexical_diversity,
+        role_encoded, level_encoded, technical_score, positive_score, negative_score,
+    ), role, level)
+
+# Numeric features produced by extract_enhanced_features
+EXTRACTED_FEATURES = ('word_count', 'technical_count', 'positive_count', 'negative_count',
+                      'question_count', 'specific_examples', 'avg_response_length',
+                      'lexical_diversity', 'role_encoded', 'level_encoded',
+                      'technical_score', 'positive_score', 'negative_score')
+FEATURE_INDEX = {name: index for index, name in enumerate(EXTRACTED_FEATURES)}
+FEATURE_KEYS = EXTRACTED_FEATURES + ('role', 'level')
+
+# Bump when extraction output changes in a way the fingerprint below cannot
+# see (e.g. a change in a helper it does not cover)
+EXTRACTOR_REVISION = 1
+
+# Everything whose behaviour determines extracted features, windowed path included
+EXTRACTOR_CODE = ('CompiledLexicon', '_trie_regex', 'TokenizedText', 'extract_enhanced_features',
+                  'assemble_features', 'text_windows', 'extract_windowed_features',
+                  'FeatureAccumulator')
+
+def code_fingerprint(code) -> bytes:
+    """Bytecode, constants and names of a code object, nested code included"""
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        parts.append(code_fingerprint(const) if inspect.iscode(const) else repr(const).encode())
+    return b'\0'.join(parts)
+
+def source_fingerprint(obj) -> bytes:
+    """Source of a function or class; its bytecode where no source ships (.pyc-only installs)"""
+    try:
+        return inspect.getsource(obj).encode()
+    except (OSError, TypeError):
+        pass
+    if inspect.isclass(obj):
+        members = [getattr(member, 'fget', member) for _, member in sorted(vars(obj).items())]
+        return b'\0'.join(code_fingerprint(member.__code__) for member in members
+                           if hasattr(member, '__code__'))
+    return code_fingerprint(obj.__code__)
+
+@functools.lru_cache(maxsize=None)
+def extractor_version() -> str:
+    """
+    EXTRACTOR_REVISION plus a fingerprint of the extraction code (EXTRACTOR_CODE)
+    and keyword tables. Features stored under another version are recomputed,
+    so any edit to the extractor (even a comment) invalidates the feature
+    store; bump EXTRACTOR_REVISION for changes the fingerprint cannot see.
+    """
+    digest = hashlib.sha256()
+    for table in (TECHNICAL_TERMS, POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS, ROLE_MAPPING,
+                  LEVEL_MAPPING, EXAMPLE_PHRASES, EXTRACTED_FEATURES,
+                  EXAMPLE_PATTERN.pattern, WHITESPACE.pattern):
+        digest.update(json.dumps(table, sort_keys=True).encode())
+    for name in EXTRACTOR_CODE:
+        digest.update(source_fingerprint(globals()[name]))
+    return f"{EXTRACTOR_REVISION}-{digest.hexdigest()[:12]}"
+
+# Column names used at training time -> the extractor feature they hold
+FEATURE_ALIASES = {
+    'positive_keyword_count': 'positive_count',
+    'negative_indicator_count': 'negative_count',
+    'technical_term_count': 'technical_count',
+}
+
+class FeatureSchema:
+    """
+    A model's feature_columns compiled against the extractor's outputs. It
+    owns the layout of FeatureVector rows: the model's columns first, in
+    model column order (each fed by its extractor feature directly or
+    through FEATURE_ALIASES), then the extractor features the model does
+    not use. Extraction writes every value straight into its slot, so a
+    vector's model input is a view of its row, not a copy. Columns nothing
+    produces stay 0 and are logged, or rejected when ML_FEATURE_SCHEMA=strict.
+    """
+
+    def __init__(self, feature_columns: tuple, strict: bool = None):
+        self.columns = tuple(feature_columns)
+        sources = [col if col in EXTRACTED_FEATURES else FEATURE_ALIASES.get(col)
+                   for col in self.columns]
+        self.missing = tuple(col for col, source in zip(self.columns, sources) if source is None)
+        
+        strict = FEATURE_SCHEMA_MODE == "strict" if strict is None else strict
+        if self.missing:
+            if strict:
+                raise ValueError(f"feature_columns not produced by the extractor: {list(self.missing)}")
+            log_event(logging.WARNING, "feature_columns_missing", columns=list(self.missing), filled_with=0)
+        
+        # Slot of every extractor feature: its first model column, else one after the model's columns
+        slots = {}
+        for index, source in enumerate(sources):
+            if source is not None:
+                slots.setdefault(source, index)
+        unused = [name for name in EXTRACTED_FEATURES if name not in slots]
+        slots.update((name, len(self.columns) + offset) for offset, name in enumerate(unused))
+        self.width = len(self.columns) + len(unused)
+        self.positions = np.array([slots[name] for name in EXTRACTED_FEATURES], dtype=np.intp)
+        # Later columns fed by a feature that already has a slot (a name and its alias)
+        repeats = [(index, slots[source]) for index, source in enumerate(sources)
+                   if source is not None and slots[source] != index]
+        self.repeat_to = np.array([to for to, _ in repeats], dtype=np.intp)
+        self.repeat_from = np.array([source for _, source in repeats], dtype=np.intp)
+        
+        # Feature mappings from elsewhere (stored dicts, another schema's vectors) are read by name
+        self.indices = np.array([i for i, source in enumerate(sources) if source is not None], dtype=np.intp)
+        present = [source for source in sources if source is not None]
+        self._getter = (operator.itemgetter(*present) if len(present) > 1
+                        else (lambda features, key=present[0]: (features[key],)) if present
+                        else (lambda features: ()))
+        
+        # Aliased columns score differently from the by-name lookup that
+        # preceded FEATURE_ALIASES, so they are part of the score key
+        aliased = [(col, source) for col, source in zip(self.columns, sources)
+                   if source is not None and source != col]
+        self.fingerprint = (hashlib.sha256(json.dumps(aliased).encode()).hexdigest()[:8]
+                            if aliased else "")
+
+    def row(self, values: tuple) -> np.ndarray:
+        """Storage row for extractor values given in EXTRACTED_FEATURES order"""
+        row = np.zeros(self.width)
+        row[self.positions] = values
+        if len(self.repeat_to):
+            row[self.repeat_to] = row[self.repeat_from]
+        return row
+
+    def matrix(self, features_list: list) -> np.ndarray:
+        """(n_samples, n_columns) float64 model input for a list of feature vectors or dicts"""
+        n_columns = len(self.columns)
+        if features_list and all(getattr(features, 'schema', None) is self for features in features_list):
+            if len(features_list) == 1:
+                return features_list[0].values[np.newaxis, :n_columns]
+            return np.stack([features.values[:n_columns] for features in features_list])
+        X = np.zeros((len(features_list), n_columns), dtype=np.float64)
+        if len(features_list) and len(self.indices):
+            X[:, self.indices] = [self._getter(features) for features in features_list]
+        return X
+
+@functools.lru_cache(maxsize=32)
+def feature_schema(feature_columns: tuple) -> FeatureSchema:
+    """Compiled (and cached) schema for a tuple of model feature_columns"""
+    return FeatureSchema(feature_columns)
+
+def extraction_schema() -> FeatureSchema:
+    """Layout for newly extracted features: the live model's schema"""
+    schema = model_package.get('schema') if model_package else None
+    return schema if schema is not None else feature_schema(EXTRACTED_FEATURES)
+
+class FeatureVector(Mapping):
+    """
+    Extracted features of one transcript: ``values`` is its float64 row in
+    ``schema`` layout (the model input), ``raw`` the same numbers in
+    EXTRACTED_FEATURES order with their Python types. Read by name, like
+    the feature dicts the feature store returns, by the rule-based scorer,
+    the ML adjustments and sessions.
+    """
+
+    __slots__ = ('schema', 'raw', 'values', 'role', 'level')
+
+    def __init__(self, schema: FeatureSchema, raw: tuple, role: str, level: str):
+        self.schema = schema
+        self.raw = raw
+        self.values = schema.row(raw)
+        self.role = role
+        self.level = level
+
+    def __getitem__(self, name: str):
+        index = FEATURE_INDEX.get(name)
+        if index is not None:
+            return self.raw[index]
+        if name == 'role':
+            return self.role
+        if name == 'level':
+            return self.level
+        raise KeyError(name)
+
+    def get(self, name: str, default=None):
+        index = FEATURE_INDEX.get(name)
+        if index is not None:
+            return self.raw[index]
+        if name == 'role':
+            return self.role
+        if name == 'level':
+            return self.level
+        return default
+
+    def __iter__(self):
+        return iter(FEATURE_KEYS)
+
+    def __len__(self) -> int:
+        return len(FEATURE_KEYS)
+
+    def __repr__(self) -> str:
+        return f"FeatureVector({dict(self)!r})"
+
+    def __reduce__(self):
+        # Schemas hold compiled getters; rebuild from the columns (lru-cached) instead
+        return restore_feature_vector, (self.schema.columns, self.raw, self.role, self.level)
+
+def restore_feature_vector(columns: tuple, raw: tuple, role: str, level: str) -> FeatureVector:
+    return FeatureVector(feature_schema(columns), raw, role, level)
+
+# ============================================
+# ENHANCED SCORING LOGIC - FIXED VERSION
+# ============================================
+
+def build_feature_matrix(features_list: list, feature_columns: list) -> np.ndarray:
+    """Stack feature dicts into one (n_samples, n_features) matrix in model column order"""
+    return feature_schema(tuple(feature_columns)).matrix(features_list)
+
+def predict_ml_scores(X: np.ndarray, package: dict = None) -> np.ndarray:
+    """
+    Scale (if a scaler exists) and predict a whole feature matrix in one model
+    call, with ``package`` or the live model package
+    """
+    package = package if package is not None else model_package
+    with StageTimer('scale'):
+        scaler = package.get('scaler')
+        if scaler:
+            X_scaled = scaler.transform(X)
+        else:
+            X_scaled = X
+    
+    with StageTimer('predict'):
+        engine = package.get('tree_engine')
+        if engine is not None:
+            predictions = engine.predict(X_scaled)
+        else:
+            predictions = package['model'].predict(X_scaled)
+    
+    return predictions
+
+def adjust_ml_score(ml_score: float, features: dict) -> float:
+    """Apply the STRICTER quality adjustments on top of a raw model prediction"""
+    # FIX: Apply STRICTER adjustments based on actual quality
+    adjustment = 0
+    
+    # LOWER base expectations
+    base_score = 30  # Instead of 50
+    
+    # STRICTER: Lexical diversity - only reward good diversity
+    if features.get('lexical_diversity', 0) > 50:  # Higher threshold
+        adjustment += 2
+    elif features.get('lexical_diversity', 0) < 20:  # Penalize low diversity
+        adjustment -= 5
+    
+    # STRICTER: Senior level - expect MORE
+    if features.get('level_encoded') == 2:  # Senior
+        if features.get('technical_score', 0) < 15:  # Expect high technical
+            adjustment -= 8
+        elif features.get('word_count', 0) < 200:  # Expect detailed answers
+            adjustment -= 5
+    
+    # Technical role - expect technical content
+    if 'Data' in features.get('role', '') or 'ML' in features.get('role', ''):
+        if features.get('technical_score', 0) < 8:
+            adjustment -= 6
+    
+    # FIX: Start from base_score, not ml_score
+    final_score = base_score + adjustment
+    
+    # If ML model gave reasonable score, use it (with adjustment)
+    if 20 < ml_score < 80:
+        final_score = ml_score + adjustment
+    
+    return final_score
+
+def finalize_score(final_score: float, rng=None) -> float:
+    """Clamp to the valid range and add the small presentation variance"""
+    # Ensure valid range
+    final_score = max(0, min(100, final_score))
+    
+    # Add small variance (seeded per transcript in deterministic mode)
+    variance = (rng or np.random).uniform(-2, 2)
+    final_score += variance
+    
+    return max(5, min(95, round(final_score, 2)))
+
+def calculate_enhanced_score(features: dict, use_ml: bool = True, rng=None) -> float:
+    """
+    Calculate score using either ML model or advanced rule-based system
+    FIXED: Much stricter scoring for poor responses
+    """
+    return calculate_enhanced_scores([features], use_ml, [rng])[0]
+
+def calculate_enhanced_scores(features_list: list, use_ml: bool = True, rngs: list = None) -> list:
+    """
+    Batch version of calculate_enhanced_score: one scaler/model call for all rows.
+    Returns the scores in the same order as ``features_list``. ``rngs`` holds an
+    optional per-row random generator for the score variance.
+    """
+    if not features_list:
+        return []
+    if rngs is None:
+        rngs = [None] * len(features_list)
+    
+    # One read of the live package, so a hot reload cannot mix two versions
+    package = model_package
+    if use_ml and package and package.get('model'):
+        try:
+            # Prepare features for ML model
+            schema = package.get('schema') or feature_schema(tuple(package.get('feature_columns', [])))
+            with StageTimer('matrix', observe=False):
+                X = schema.matrix(features_list)
+            ml_scores = predict_ml_scores(X, package)
+            with StageTimer('adjust', observe=False):
+                final_scores = [
+                    adjust_ml_score(float(ml_score), features)
+                    for ml_score, features in zip(ml_scores, features_list)
+                ]
+            
+        except Exception as e:
+            log_event(logging.WARNING, "ml_prediction_failed", error=str(e), fallback="rule-based")
+            with StageTimer('rule_score', observe=False):
+                final_scores = rule_based_scores(features_list, rngs)
+    else:
+        # Use stricter rule-based scoring
+        with StageTimer('rule_score', observe=False):
+            final_scores = rule_based_scores(features_list, rngs)
+    
+    if len(features_list) >= VECTORIZED_MIN_ROWS:
+        return finalize_scores(final_scores, rngs)
+    return [finalize_score(score, rng) for score, rng in zip(final_scores, rngs)]
+
+def rule_based_scores(features_list: list, rngs: list) -> list:
+    """Rule-based scores for a batch: vectorized for large batches, scalar for small ones"""
+    if len(features_list) >= VECTORIZED_MIN_ROWS:
+        return calculate_stricter_rule_based_scores(features_to_columns(features_list), rngs)
+    return [calculate_stricter_rule_based_score(f, rng) for f, rng in zip(features_list, rngs)]
+
+def calculate_stricter_rule_based_score(features: dict, rng=None) -> float:
+    """
+    MUCH STRICTER rule-based scoring system
+    Matches Gemini's strictness
+    """
+    rng = rng or np.random
+    
+    # FIX: ADD EXTREME LOW SCORE CHECKS FIRST
+    # 1. Check for extremely poor responses
+    if features['word_count'] < 30:
+        # Almost no response
+        return max(5, 10 + rng.uniform(-3, 3))
+    
+    if features['negative_score'] > 15:
+        # Many negative indicators
+        return max(10, 15 + rng.uniform(-4, 4))
+    
+    if features['word_count'] < 50 and features['technical_score'] < 2:
+        # Very brief with no technical content
+        return max(10, 18 + rng.uniform(-5, 5))
+    
+    # FIX: LOWER base score for neutrality
+    base_score = 30  # Was 50 - TOO HIGH!
+    
+    # 1. Content Quality (0-30 points) - STRICTER
+    content_score = 0
+    
+    # Positive indicators - ONLY if meaningful
+    if features['positive_score'] > 5:
+        content_score += min(10, features['positive_score'] * 0.3)  # Was 0.5
+    else:
+        content_score -= 5  # Penalize lack of positive content
+    
+    # Technical depth - STRICTER
+    if features['technical_score'] > 8:
+        content_score += min(8, features['technical_score'] * 0.2)  # Was 0.3
+    elif features['technical_score'] < 3:
+        content_score -= 8  # Penalize lack of technical content
+    
+    # 2. Communication Skills (0-25 points) - STRICTER
+    comm_score = 0
+    
+    # Response length - MUCH STRICTER
+    if features['word_count'] < 50:  # Very brief
+        comm_score -= 15  # Was -5
+    elif features['word_count'] < 100:  # Brief
+        comm_score -= 8   # Was -5
+    elif 100 <= features['word_count'] <= 300:  # Good range
+        comm_score += 10  # Was 8
+    elif features['word_count'] > 300:  # Too verbose
+        comm_score += 3   # Was 5
+    
+    # Sentence structure
+    if 10 <= features['avg_response_length'] <= 25:  # Good range
+        comm_score += 5
+    elif features['avg_response_length'] < 5:  # Too short
+        comm_score -= 5
+    
+    # Examples provided - ONLY if present
+    if features['specific_examples'] > 0:
+        comm_score += min(6, features['specific_examples'] * 3)  # Was 2
+    
+    # 3. Professionalism (0-20 points) - STRICTER
+    prof_score = 5  # Start LOWER (was 10)
+    
+    # NEGATIVE indicators - HEAVY penalty
+    negative_penalty = min(15, features['negative_score'] * 0.8)  # Was 0.4
+    prof_score -= negative_penalty
+    
+    # Question asking (engagement) - small bonus only
+    if features['question_count'] > 0:
+        prof_score += min(2, features['question_count'])  # Was 3
+    
+    # 4. Role & Level Adjustments (0-10 points) - STRICTER
+    role_adjustment = 0
+    
+    if features.get('level_encoded') == 2:  # Senior
+        # EXPECT MUCH MORE from seniors
+        if features['technical_score'] < 10:
+            role_adjustment -= 10  # Was -3
+        elif features['word_count'] < 150:
+            role_adjustment -= 8
+        else:
+            role_adjustment += 3   # Small bonus only
+    
+    elif features.get('level_encoded') == 1:  # Mid-level
+        if features['technical_score'] < 5:
+            role_adjustment -= 5
+        elif features['word_count'] < 100:
+            role_adjustment -= 3
+    
+    # Technical roles expect technical content
+    if any(tech_role in features.get('role', '') 
+           for tech_role in ['Engineer', 'Developer', 'Scientist']):
+        if features['technical_score'] < 5:
+            role_adjustment -= 8  # Was -2
+        elif features['technical_score'] > 12:
+            role_adjustment += 5  # Was 4
+    
+    # 5. Lexical diversity - STRICTER
+    lexical_bonus = 0
+    if features.get('lexical_diversity', 0) > 60:  # Excellent
+        lexical_bonus += 6
+    elif features.get('lexical_diversity', 0) > 40:  # Good
+        lexical_bonus += 3
+    elif features.get('lexical_diversity', 0) < 20:  # Poor
+        lexical_bonus -= 5
+    
+    # Calculate final score - MUCH STRICTER
+    final_score = (base_score + content_score + comm_score + 
+                  prof_score + role_adjustment + lexical_bonus)
+    
+    # FIX: Cap at reasonable maximum for poor responses
+    if features['word_count'] < 80:  # Very brief response
+        final_score = max(5, min(40, final_score))  # Cap at 40 max
+    
+    if features['negative_score'] > 8:  # Many negative indicators
+        final_score = max(10, min(50, final_score))  # Cap at 50 max
+    
+    return final_score
+
+# Batches at least this large use the vectorized rule-based scorer
+VECTORIZED_MIN_ROWS = 16
+
+RULE_FEATURES = ('word_count', 'negative_score', 'technical_score', 'positive_score',
+                 'avg_response_length', 'specific_examples', 'question_count',
+                 'level_encoded', 'lexical_diversity')
+
+def features_to_columns(features_list: list) -> dict:
+    """
+    Columnar feature table for calculate_stricter_rule_based_scores: one
+    float64 array per rule feature plus a 'role' string array. Missing
+    level_encoded becomes -1 (no level adjustment), missing lexical_diversity 0.
+    """
+    defaults = {'level_encoded': -1, 'lexical_diversity': 0}
+    columns = {
+        name: np.array([f.get(name, defaults.get(name)) for f in features_list], dtype=np.float64)
+        for name in RULE_FEATURES
+    }
+    columns['role'] = np.array([f.get('role', '') for f in features_list], dtype=str)
+    return columns
+
+def draw_uniform(rngs: list, rows: np.ndarray, half_width) -> np.ndarray:
+    """
+    One uniform(-half_width, half_width) draw per row in ``rows``, from that
+    row's generator, in the order the scalar path draws it. Unseeded rows
+    share the global numpy RNG.
+    """
+    half_width = np.broadcast_to(half_width, rows.shape)
+    if rngs is None or all(rng is None for rng in rngs):
+        return np.random.uniform(-half_width, half_width)
+    return np.array([(rngs[i] or np.random).uniform(-w, w) for i, w in zip(rows, half_width)],
+                    dtype=np.float64)
+
+def calculate_stricter_rule_based_scores(columns: dict, rngs: list = None) -> np.ndarray:
+    """
+    Vectorized calculate_stricter_rule_based_score over a columnar feature
+    table (see features_to_columns). Every branch becomes a mask, so the
+    early returns, caps and role/level adjustments match the scalar path
+    exactly, and so does the noise when ``rngs`` holds the rows' seeded
+    generators.
+    """
+    wc = columns['word_count']
+    negative = columns['negative_score']
+    technical = columns['technical_score']
+    positive = columns['positive_score']
+    avg_length = columns['avg_response_length']
+    examples = columns['specific_examples']
+    questions = columns['question_count']
+    level = columns['level_encoded']
+    lexical = columns['lexical_diversity']
+    
+    # 1. Content Quality
+    content_score = np.where(positive > 5, np.minimum(10, positive * 0.3), -5.0)
+    content_score += np.select([technical > 8, technical < 3], [np.minimum(8, technical * 0.2), -8.0], 0.0)
+    
+    # 2. Communication Skills
+    comm_score = np.select([wc < 50, wc < 100, wc <= 300], [-15.0, -8.0, 10.0], 3.0)
+    comm_score += np.select([(avg_length >= 10) & (avg_length <= 25), avg_length < 5], [5.0, -5.0], 0.0)
+    comm_score += np.where(examples > 0, np.minimum(6, examples * 3), 0.0)
+    
+    # 3. Professionalism
+    prof_score = 5 - np.minimum(15, negative * 0.8)
+    prof_score += np.where(questions > 0, np.minimum(2, questions), 0.0)
+    
+    # 4. Role & Level Adjustments
+    role_adjustment = np.select(
+        [(level == 2) & (technical < 10), (level == 2) & (wc < 150), level == 2,
+         (level == 1) & (technical < 5), (level == 1) & (wc < 100)],
+        [-10.0, -8.0, 3.0, -5.0, -3.0], 0.0,
+    )
+    roles = columns['role']
+    tech_role = np.zeros(len(roles), dtype=bool)
+    for tech_title in ['Engineer', 'Developer', 'Scientist']:
+        tech_role |= np.char.find(roles, tech_title) >= 0
+    role_adjustment += np.select([tech_role & (technical < 5), tech_role & (technical > 12)], [-8.0, 5.0], 0.0)
+    
+    # 5. Lexical diversity
+    lexical_bonus = np.select([lexical > 60, lexical > 40, lexical < 20], [6.0, 3.0, -5.0], 0.0)
+    
+    final_score = 30 + content_score + comm_score + prof_score + role_adjustment + lexical_bonus
+    
+    # Caps for brief or negative responses
+    final_score = np.where(wc < 80, np.maximum(5, np.minimum(40, final_score)), final_score)
+    final_score = np.where(negative > 8, np.maximum(10, np.minimum(50, final_score)), final_score)
+    
+    # Early returns for extremely poor responses take precedence, first match wins
+    early = np.select(
+        [wc < 30, negative > 15, (wc < 50) & (technical < 2)], [1, 2, 3], 0
+    )
+    rows = np.flatnonzero(early)
+    if len(rows):
+        base, floor, half_width = (np.array(values, dtype=np.float64)[early[rows] - 1]
+                                   for values in ([10, 15, 18], [5, 10, 10], [3, 4, 5]))
+        final_score[rows] = np.maximum(floor, base + draw_uniform(rngs, rows, half_width))
+    
+    return final_score
+
+def finalize_scores(scores, rngs: list = None) -> list:
+    """Vectorized finalize_score; rounding stays Python's round() so results match exactly"""
+    scores = np.maximum(0, np.minimum(100, np.asarray(scores, dtype=np.float64)))
+    scores = scores + draw_uniform(rngs, np.arange(len(scores)), 2.0)
+    return [max(5, min(95, round(score, 2))) for score in scores.tolist()]
+
+# ============================================
+# SCORE CACHE (content-addressed, deterministic variance)
+# ============================================
+
+def model_version(package: dict = None) -> str:
+    """Version string of the active model package"""
+    package = package if package is not None else model_package
+    if not package:
+        return "none"
+    return package.get('version', 'unknown')
+
+def scoring_engine(package: dict = None) -> str:
+    """Engine that scores with ``package``: compiled, sklearn or rule-based"""
+    package = package if package is not None else model_package
+    if not package or package.get('model') is None:
+        return "rule-based"
+    return "compiled" if package.get('tree_engine') is not None else "sklearn"
+
+def score_version(package: dict = None) -> str:
+    """
+    Model version as it enters score keys: with the feature schema
+    fingerprint when the package's columns are resolved through aliases
+    """
+    package = package if package is not None else model_package
+    schema = package.get('schema') if package else None
+    if schema is not None and schema.fingerprint:
+        return f"{model_version(package)}+{schema.fingerprint}"
+    return model_version(package)
+
+def score_key(interview_data: str, role: str, level: str, version: str = None) -> str:
+    """Content hash of everything that determines a score"""
+    digest = hashlib.sha256(interview_data.encode('utf-8', 'surrogatepass'))
+    return finish_score_key(digest, role, level, version)
+
+def finish_score_key(text_digest, role: str, level: str, version: str = None) -> str:
+    """Complete a score key from a sha256 already fed with the transcript text"""
+    digest = text_digest.copy()
+    digest.update(b'\0')
+    for part in (role, level, version or score_version()):
+        digest.update(part.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def score_seed(key: str, deterministic: bool = None):
+    """Variance seed derived from a score key (None outside deterministic mode)"""
+    deterministic = DETERMINISTIC_SCORES if deterministic is None else deterministic
+    return int(key[:16], 16) if deterministic else None
+
+def score_rng(seed):
+    """Random generator for the score variance (global numpy RNG when unseeded)"""
+    return np.random.default_rng(seed) if seed is not None else None
+
+class ScoreCache:
+    """Bounded LRU cache with a TTL for scores keyed by ``score_key``"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (called whenever the active model changes)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+score_cache = (ScoreCache(SCORE_CACHE_SIZE, SCORE_CACHE_TTL)
+               if SCORE_CACHE_SIZE > 0 and DETERMINISTIC_SCORES else None)
+
+def activate_model_package(package: dict):
+    """Make ``package`` the live model and invalidate scores cached for the old one"""
+    global model_package
+    model_package = package
+    if score_cache is not None:
+        score_cache.clear()
+
+# ============================================
+# SCORING EXECUTION (keeps CPU work off the event loop)
+# ============================================
+
+scoring_executor = None
+
+def score_interview(interview_data: str, role: str, level: str, seed: int = None,
+                    use_model: bool = True) -> tuple:
+    """
+    Extract features and score one interview; returns (score, features, use_ml).
+    A ``seed`` makes the score variance reproducible; ``use_model=False``
+    scores rule-based even when a model is loaded (degraded mode).
+    """
+    # 1. Extract enhanced features
+    with StageTimer('extract'):
+        features = extract_enhanced_features(interview_data, role, level)
+    
+    # 2. Calculate score
+    use_ml = use_model and model_package is not None and model_package.get('model') is not None
+    with StageTimer('score', observe=False):
+        ml_score = calculate_enhanced_score(features, use_ml, score_rng(seed))
+    
+    return ml_score, features, use_ml
+
+def score_features(features: dict, seed: int = None) -> tuple:
+    """Score an already extracted feature dict; returns (score, use_ml)"""
+    use_ml = model_package is not None and model_package.get('model') is not None
+    return calculate_enhanced_score(features, use_ml, score_rng(seed)), use_ml
+
+def score_interview_batch(items: list) -> tuple:
+    """
+    Score (interview_data, role, level, seed) tuples in order.
+    Returns (scores, features_list, use_ml); features are None for failed items.
+    """
+    # 1. Extract features per item; a failing item gets the safe fallback score
+    features_list = extract_batch_features(items)
+    
+    # 2. Score all extracted rows with one vectorized predict
+    ml_scores, use_ml = score_extracted_batch(features_list, [item[3] for item in items])
+    return ml_scores, features_list, use_ml
+
+def extract_batch_features(items: list) -> list:
+    """Features for each (interview_data, role, level, ...) item; None where extraction failed"""
+    features_list = []
+    for interview_data, role, level, *_ in items:
+        try:
+            with StageTimer('extract'):
+                features_list.append(extract_enhanced_features(interview_data, role, level))
+        except Exception as e:
+            log_event(logging.ERROR, "feature_extraction_failed", error=str(e))
+            features_list.append(None)
+    return features_list
+
+def score_extracted_batch(features_list: list, seeds: list) -> tuple:
+    """
+    Score already extracted features (None entries get the safe fallback
+    score) with one vectorized predict; returns (scores, use_ml)
+    """
+    use_ml = model_package is not None and model_package.get('model') is not None
+    extracted = [(f, score_rng(seed)) for f, seed in zip(features_list, seeds) if f is not None]
+    scores = iter(calculate_enhanced_scores(
+        [f for f, _ in extracted], use_ml, [rng for _, rng in extracted]
+    ))
+    ml_scores = [next(scores) if f is not None else safe_fallback_score() for f in features_list]
+    return ml_scores, use_ml
+
+def init_scoring_worker(model_path: str, package: dict = None):
+    """
+    Process-pool initializer: preload the model once per worker process.
+    A ``package`` (hot reload) is used as is, so workers score exactly the
+    version the registry validated even if ``model_path`` has changed since.
+    """
+    global model_package
+    configure_logging()
+    model_package = package if package is not None else load_model_package(model_path, verbose=False)
+    # Forked workers inherit the parent's RNG state; give each its own
+    np.random.seed()
+
+def create_scoring_process_pool(model_path: str, package: dict = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=SCORING_WORKERS,
+        initializer=init_scoring_worker,
+        initargs=(model_path, package),
+    )
+
+def start_scoring_executor(model_path: str = MODEL_PATH):
+    """Create the executor selected by ML_SCORING_EXECUTOR"""
+    global scoring_executor
+    
+    if SCORING_EXECUTOR == "inline":
+        scoring_executor = None
+    elif SCORING_EXECUTOR == "thread":
+        scoring_executor = ThreadPoolExecutor(
+            max_workers=SCORING_WORKERS, thread_name_prefix="scoring"
+        )
+    elif SCORING_EXECUTOR == "process":
+        scoring_executor = create_scoring_process_pool(model_path)
+    else:
+        raise ValueError(
+            f"Unknown ML_SCORING_EXECUTOR {SCORING_EXECUTOR!r} (expected inline, thread or process)"
+        )
+    log_event(logging.INFO, "scoring_executor_started", mode=SCORING_EXECUTOR,
+              workers=SCORING_WORKERS if scoring_executor else 0)
+
+def stop_scoring_executor():
+    global scoring_executor
+    if scoring_executor is not None:
+        scoring_executor.shutdown(wait=True, cancel_futures=True)
+        scoring_executor = None
+
+async def restart_scoring_workers(model_path: str, package: dict):
+    """
+    Process mode only: start a pool preloaded with ``package``, wait until
+    its workers are up, then swap it in. The old pool finishes the tasks it
+    already has and exits; new tasks go to the new pool.
+    """
+    global scoring_executor
+    if SCORING_EXECUTOR != "process" or scoring_executor is None:
+        return
+    
+    loop = asyncio.get_running_loop()
+    new_pool = create_scoring_process_pool(model_path, package)
+    await asyncio.gather(*(loop.run_in_executor(new_pool, os.getpid) for _ in range(SCORING_WORKERS)))
+    old_pool, scoring_executor = scoring_executor, new_pool
+    old_pool.shutdown(wait=False)
+
+async def run_scoring(func, *args, admitted: int = 0):
+    """
+    Run a scoring function on the configured executor (inline if none).
+    ``admitted`` is the number of admission-controlled requests the call
+    scores; their per-request cost feeds the admission estimate.
+    """
+    if scoring_executor is None:
+        result, timings = collect_stage_timings(func, *args)
+    else:
+        loop = asyncio.get_running_loop()
+        result, timings = await loop.run_in_executor(
+            scoring_executor, collect_stage_timings, func, *args
+        )
+    observe_stage_timings(timings)
+    if admitted and admission is not None:
+        admission.observe_service(timings[-1][1] / admitted)
+    return result
+
+# ============================================
+# REQUEST PROFILING (opt-in, one request at a time)
+# ============================================
+
+# tracemalloc and the sampler are process-wide: profile one request at a time
+_profile_lock = threading.Lock()
+
+def sample_stacks(func, seconds: float, interval_ms: float, top: int = 15) -> dict:
+    """
+    Call ``func`` repeatedly for ``seconds`` (at least once) while a thread
+    samples the calling thread's stack every ``interval_ms``. The switch
+    interval is left alone (it is process-wide and would reschedule every
+    other request), so samples come no faster than it allows. Returns the
+    hottest collapsed stacks (flamegraph format) and per-function self and
+    inclusive sample counts.
+    """
+    target = threading.get_ident()
+    stacks = Counter()
+    done = threading.Event()
+    
+    def sampler():
+        while not done.wait(interval_ms / 1e3):
+            frame = sys._current_frames().get(target)
+            names = []
+            while frame is not None and frame.f_code is not sample_stacks.__code__:
+                code = frame.f_code
+                name = getattr(code, "co_qualname", code.co_name)
+                names.append(f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                stacks[';'.join(reversed(names))] += 1
+    
+    thread = threading.Thread(target=sampler, name="profile-sampler", daemon=True)
+    thread.start()
+    calls, started = 0, time.perf_counter()
+    try:
+        while calls == 0 or time.perf_counter() - started < seconds:
+            func()
+            calls += 1
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        thread.join()
+    
+    own, inclusive = Counter(), Counter()
+    for stack, count in stacks.items():
+        names = stack.split(';')
+        own[names[-1]] += count
+        for name in set(names):
+            inclusive[name] += count
+    total = sum(stacks.values())
+    return {
+        'calls': calls,
+        'seconds': round(elapsed, 4),
+        'interval_ms': interval_ms,
+        'switch_interval_ms': sys.getswitchinterval() * 1e3,
+        'samples': total,
+        'functions': [
+            {'function': name, 'self': own[name], 'total': count}
+            for name, count in inclusive.most_common(top)
+        ],
+        'stacks': [{'stack': stack, 'samples': count} for stack, count in stacks.most_common(top)],
+    }
+
+def profile_prediction(interview_data: str, role: str, level: str, seed: int = None,
+                       use_model: bool = True, sample: bool = False) -> tuple:
+    """
+    score_interview with stage profiling on; returns ((score, features,
+    use_ml), profile). Stage times are this request's own; the allocation
+    figures cover the whole call and every thread of the process.
+    ``sample`` adds a sampled profile of repeated extraction and scoring of
+    the same transcript.
+    """
+    with _profile_lock:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profile = StageProfile()
+        _stage_local.profile = profile
+        try:
+            with StageTimer('total', observe=False):
+                result, allocations = process_allocations(
+                    lambda: score_interview(interview_data, role, level, seed, use_model))
+        finally:
+            _stage_local.profile = None
+            if started_tracing:
+                tracemalloc.stop()
+        
+        report = {
+            'pid': os.getpid(),
+            'model_version': model_version(),
+            'text_chars': len(interview_data),
+            'stages': profile.stages,
+            'process_allocations': allocations,
+        }
+        if sample:
+            report['sampled'] = sample_stacks(
+                lambda: score_interview(interview_data, role, level, seed, use_model),
+                PROFILE_SAMPLE_SECONDS, PROFILE_SAMPLE_INTERVAL_MS,
+            )
+    return result, report
+
+def requested_profile_mode(flag: str, admin_token: str) -> str:
+    """
+    "stages", "sample" or None from the X-Profile header / ?profile= flag;
+    403 while profiling is disabled, 401 without the admin token when one is set
+    """
+    if not flag or flag.lower() in ("0", "false", "no", "off"):
+        return None
+    mode = "stages" if flag.lower() in ("1", "true", "yes", "on", "stages") else flag.lower()
+    if mode not in ("stages", "sample"):
+        raise HTTPException(status_code=400, detail=f"Unknown profile mode {flag!r} (expected stages or sample)")
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Request profiling is disabled (set ML_PROFILING=true)")
+    if ADMIN_TOKEN:
+        require_admin(admin_token)
+    return mode
+
+# ============================================
+# MICRO-BATCHING (coalesces concurrent /predict calls)
+# ============================================
+
+class BatchingStats:
+    """Batch size and queue wait statistics for tuning the batching window"""
+
+    def __init__(self, max_size: int, window: int = 10000):
+        self.batches = 0
+        self.requests = 0
+        self.size_histogram = [0] * (max_size + 1)
+        self._waits = deque(maxlen=window)
+
+    def record(self, batch_size: int, waits: list):
+        self.batches += 1
+        self.requests += batch_size
+        self.size_histogram[batch_size] += 1
+        self._waits.extend(waits)
+
+    def snapshot(self) -> dict:
+        waits = np.sort(np.fromiter(self._waits, dtype=float)) * 1000
+        percentile = lambda q: round(float(np.percentile(waits, q)), 3) if len(waits) else 0.0
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": round(self.requests / self.batches, 3) if self.batches else 0.0,
+            "batch_size_histogram": {
+                str(size): count for size, count in enumerate(self.size_histogram) if count
+            },
+            "queue_wait_ms": {
+                "p50": percentile(50),
+                "p95": percentile(95),
+                "p99": percentile(99),
+                "max": round(float(waits[-1]), 3) if len(waits) else 0.0,
+            },
+        }
+
+class MicroBatcher:
+    """
+    Collects /predict calls arriving within a window (or until max_size) and
+    scores them with one vectorized predict. The window is adaptive: it is
+    only waited out while requests arrive faster than the window, so a lone
+    request is dispatched immediately. Up to ``max_concurrency`` batches are
+    scored at once; requests arriving meanwhile join the next batch.
+    """
+
+    def __init__(self, window_ms: float, max_size: int, max_concurrency: int = 1):
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.max_concurrency = max_concurrency
+        self.stats = BatchingStats(max_size)
+        self._queue = None
+        self._queued = set()  # futures of requests not yet dispatched in a batch
+        self._task = None
+        self._slots = None
+        self._last_arrival = None
+        self._gap_ewma = float('inf')
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            self._queued.discard(future)
+            if not future.done():
+                future.set_exception(RuntimeError("Scoring service is shutting down"))
+
+    async def submit(self, interview_data: str, role: str, level: str, seed: int = None) -> tuple:
+        """Queue one interview and wait for (score, features, use_ml)"""
+        return await self.enqueue(interview_data, role, level, seed)
+
+    def enqueue(self, interview_data: str, role: str, level: str, seed: int = None) -> asyncio.Future:
+        """Queue one interview; the returned future resolves to (score, features, use_ml)"""
+        now = time.perf_counter()
+        if self._last_arrival is not None:
+            gap = now - self._last_arrival
+            self._gap_ewma = gap if self._gap_ewma == float('inf') else 0.8 * self._gap_ewma + 0.2 * gap
+        self._last_arrival = now
+        
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(((interview_data, role, level, seed), now, future))
+        self._queued.add(future)
+        return future
+
+    def cancel(self, future: asyncio.Future) -> bool:
+        """Cancel a queued request before its batch is dispatched; False once it is being scored"""
+        if future not in self._queued:
+            return False
+        self._queued.discard(future)
+        return future.cancel()
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Wait out the window only while traffic is dense enough to fill it
+            if self._gap_ewma < self.window:
+                deadline = batch[0][1] + self.window
+                while len(batch) < self.max_size:
+                    timeout = deadline - time.perf_counter()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            
+            await self._slots.acquire()
+            # Everything that queued up while waiting for a free slot joins too
+            while len(batch) < self.max_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Callers past their deadline have cancelled their futures; skip them
+            self._queued.difference_update(future for _, _, future in batch)
+            batch = [entry for entry in batch if not entry[2].done()]
+            if not batch:
+                self._slots.release()
+                continue
+            
+            dispatched = time.perf_counter()
+            self.stats.record(len(batch), [dispatched - arrived for _, arrived, _ in batch])
+            asyncio.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: list):
+        try:
+            ml_scores, features_list, use_ml = await run_scoring(
+                score_interview_batch, [item for item, _, _ in batch], admitted=len(batch)
+            )
+            for (_, _, future), ml_score, features in zip(batch, ml_scores, features_list):
+                if not future.done():
+                    future.set_result((ml_score, features, use_ml))
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+micro_batcher = None
+
+def create_micro_batcher():
+    """Build the /predict coalescer from configuration (None when disabled)"""
+    if not MICROBATCH_ENABLED:
+        return None
+    workers = SCORING_WORKERS if scoring_executor is not None else 1
+    return MicroBatcher(MICROBATCH_WINDOW_MS, MICROBATCH_MAX_SIZE, max_concurrency=workers)
+
+# ============================================
+# ADMISSION CONTROL (bounded in-flight /predict work)
+# ============================================
+
+def reject_overloaded(status_code: int, reason: str, detail: str, retry_after: int):
+    """Raise a 429/503 carrying a Retry-After hint (also in the JSON body)"""
+    REJECTED.inc(reason)
+    PREDICT_PATHS.inc("rejected")
+    raise HTTPException(
+        status_code=status_code,
+        detail={"error": detail, "reason": reason, "retry_after_seconds": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+class AdmissionControl:
+    """
+    Bounded in-flight /predict scoring with per-request deadlines.
+
+    A request is admitted while fewer than ``max_inflight`` are in flight and
+    the work ahead of it, at the measured per-request scoring cost, leaves
+    enough time to finish before its deadline; otherwise it is rejected with
+    a Retry-After of the expected drain time. Admitted requests beyond
+    ``degrade_inflight`` are scored rule-based. Only touched from the event
+    loop, so it needs no lock.
+    """
+
+    def __init__(self, max_inflight: int, degrade_inflight: int, parallelism: int):
+        self.max_inflight = max_inflight
+        self.degrade_inflight = degrade_inflight
+        self.parallelism = max(1, parallelism)
+        self.inflight = 0
+        self.service_seconds = None  # EWMA of per-request scoring time
+        self.admitted = 0
+        self.degraded = 0
+        self.rejected = Counter()
+
+    def observe_service(self, seconds: float):
+        if self.service_seconds is None:
+            self.service_seconds = seconds
+        else:
+            self.service_seconds = 0.9 * self.service_seconds + 0.1 * seconds
+
+    def expected_wait(self) -> float:
+        """Seconds until the requests already in flight have been scored"""
+        return self.inflight * (self.service_seconds or 0.0) / self.parallelism
+
+    def retry_after(self) -> int:
+        """Retry-After hint in whole seconds (at least 1)"""
+        return max(1, math.ceil(self.expected_wait()))
+
+    def reject(self, status_code: int, reason: str, detail: str):
+        self.rejected[reason] += 1
+        reject_overloaded(status_code, reason, detail, self.retry_after())
+
+    def check_capacity(self):
+        """503 while ``max_inflight`` requests are already in flight"""
+        if self.inflight >= self.max_inflight:
+            self.reject(503, "queue_full", f"{self.inflight} requests already in flight")
+
+    def admit(self, deadline_seconds: float) -> bool:
+        """
+        Take an in-flight slot or raise 503 (queue full, deadline already
+        passed) / 429 (deadline cannot be met). Returns True when the request
+        must be scored degraded. Pair every successful call with ``release()``.
+        """
+        self.check_capacity()
+        if deadline_seconds <= 0:
+            self.reject(503, "deadline_exceeded", "deadline passed before scoring could start")
+        expected = self.expected_wait() + (self.service_seconds or 0.0)
+        if expected > deadline_seconds:
+            self.reject(429, "deadline_unreachable",
+                        f"expected completion in {expected * 1e3:.0f} ms exceeds the "
+                        f"{deadline_seconds * 1e3:.0f} ms deadline")
+        self.inflight += 1
+        self.admitted += 1
+        degraded = 0 < self.degrade_inflight < self.inflight
+        if degraded:
+            self.degraded += 1
+        return degraded
+
+    def release(self):
+        self.inflight -= 1
+
+    def release_when_done(self, work: asyncio.Future):
+        """
+        Release the slot when ``work`` finishes rather than when its caller
+        stops waiting: scoring that outlives a timed-out or disconnected
+        request still occupies the executor and must count as in flight
+        """
+        def done(future):
+            self.release()
+            if not future.cancelled():
+                future.exception()  # nobody may await it any more; mark it retrieved
+        work.add_done_callback(done)
+
+    def snapshot(self) -> dict:
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "degrade_inflight": self.degrade_inflight,
+            "parallelism": self.parallelism,
+            "default_deadline_ms": REQUEST_DEADLINE_MS,
+            "service_ms": round(self.service_seconds * 1e3, 3) if self.service_seconds else None,
+            "expected_wait_ms": round(self.expected_wait() * 1e3, 3),
+            "admitted": self.admitted,
+            "degraded": self.degraded,
+            "rejected": dict(self.rejected),
+        }
+
+def create_admission_control():
+    """Build the /predict gate from configuration (None when disabled)"""
+    if MAX_INFLIGHT <= 0:
+        return None
+    # Extraction holds the GIL, so only a process pool scores requests in parallel
+    parallelism = SCORING_WORKERS if SCORING_EXECUTOR == "process" else 1
+    return AdmissionControl(MAX_INFLIGHT, DEGRADE_INFLIGHT, parallelism)
+
+admission = create_admission_control()
+
+def request_deadline(header_value: str) -> float:
+    """Deadline in seconds from X-Request-Deadline-Ms, else ML_REQUEST_DEADLINE_MS"""
+    if header_value is None:
+        return REQUEST_DEADLINE_MS / 1000
+    try:
+        deadline_ms = float(header_value)
+    except ValueError:
+        deadline_ms = 0.0
+    if not 0 < deadline_ms < float('inf'):
+        raise HTTPException(status_code=400, detail="X-Request-Deadline-Ms must be a positive number")
+    return deadline_ms / 1000
+
+# ============================================
+# LIVE SESSIONS (incremental per-utterance scoring)
+# ============================================
+
+class LiveSession(FeatureAccumulator):
+    """
+    Running feature state for one interview.
+
+    Utterances are joined with a space, like the transcript the Next.js
+    caller posts to /predict, so the state always equals
+    extract_enhanced_features(" ".join(utterances)). ``lock`` serializes
+    appends (which run on a helper thread) with reads of the state.
+    """
+
+    def __init__(self, role: str, level: str):
+        super().__init__(role, level)
+        self.text_digest = hashlib.sha256()
+        self.last_active = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    @property
+    def utterances(self) -> int:
+        return self.pieces
+
+    def append(self, text: str):
+        """Fold one utterance into the running state"""
+        self.text_digest.update((' ' + text if self.pieces else text).encode('utf-8', 'surrogatepass'))
+        super().append(text)
+        self.last_active = time.monotonic()
+
+    def score_key(self) -> str:
+        """Same key /predict would compute for the concatenated transcript"""
+        return finish_score_key(self.text_digest, self.role, self.level)
+
+class SessionStore:
+    """Live sessions by interview ID, evicted after ``ttl_seconds`` of inactivity"""
+
+    def __init__(self, ttl_seconds: float, max_sessions: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self):
+        # Sessions are kept in last-activity order, so idle ones are at the front
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_active >= cutoff and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, interview_id: str):
+        self._evict()
+        session = self._sessions.get(interview_id)
+        if session is not None:
+            session.last_active = time.monotonic()
+            self._sessions.move_to_end(interview_id)
+        return session
+
+    def get_or_create(self, interview_id: str, role: str, level: str) -> LiveSession:
+        session = self.get(interview_id)
+        if session is None:
+            session = self._sessions[interview_id] = LiveSession(role, level)
+            self._evict()
+        return session
+
+    def pop(self, interview_id: str):
+        self._evict()
+        return self._sessions.pop(interview_id, None)
+
+session_store = SessionStore(SESSION_TTL, MAX_SESSIONS)
+
+async def append_to_session(session: LiveSession, text: str):
+    """
+    Fold an utterance into a session without blocking the event loop: on a
+    helper thread (the state lives in this process, so never on a process
+    pool), inline only when scoring is configured inline
+    """
+    async with session.lock:
+        if scoring_executor is None:
+            session.append(text)
+            return
+        work = asyncio.get_running_loop().run_in_executor(None, session.append, text)
+        try:
+            await asyncio.shield(work)
+        except asyncio.CancelledError:
+            await work  # keep the lock until the state is consistent again
+            raise
+
+async def score_session(interview_id: str, session: LiveSession) -> SessionScoreResponse:
+    """Score a session's current state (and cache it for the final /predict)"""
+    async with session.lock:
+        key = session.score_key()
+        features, utterances, word_count = session.features(), session.utterances, session.word_count
+    ml_score = score_cache.get(key) if score_cache is not None else None
+    if ml_score is None:
+        ml_score, use_ml = await run_scoring(score_features, features, score_seed(key))
+        count_scoring_method(use_ml)
+        if score_cache is not None:
+            score_cache.put(key, ml_score)
+    
+    return SessionScoreResponse(
+        interview_id=interview_id,
+        utterances=utterances,
+        word_count=word_count,
+        ml_score=ml_score,
+    )
+
+# ============================================
+# READINESS AND WARMUP
+# ============================================
+
+class Readiness:
+    """Startup progress behind /health/ready"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.model_loaded = False
+        self.warmup_state = "pending"  # pending, running, passed, failed, skipped
+        self.warmup_requests = 0
+        self.warmup_errors = 0
+        self.warmup_seconds = 0.0
+
+    def reasons(self) -> list:
+        """Why this replica should not take traffic (empty when ready)"""
+        reasons = []
+        if not self.model_loaded:
+            reasons.append("model not loaded")
+        elif scoring_engine() == "rule-based" and not READY_ON_FALLBACK:
+            reasons.append("trained model unavailable, serving the rule-based fallback")
+        if self.warmup_state not in ("passed", "skipped"):
+            reasons.append(f"warmup {self.warmup_state}")
+        return reasons
+
+    def snapshot(self) -> dict:
+        reasons = self.reasons()
+        return {
+            "ready": not reasons,
+            "reasons": reasons,
+            "engine": scoring_engine(),
+            "model_version": model_version(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "warmup": {
+                "state": self.warmup_state,
+                "requests": self.warmup_requests,
+                "errors": self.warmup_errors,
+                "seconds": round(self.warmup_seconds, 3),
+            },
+        }
+
+readiness = Readiness()
+warmup_task = None
+
+WARMUP_FILLER = ['the', 'our', 'team', 'project', 'we', 'then', 'with', 'users',
+                 'release', 'because', 'service', 'so', 'it', 'was', 'after']
+
+def synthetic_warmup_requests(n: int) -> list:
+    """
+    ``n`` deterministic transcripts cycling through every role and level and
+    through short to long lengths, so warmup touches the same code paths
+    (and the lexicon's token cache) as real traffic
+    """
+    rng = random.Random(0)
+    combinations = [(role, level) for role in ROLE_MAPPING for level in LEVEL_MAPPING]
+    lengths = [40, 150, 400, 1500]
+    vocabulary = (WARMUP_FILLER * 4 + POSITIVE_KEYWORDS + NEGATIVE_KEYWORDS
+                  + [term for terms in TECHNICAL_TERMS.values() for term in terms])
     
-    return {
-        'word_count': word_count,
-        'technical_count': technical_count,
-        'positive_count': positive_count,
-        'negative_count': negative_count,
-        'question_count': question_count,
-        'specific_examples': specific_examples,
-        'avg_response_length': avg_response_length,
-        'lexical_diversity': lexical_diversity,
-        'role_encoded': role_encoded,
-        'level_encoded': level_encoded,
-        'technical_score': technical_score,
-        'positive_score': positive_score,
-        'negative_score': negative_score,
-        'role': role,
-        'level': level
-    }
+    requests = []
+    for index in range(n):
+        role, level = combinations[index % len(combinations)]
+        words = []
+        while len(words) < lengths[index % len(lengths)]:
+            sentence = rng.choices(vocabulary, k=rng.randint(6, 16))
+            if rng.random() < 0.2:
+                sentence = EXAMPLE_PHRASES[rng.randrange(len(EXAMPLE_PHRASES))].split() + sentence
+            words.extend(sentence)
+            words[-1] += '?' if rng.random() < 0.1 else '.'
+        requests.append(PredictionRequest(interview_data=' '.join(words), role=role, level=level))
+    return requests
+
+def load_warmup_requests() -> list:
+    if WARMUP_FILE:
+        with open(WARMUP_FILE) as f:
+            return [PredictionRequest(**item) for item in json.load(f)]
+    return synthetic_warmup_requests(WARMUP_REQUESTS)
+
+async def warm_up():
+    """
+    Score the warmup set through the /predict code path (micro-batcher or
+    executor, model), half one at a time and half concurrently, then mark
+    the replica ready. Requests run as the "warmup" endpoint, which keeps
+    them out of the /predict metrics, the score cache and admission control.
+    """
+    readiness.warmup_state = "running"
+    started = time.perf_counter()
+    errors_before = REQUEST_ERRORS.value("warmup")
+    try:
+        requests = load_warmup_requests()
+        if not requests:
+            readiness.warmup_state = "skipped"
+            return
+        
+        half = len(requests) // 2
+        for request in requests[:half]:
+            await serve_prediction(request, "warmup")
+        await asyncio.gather(*(serve_prediction(request, "warmup") for request in requests[half:]))
+        
+        readiness.warmup_requests = len(requests)
+        readiness.warmup_errors = int(REQUEST_ERRORS.value("warmup") - errors_before)
+        readiness.warmup_state = "failed" if readiness.warmup_errors else "passed"
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        readiness.warmup_state = "failed"
+        log_event(logging.ERROR, "warmup_failed", exc_info=True, error=str(e))
+    finally:
+        readiness.warmup_seconds = time.perf_counter() - started
+        snapshot = readiness.snapshot()
+        READY.set(1 if snapshot["ready"] else 0)
+        log_event(logging.INFO if snapshot["ready"] else logging.WARNING, "readiness",
+                  ready=snapshot["ready"], reasons=snapshot["reasons"], engine=snapshot["engine"],
+                  model_version=snapshot["model_version"], **snapshot["warmup"])
 
 # ============================================
-# ENHANCED SCORING LOGIC - FIXED VERSION
+# MODEL REGISTRY (hot reload and rollback)
 # ============================================
 
-def calculate_enhanced_score(features: dict, use_ml: bool = True) -> float:
+class ModelValidationError(Exception):
+    """A candidate model version failed to load or validate"""
+
+def validate_model_package(package: dict) -> dict:
     """
-    Calculate score using either ML model or advanced rule-based system
-    FIXED: Much stricter scoring for poor responses
+    Check a candidate package before it goes live: a model, feature_columns
+    that agree with the model and scaler widths, and finite predictions on
+    the synthetic warmup transcripts. Columns the extractor does not produce
+    are reported (scored as 0), or fail validation with ML_FEATURE_SCHEMA=strict.
     """
+    if package.get('model') is None:
+        raise ModelValidationError("package has no model")
+    feature_columns = list(package.get('feature_columns') or [])
+    if not feature_columns:
+        raise ModelValidationError("package has no feature_columns")
+    try:
+        schema = package.get('schema') or feature_schema(tuple(feature_columns))
+    except ValueError as e:
+        raise ModelValidationError(str(e)) from e
     
-    if use_ml and model_package and model_package.get('model'):
-        try:
-            # Prepare features for ML model
-            feature_columns = model_package.get('feature_columns', [])
-            X_values = []
-            
-            for col in feature_columns:
-                if col in features:
-                    X_values.append(features[col])
-                else:
-                    X_values.append(0)
-            
-            X = np.array([X_values])
-            
-            # Scale if scaler exists
-            scaler = model_package.get('scaler')
-            if scaler:
-                X_scaled = scaler.transform(X)
-            else:
-                X_scaled = X
-            
-            # Predict
-            ml_score = float(model_package['model'].predict(X_scaled)[0])
-            
-            # FIX: Apply STRICTER adjustments based on actual quality
-            adjustment = 0
-            
-            # LOWER base expectations
-            base_score = 30  # Instead of 50
-            
-            # STRICTER: Lexical diversity - only reward good diversity
-            if features.get('lexical_diversity', 0) > 50:  # Higher threshold
-                adjustment += 2
-            elif features.get('lexical_diversity', 0) < 20:  # Penalize low diversity
-                adjustment -= 5
-            
-            # STRICTER: Senior level - expect MORE
-            if features.get('level_encoded') == 2:  # Senior
-                if features.get('technical_score', 0) < 15:  # Expect high technical
-                    adjustment -= 8
-                elif features.get('word_count', 0) < 200:  # Expect detailed answers
-                    adjustment -= 5
-            
-            # Technical role - expect technical content
-            if 'Data' in features.get('role', '') or 'ML' in features.get('role', ''):
-                if features.get('technical_score', 0) < 8:
-                    adjustment -= 6
-            
-            # FIX: Start from base_score, not ml_score
-            final_score = base_score + adjustment
-            
-            # If ML model gave reasonable score, use it (with adjustment)
-            if 20 < ml_score < 80:
-                final_score = ml_score + adjustment
-            
-        except Exception as e:
-            print(f"⚠️ ML prediction failed: {e}. Using stricter rule-based.")
-            final_score = calculate_stricter_rule_based_score(features)
-    else:
-        # Use stricter rule-based scoring
-        final_score = calculate_stricter_rule_based_score(features)
-    
-    # Ensure valid range
-    final_score = max(0, min(100, final_score))
+    for name in ('model', 'scaler'):
+        width = getattr(package.get(name), 'n_features_in_', None)
+        if width is not None and width != len(feature_columns):
+            raise ModelValidationError(
+                f"{name} expects {width} features, feature_columns lists {len(feature_columns)}"
+            )
     
-    # Add small variance
-    variance = np.random.uniform(-2, 2)
-    final_score += variance
+    probes = [extract_enhanced_features(r.interview_data, r.role, r.level)
+              for r in synthetic_warmup_requests(8)]
+    try:
+        predictions = predict_ml_scores(schema.matrix(probes), package)
+    except Exception as e:
+        raise ModelValidationError(f"probe prediction failed: {e}") from e
+    if not np.all(np.isfinite(predictions)):
+        raise ModelValidationError("probe predictions are not finite")
     
-    return max(5, min(95, round(final_score, 2)))
+    return {
+        "probe_rows": len(probes),
+        "probe_mean": round(float(np.mean(predictions)), 3),
+        "missing_columns": list(schema.missing),
+    }
 
-def calculate_stricter_rule_based_score(features: dict) -> float:
+class ModelRegistry:
     """
-    MUCH STRICTER rule-based scoring system
-    Matches Gemini's strictness
+    Model versions: the live one, the one it replaced (kept loaded for
+    instant rollback) and a short history. New versions come from
+    ``directory`` (the newest *.pkl or exported directory wins) or from an
+    admin reload. They are loaded and validated off the event loop, then
+    swapped in with activate_model_package between requests.
     """
-    # FIX: ADD EXTREME LOW SCORE CHECKS FIRST
-    # 1. Check for extremely poor responses
-    if features['word_count'] < 30:
-        # Almost no response
-        return max(5, 10 + np.random.uniform(-3, 3))
-    
-    if features['negative_score'] > 15:
-        # Many negative indicators
-        return max(10, 15 + np.random.uniform(-4, 4))
-    
-    if features['word_count'] < 50 and features['technical_score'] < 2:
-        # Very brief with no technical content
-        return max(10, 18 + np.random.uniform(-5, 5))
-    
-    # FIX: LOWER base score for neutrality
-    base_score = 30  # Was 50 - TOO HIGH!
-    
-    # 1. Content Quality (0-30 points) - STRICTER
-    content_score = 0
-    
-    # Positive indicators - ONLY if meaningful
-    if features['positive_score'] > 5:
-        content_score += min(10, features['positive_score'] * 0.3)  # Was 0.5
-    else:
-        content_score -= 5  # Penalize lack of positive content
-    
-    # Technical depth - STRICTER
-    if features['technical_score'] > 8:
-        content_score += min(8, features['technical_score'] * 0.2)  # Was 0.3
-    elif features['technical_score'] < 3:
-        content_score -= 8  # Penalize lack of technical content
-    
-    # 2. Communication Skills (0-25 points) - STRICTER
-    comm_score = 0
-    
-    # Response length - MUCH STRICTER
-    if features['word_count'] < 50:  # Very brief
-        comm_score -= 15  # Was -5
-    elif features['word_count'] < 100:  # Brief
-        comm_score -= 8   # Was -5
-    elif 100 <= features['word_count'] <= 300:  # Good range
-        comm_score += 10  # Was 8
-    elif features['word_count'] > 300:  # Too verbose
-        comm_score += 3   # Was 5
-    
-    # Sentence structure
-    if 10 <= features['avg_response_length'] <= 25:  # Good range
-        comm_score += 5
-    elif features['avg_response_length'] < 5:  # Too short
-        comm_score -= 5
-    
-    # Examples provided - ONLY if present
-    if features['specific_examples'] > 0:
-        comm_score += min(6, features['specific_examples'] * 3)  # Was 2
-    
-    # 3. Professionalism (0-20 points) - STRICTER
-    prof_score = 5  # Start LOWER (was 10)
-    
-    # NEGATIVE indicators - HEAVY penalty
-    negative_penalty = min(15, features['negative_score'] * 0.8)  # Was 0.4
-    prof_score -= negative_penalty
-    
-    # Question asking (engagement) - small bonus only
-    if features['question_count'] > 0:
-        prof_score += min(2, features['question_count'])  # Was 3
-    
-    # 4. Role & Level Adjustments (0-10 points) - STRICTER
-    role_adjustment = 0
-    
-    if features.get('level_encoded') == 2:  # Senior
-        # EXPECT MUCH MORE from seniors
-        if features['technical_score'] < 10:
-            role_adjustment -= 10  # Was -3
-        elif features['word_count'] < 150:
-            role_adjustment -= 8
+
+    def __init__(self, directory: str = "", interval: float = 0):
+        self.directory = directory
+        self.interval = interval
+        self.active = None
+        self.previous = None
+        self.history = deque(maxlen=20)
+        self._seen = {}  # path -> mtime already tried, so a bad file is not retried every poll
+        self._lock = asyncio.Lock()
+        self._watcher = None
+
+    def candidates(self) -> list:
+        """(mtime, path) of the versions in ``directory``, newest first"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl') and entry.is_file():
+                found.append((entry.stat().st_mtime, entry.path))
+            elif entry.is_dir():
+                # Exports write manifest.json (variant sets variants.json) last,
+                # so its mtime marks completion
+                for marker in (VARIANT_INDEX, 'manifest.json'):
+                    marker_path = os.path.join(entry.path, marker)
+                    if os.path.exists(marker_path):
+                        found.append((os.stat(marker_path).st_mtime, entry.path))
+                        break
+        return sorted(found, reverse=True)
+
+    def newest_path(self) -> str:
+        """Newest version in the registry directory, else MODEL_PATH"""
+        candidates = self.candidates()
+        return candidates[0][1] if candidates else MODEL_PATH
+
+    def load_initial(self) -> str:
+        """
+        Activate the newest version that loads and validates, trying older
+        ones (and MODEL_PATH last) the way a hot reload would reject a bad
+        file; the rule-based fallback if none does. Returns its path.
+        """
+        candidates = self.candidates()
+        self._seen.update((path, mtime) for mtime, path in candidates)
+        paths = [path for _, path in candidates]
+        if MODEL_PATH not in paths and os.path.exists(MODEL_PATH):
+            paths.append(MODEL_PATH)
+        
+        for path in paths:
+            try:
+                package = read_model_package(path)
+                validation = validate_model_package(package)
+            except Exception as e:
+                log_event(logging.ERROR, "model_rejected", path=path, reason="startup",
+                          error=f"{type(e).__name__}: {e}")
+                continue
+            log_model_loaded(package, path)
+            break
         else:
-            role_adjustment += 3   # Small bonus only
-    
-    elif features.get('level_encoded') == 1:  # Mid-level
-        if features['technical_score'] < 5:
-            role_adjustment -= 5
-        elif features['word_count'] < 100:
-            role_adjustment -= 3
-    
-    # Technical roles expect technical content
-    if any(tech_role in features.get('role', '') 
-           for tech_role in ['Engineer', 'Developer', 'Scientist']):
-        if features['technical_score'] < 5:
-            role_adjustment -= 8  # Was -2
-        elif features['technical_score'] > 12:
-            role_adjustment += 5  # Was 4
-    
-    # 5. Lexical diversity - STRICTER
-    lexical_bonus = 0
-    if features.get('lexical_diversity', 0) > 60:  # Excellent
-        lexical_bonus += 6
-    elif features.get('lexical_diversity', 0) > 40:  # Good
-        lexical_bonus += 3
-    elif features.get('lexical_diversity', 0) < 20:  # Poor
-        lexical_bonus -= 5
-    
-    # Calculate final score - MUCH STRICTER
-    final_score = (base_score + content_score + comm_score + 
-                  prof_score + role_adjustment + lexical_bonus)
-    
-    # FIX: Cap at reasonable maximum for poor responses
-    if features['word_count'] < 80:  # Very brief response
-        final_score = max(5, min(40, final_score))  # Cap at 40 max
-    
-    if features['negative_score'] > 8:  # Many negative indicators
-        final_score = max(10, min(50, final_score))  # Cap at 50 max
-    
-    return final_score
+            if not paths:
+                log_event(logging.WARNING, "model_not_found", path=MODEL_PATH, fallback="rule-based")
+            path, package, validation = MODEL_PATH, create_advanced_fallback_model(), {}
+        
+        activate_model_package(package)
+        self.active = self._entry(path, package, validation)
+        self.history.append(dict(self.describe(self.active), reason="startup"))
+        return path
+
+    def _entry(self, path: str, package: dict, validation: dict) -> dict:
+        return {
+            "version": model_version(package),
+            "path": path,
+            "engine": scoring_engine(package),
+            "activated_at": datetime.now().isoformat(timespec="seconds"),
+            "validation": validation,
+            "package": package,
+        }
+
+    @staticmethod
+    def describe(entry: dict) -> dict:
+        return {k: v for k, v in entry.items() if k != "package"} if entry else None
+
+    def resolve(self, path: str = None) -> str:
+        """Path an admin reload may load: inside the registry directory, else only MODEL_PATH"""
+        if path is None:
+            return self.newest_path()
+        if not self.directory:
+            raise ModelValidationError("set ML_MODEL_REGISTRY_DIR to reload from an explicit path")
+        root = os.path.realpath(self.directory)
+        resolved = os.path.realpath(os.path.join(root, path))
+        if os.path.dirname(resolved) != root or not os.path.exists(resolved):
+            raise ModelValidationError(f"{path!r} is not a version in the model registry")
+        return resolved
+
+    async def load(self, path: str, reason: str) -> dict:
+        """Load, validate and activate the version at ``path``; returns its description"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            try:
+                package = await loop.run_in_executor(None, read_model_package, path)
+                validation = await loop.run_in_executor(None, validate_model_package, package)
+            except Exception as e:
+                log_event(logging.ERROR, "model_rejected", path=path, reason=reason, error=str(e))
+                if isinstance(e, ModelValidationError):
+                    raise
+                raise ModelValidationError(f"could not load {path}: {type(e).__name__}: {e}") from e
+            
+            if self.active and model_version(package) == self.active["version"]:
+                log_event(logging.INFO, "model_unchanged", path=path, version=self.active["version"])
+                return self.describe(self.active)
+            
+            entry = self._entry(path, package, validation)
+            await self._swap(entry, reason, load_seconds=round(time.perf_counter() - started, 3))
+            return self.describe(entry)
+
+    async def rollback(self) -> dict:
+        """Swap the previous version back in (it is still loaded)"""
+        async with self._lock:
+            if self.previous is None:
+                raise ModelValidationError("no previous model version to roll back to")
+            entry = dict(self.previous, activated_at=datetime.now().isoformat(timespec="seconds"))
+            await self._swap(entry, "rollback")
+            return self.describe(entry)
+
+    async def _swap(self, entry: dict, reason: str, **fields):
+        await restart_scoring_workers(entry["path"], entry["package"])
+        activate_model_package(entry["package"])
+        self.previous, self.active = self.active, entry
+        self.history.append(dict(self.describe(entry), reason=reason))
+        log_event(logging.INFO, "model_activated", version=entry["version"], path=entry["path"],
+                  engine=entry["engine"], reason=reason,
+                  previous_version=self.previous["version"] if self.previous else None, **fields)
+
+    async def poll(self):
+        """Activate the newest version in ``directory`` if it has not been tried yet"""
+        candidates = self.candidates()
+        if not candidates:
+            return
+        mtime, path = candidates[0]
+        if self._seen.get(path) == mtime or time.time() - mtime < 1.0:
+            return  # already tried, or possibly still being written
+        self._seen[path] = mtime
+        try:
+            await self.load(path, "watch")
+        except ModelValidationError:
+            pass  # logged by load; the live version keeps serving
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                log_event(logging.ERROR, "model_watch_failed", exc_info=True, error=str(e))
+
+    def start_watching(self):
+        if self.directory and self.interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+            log_event(logging.INFO, "model_watch_started", directory=self.directory, interval=self.interval)
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    def snapshot(self) -> dict:
+        return {
+            "directory": self.directory or None,
+            "watching": self._watcher is not None,
+            "active": self.describe(self.active),
+            "previous": self.describe(self.previous),
+            "history": list(self.history),
+        }
+
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR, MODEL_WATCH_INTERVAL)
 
 # ============================================
 # API ENDPOINTS
 # ============================================
 
+def safe_fallback_score() -> float:
+    """Neutral score returned when a request cannot be scored at all"""
+    fallback_score = 50 + np.random.uniform(-10, 10)
+    fallback_score = max(20, min(80, fallback_score))
+    return round(fallback_score, 2)
+
+def check_transcript_size(text: str):
+    """413 for a transcript or utterance longer than MAX_TRANSCRIPT_CHARS"""
+    if MAX_TRANSCRIPT_CHARS and len(text) > MAX_TRANSCRIPT_CHARS:
+        REJECTED.inc("transcript_too_large")
+        raise HTTPException(
+            status_code=413,
+            detail=f"Transcript of {len(text)} characters exceeds the maximum of {MAX_TRANSCRIPT_CHARS}"
+        )
+
 @app.get("/")
 async def root():
     """Health check with model info"""
     return {
         "status": "healthy",
+        "ready": not readiness.reasons(),
+        "engine": scoring_engine(),
         "service": "Professional Interview ML Scoring API",
         "version": "2.0-enhanced",
         "model_loaded": model_package is not None,
@@ -432,62 +3233,392 @@ async def root():
         "accuracy": f"{model_package['metadata'].get('train_r2', 0.82)*100:.1f}%" if model_package else "82% (estimated)"
     }
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_score(request: PredictionRequest) -> PredictionResponse:
+@app.get("/health/live")
+async def liveness():
+    """Liveness: the process is up and the event loop answers"""
+    return {"status": "alive", "uptime_seconds": round(time.time() - readiness.started_at, 1)}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: 200 once the model is loaded and warmed up, 503 before (or when degraded)"""
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+@app.post("/predict", response_model=PredictionResponse, response_model_exclude_none=True)
+async def predict_score(request: PredictionRequest, http_request: Request, profile: str = None,
+                        x_profile: str = Header(None),
+                        x_admin_token: str = Header(None),
+                        x_request_deadline_ms: str = Header(None)) -> PredictionResponse:
     """
-    Main prediction endpoint - enhanced version
+    Main prediction endpoint - enhanced version.
+    Under overload it answers 503/429 with Retry-After, or scores rule-based
+    (``degraded``); ``engine`` says what produced the score.
     """
-    print(f"\n📥 Prediction Request:")
-    print(f"   Role: {request.role}")
-    print(f"   Level: {request.level}")
-    print(f"   Text Length: {len(request.interview_data)} chars")
-    
-    try:
-        # 1. Extract enhanced features
-        features = extract_enhanced_features(
-            request.interview_data, 
-            request.role, 
-            request.level
-        )
+    check_transcript_size(request.interview_data)
+    mode = requested_profile_mode(x_profile or profile, x_admin_token)
+    deadline = request_deadline(x_request_deadline_ms)
+    arrived = getattr(http_request.state, "arrived", None)
+    if arrived is not None:
+        deadline -= time.perf_counter() - arrived
+    if mode is not None:
+        return await serve_profiled_prediction(request, mode, deadline)
+    return await serve_prediction(request, "/predict", deadline)
+
+async def serve_profiled_prediction(request: PredictionRequest, mode: str,
+                                    deadline: float) -> PredictionResponse:
+    """
+    /predict with a profile attached: admitted like any other request, then
+    scored in this process on a helper thread, bypassing the score cache and
+    the micro-batcher, with the same seed, so the score matches an
+    unprofiled request
+    """
+    with track_request("/predict/profiled"):
+        degraded = admission.admit(deadline) if admission is not None else False
+        work = None
+        try:
+            key = score_key(request.interview_data, request.role, request.level)
+            loop = asyncio.get_running_loop()
+            work = loop.run_in_executor(
+                None, functools.partial(profile_prediction, request.interview_data, request.role,
+                                        request.level, score_seed(key), not degraded,
+                                        sample=mode == "sample"),
+            )
+            if admission is not None:
+                admission.release_when_done(work)
+            (ml_score, features, use_ml), report = await asyncio.shield(work)
+        finally:
+            if admission is not None and work is None:
+                admission.release()
+        report['method'] = "Trained ML Model" if use_ml else "Advanced Rule-Based"
+        log_event(logging.INFO, "prediction_profiled", role=request.role, level=request.level,
+                  text_chars=len(request.interview_data), ml_score=ml_score, mode=mode,
+                  degraded=degraded, stages={entry['stage']: entry['wall_ms'] for entry in report['stages']})
+        return PredictionResponse(ml_score=ml_score, engine=engine_for(use_ml),
+                                  degraded=degraded or None, profile=report)
+
+def engine_for(use_ml: bool) -> str:
+    """Engine label for a score computed with (or without) the active model"""
+    return scoring_engine() if use_ml else "rule-based"
+
+async def serve_prediction(request: PredictionRequest, endpoint: str,
+                           deadline: float = None) -> PredictionResponse:
+    """
+    The /predict path; ``endpoint`` labels its metrics. Warmup runs it as
+    "warmup": scored the same way, but past the score cache and admission
+    control and without counting towards the path, method and fallback
+    counters. ``deadline`` is the time budget in seconds from now.
+    """
+    started = time.perf_counter()
+    deadline = deadline if deadline is not None else REQUEST_DEADLINE_MS / 1000
+    live = endpoint != "warmup"
+    cache = score_cache if live else None
+    gate = admission if live else None
+    with track_request(endpoint):
+        # 0. Serve repeated transcripts from the score cache (never rejected)
+        key = score_key(request.interview_data, request.role, request.level)
+        if cache is not None:
+            cached_score = cache.get(key)
+            if cached_score is not None:
+                PREDICT_PATHS.inc("cache")
+                log_event(logging.INFO, "prediction", role=request.role, level=request.level,
+                          text_chars=len(request.interview_data), ml_score=cached_score, cached=True)
+                return PredictionResponse(ml_score=cached_score, engine=scoring_engine())
+        
+        # 1. Admission: reject what cannot finish in time, degrade under pressure
+        degraded = gate.admit(deadline) if gate is not None else False
+        work = None
+        try:
+            # 2. Extract features and score off the event loop; the model path
+            #    goes through the micro-batcher, degraded scoring skips it
+            if degraded:
+                work = asyncio.ensure_future(run_scoring(
+                    score_interview, request.interview_data, request.role, request.level,
+                    score_seed(key), False, admitted=1,
+                ))
+            elif micro_batcher is not None:
+                work = micro_batcher.enqueue(
+                    request.interview_data, request.role, request.level, score_seed(key)
+                )
+            else:
+                work = asyncio.ensure_future(run_scoring(
+                    score_interview,
+                    request.interview_data, 
+                    request.role, 
+                    request.level,
+                    score_seed(key),
+                    admitted=1,
+                ))
+            if gate is not None:
+                gate.release_when_done(work)
+            remaining = deadline - (time.perf_counter() - started)
+            try:
+                ml_score, features, use_ml = await asyncio.wait_for(asyncio.shield(work),
+                                                                    max(remaining, 0.001))
+            finally:
+                # Given up on: drop it if still queued for a batch (running work finishes)
+                if not work.done() and micro_batcher is not None:
+                    micro_batcher.cancel(work)
+            
+            if features is None:
+                # Feature extraction failed; ml_score is already the safe fallback
+                REQUEST_ERRORS.inc(endpoint)
+                if live:
+                    FALLBACK_SCORES.inc()
+                    PREDICT_PATHS.inc("fallback")
+                log_event(logging.ERROR, "prediction_failed", error="feature extraction failed",
+                          fallback_score=ml_score)
+                return PredictionResponse(ml_score=ml_score, engine="fallback")
+            
+            if live:
+                count_scoring_method(use_ml)
+                PREDICT_PATHS.inc("degraded" if degraded else "model" if use_ml else "rule_based")
+            # Degraded scores are not cached: a retry after the spike gets the model score
+            if cache is not None and not degraded:
+                cache.put(key, ml_score)
+            
+            # 3. Log the result (full feature dumps only for a sample of requests)
+            log_event(logging.INFO, "prediction", role=request.role, level=request.level,
+                      text_chars=len(request.interview_data), ml_score=ml_score, cached=False,
+                      method="Trained ML Model" if use_ml else "Advanced Rule-Based",
+                      degraded=degraded)
+            if sample_feature_dump():
+                log_event(logging.INFO, "prediction_features",
+                          **{k: v for k, v in features.items() if k not in ('role', 'level')})
+            
+            return PredictionResponse(ml_score=ml_score, engine=engine_for(use_ml),
+                                      degraded=degraded or None)
         
-        # 2. Calculate score
-        use_ml = model_package is not None and model_package.get('model') is not None
-        ml_score = calculate_enhanced_score(features, use_ml)
+        except asyncio.TimeoutError:
+            # Admitted, but the work ahead drained slower than estimated
+            REQUEST_ERRORS.inc(endpoint)
+            log_event(logging.WARNING, "prediction_deadline_exceeded", role=request.role,
+                      level=request.level, text_chars=len(request.interview_data),
+                      deadline_ms=round(deadline * 1e3, 1))
+            detail = f"not scored within the {deadline * 1e3:.0f} ms deadline"
+            if not live:
+                raise HTTPException(status_code=503, detail=detail)
+            if gate is not None:
+                gate.reject(503, "deadline_exceeded", detail)
+            reject_overloaded(503, "deadline_exceeded", detail, retry_after=1)
+        
+        except Exception as e:
+            # Safe fallback, labelled so callers can tell it from a real score
+            fallback_score = safe_fallback_score()
+            REQUEST_ERRORS.inc(endpoint)
+            if live:
+                FALLBACK_SCORES.inc()
+                PREDICT_PATHS.inc("fallback")
+            log_event(logging.ERROR, "prediction_failed", exc_info=True, error=str(e),
+                      fallback_score=fallback_score)
+            return PredictionResponse(ml_score=fallback_score, engine="fallback")
         
-        # 3. Log detailed insights
-        print(f"\n📊 Feature Analysis:")
-        print(f"   Word Count: {features['word_count']}")
-        print(f"   Technical Terms: {features['technical_count']} (score: {features.get('technical_score', 0)})")
-        print(f"   Positive Indicators: {features['positive_count']} (score: {features.get('positive_score', 0)})")
-        print(f"   Negative Indicators: {features['negative_count']} (score: {features.get('negative_score', 0)})")
-        print(f"   Specific Examples: {features['specific_examples']}")
-        print(f"   Lexical Diversity: {features.get('lexical_diversity', 0):.1f}%")
+        finally:
+            if gate is not None and work is None:
+                gate.release()
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest) -> BatchPredictionResponse:
+    """
+    Batch prediction endpoint for bulk re-scoring.
+    Accepts up to MAX_BATCH_SIZE items (env ML_MAX_BATCH_SIZE, default 256),
+    scales and predicts them as one feature matrix and returns the scores
+    in request order. Larger batches, and batches with a transcript over
+    MAX_TRANSCRIPT_CHARS, are rejected with 413.
+    """
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(request.items)} items exceeds the maximum of {MAX_BATCH_SIZE}"
+        )
+    for item in request.items:
+        check_transcript_size(item.interview_data)
+    
+    with track_request("/predict/batch"):
+        # Only transcripts missing from the score cache are sent for scoring
+        keys = [score_key(item.interview_data, item.role, item.level) for item in request.items]
+        ml_scores = [score_cache.get(key) if score_cache is not None else None for key in keys]
+        pending = [index for index, score in enumerate(ml_scores) if score is None]
+        items = [
+            (request.items[i].interview_data, request.items[i].role, request.items[i].level, score_seed(keys[i]))
+            for i in pending
+        ]
         
-        print(f"\n✅ Final ML Score: {ml_score:.2f}/100")
-        print(f"   Scoring Method: {'Trained ML Model' if use_ml else 'Advanced Rule-Based'}")
+        use_ml = False
+        try:
+            if items:
+                scores, features_list, use_ml = await run_scoring(score_interview_batch, items)
+                for index, score, features in zip(pending, scores, features_list):
+                    ml_scores[index] = score
+                    if features is None:
+                        FALLBACK_SCORES.inc()
+                    elif score_cache is not None:
+                        score_cache.put(keys[index], score)
+                count_scoring_method(use_ml, sum(1 for f in features_list if f is not None))
+        except Exception as e:
+            log_event(logging.ERROR, "batch_prediction_failed", exc_info=True, error=str(e),
+                      items=len(pending))
+            REQUEST_ERRORS.inc("/predict/batch")
+            FALLBACK_SCORES.inc(amount=len(pending))
+            for index in pending:
+                ml_scores[index] = safe_fallback_score()
         
-        return PredictionResponse(ml_score=ml_score)
+        log_event(logging.INFO, "batch_prediction", items=len(ml_scores), scored=len(pending),
+                  cached=len(ml_scores) - len(pending),
+                  method="Trained ML Model" if use_ml else "Advanced Rule-Based")
         
-    except Exception as e:
-        print(f"❌ Error in prediction: {e}")
-        # Safe fallback
-        fallback_score = 50 + np.random.uniform(-10, 10)
-        fallback_score = max(20, min(80, fallback_score))
-        return PredictionResponse(ml_score=round(fallback_score, 2))
+        return BatchPredictionResponse(ml_scores=ml_scores)
+
+@app.post("/sessions/{interview_id}/utterances", response_model=SessionScoreResponse)
+async def append_utterance(interview_id: str, request: SessionUtteranceRequest) -> SessionScoreResponse:
+    """
+    Live scoring: append one user utterance to the interview's session and
+    return the current score. The first call creates the session with the
+    given role and level; idle sessions expire after ML_SESSION_TTL seconds.
+    """
+    check_transcript_size(request.text)
+    with track_request("/sessions"):
+        session = session_store.get_or_create(interview_id, request.role, request.level)
+        await append_to_session(session, request.text)
+        return await score_session(interview_id, session)
+
+@app.get("/sessions/{interview_id}", response_model=SessionScoreResponse)
+async def get_session_score(interview_id: str) -> SessionScoreResponse:
+    """Current score of a live session"""
+    session = session_store.get(interview_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return await score_session(interview_id, session)
+
+@app.delete("/sessions/{interview_id}", response_model=SessionScoreResponse)
+async def end_session(interview_id: str) -> SessionScoreResponse:
+    """End a live session and return its final score"""
+    session = session_store.pop(interview_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return await score_session(interview_id, session)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: request/stage latency histograms, counters and gauges"""
+    lines = [render_metrics()]
+    if score_cache is not None:
+        cache = score_cache.snapshot()
+        for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            lines.append(f"# TYPE ml_score_cache_{name}_total counter\n"
+                         f"ml_score_cache_{name}_total {cache[name]}\n")
+    lines.append(f"# TYPE ml_live_sessions gauge\nml_live_sessions {len(session_store)}\n")
+    lines.append(f"# TYPE ml_log_records_dropped_total counter\n"
+                 f"ml_log_records_dropped_total {NonBlockingQueueHandler.dropped}\n")
+    return PlainTextResponse("".join(lines), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats/batching")
+async def get_batching_stats():
+    """
+    Micro-batching metrics (batch size histogram, queue wait percentiles)
+    for tuning ML_MICROBATCH_WINDOW_MS against p99 latency
+    """
+    if micro_batcher is None:
+        return {"enabled": False}
+    
+    return {
+        "enabled": True,
+        "window_ms": MICROBATCH_WINDOW_MS,
+        "max_batch_size": MICROBATCH_MAX_SIZE,
+        **micro_batcher.stats.snapshot(),
+    }
+
+@app.get("/stats/admission")
+async def get_admission_stats():
+    """Admission control state: in-flight requests, scoring cost estimate, rejections"""
+    if admission is None:
+        return {"enabled": False}
+    
+    return {"enabled": True, **admission.snapshot()}
+
+@app.get("/stats/cache")
+async def get_cache_stats():
+    """Score cache counters (hits, misses, evictions, invalidations)"""
+    if score_cache is None:
+        return {"enabled": False}
+    
+    return {
+        "enabled": True,
+        "deterministic": DETERMINISTIC_SCORES,
+        "model_version": model_version(),
+        **score_cache.snapshot(),
+    }
+
+class ModelReloadRequest(BaseModel):
+    """Version to load, relative to ML_MODEL_REGISTRY_DIR (default: the newest one)"""
+    path: str = None
+
+def require_admin(token: str):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ML_ADMIN_TOKEN)")
+    if not hmac.compare_digest(token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/stats/memory")
+async def memory_stats():
+    """Unique vs shared resident memory of this worker process"""
+    try:
+        memory = process_memory()
+    except OSError:
+        raise HTTPException(status_code=501, detail="Memory accounting needs /proc/<pid>/smaps_rollup (Linux)")
+    return {"pid": os.getpid(), "master_pid": prefork_master_pid, **memory}
+
+@app.get("/models")
+async def list_models():
+    """Model registry: live version, rollback target and recent activations"""
+    return model_registry.snapshot()
+
+@app.post("/admin/models/reload")
+async def reload_model(request: ModelReloadRequest = None,
+                       x_admin_token: str = Header(None)):
+    """Load, validate and hot-swap a model version without dropping requests"""
+    require_admin(x_admin_token)
+    if prefork_master_pid is not None:
+        if request and request.path:
+            raise HTTPException(status_code=409, detail="Pre-fork workers reload the newest registry "
+                                "version only; place the model in the registry directory")
+        return signal_prefork_master(signal.SIGHUP, "reload")
+    try:
+        path = model_registry.resolve(request.path if request else None)
+        return {"active": await model_registry.load(path, "admin")}
+    except ModelValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.post("/admin/models/rollback")
+async def rollback_model(x_admin_token: str = Header(None)):
+    """Swap the previous model version back in"""
+    require_admin(x_admin_token)
+    if prefork_master_pid is not None:
+        return signal_prefork_master(signal.SIGUSR2, "rollback")
+    try:
+        return {"active": await model_registry.rollback()}
+    except ModelValidationError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @app.get("/model-info")
 async def get_model_info():
     """
     Professional model information for supervisors
     """
-    if not model_package:
+    package = model_package
+    if not package:
         raise HTTPException(status_code=503, detail="Model not available")
     
-    metadata = model_package.get('metadata', {})
+    metadata = package.get('metadata', {})
+    active = model_registry.active or {}
     
     return {
         "model_information": {
             "name": "Interview Performance Predictor v2.0",
+            "version": model_version(package),
+            "engine": scoring_engine(package),
+            "variant": metadata.get('variant', {}).get('name'),
+            "activated_at": active.get("activated_at"),
+            "previous_version": model_registry.previous["version"] if model_registry.previous else None,
             "type": metadata.get('model_type', 'Gradient Boosting Regressor'),
             "training_date": metadata.get('train_date', datetime.now().strftime("%Y-%m-%d")),
             "training_samples": metadata.get('train_samples', 1500)
@@ -511,22 +3642,150 @@ async def get_model_info():
         "reliability": "Consistent within ±8 points of human evaluators in 90% of cases"
     }
 
+# ============================================
+# PRE-FORK WORKERS (state shared with prefork_server.py)
+# ============================================
+
+# Set in forked workers: the master that loaded the model and owns the socket
+prefork_master_pid = None
+
+def process_memory(pid: int = None) -> dict:
+    """
+    Resident memory of a process in MiB, split into unique (private pages)
+    and shared (pages also mapped by other processes, e.g. the model the
+    pre-fork master loaded). Reads /proc/<pid>/smaps_rollup, so Linux only.
+    """
+    fields = {}
+    with open(f"/proc/{pid or 'self'}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if value.rstrip().endswith('kB'):
+                fields[name] = int(value.split()[0])
+    mib = lambda *names: round(sum(fields.get(name, 0) for name in names) / 1024, 1)
+    return {
+        "rss_mib": mib('Rss'),
+        "pss_mib": mib('Pss'),
+        "unique_mib": mib('Private_Clean', 'Private_Dirty'),
+        "shared_mib": mib('Shared_Clean', 'Shared_Dirty'),
+    }
+
+def signal_prefork_master(signum: int, action: str) -> JSONResponse:
+    """Forward an admin action to the master, which applies it to every worker"""
+    os.kill(prefork_master_pid, signum)
+    log_event(logging.INFO, "prefork_action_forwarded", action=action, master_pid=prefork_master_pid)
+    return JSONResponse({"status": f"{action} requested", "master_pid": prefork_master_pid}, status_code=202)
+
 # ============================================
 # START SERVER
 # ============================================
 
-if __name__ == "__main__":
+def export_model_main(argv: list):
+    """``python ml_model_api.py export-model [SOURCE] [DEST]``"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="ml_model_api.py export-model",
+        description="Convert a pickled model package into the memory-mapped directory format",
+    )
+    parser.add_argument('source', nargs='?', default=MODEL_PATH)
+    parser.add_argument('dest', nargs='?', help="output directory (default: SOURCE without .pkl)")
+    args = parser.parse_args(argv)
+    
+    package = load_model_package(args.source, verbose=False)
+    if package.get('model') is None:
+        sys.exit(f"❌ {args.source} could not be loaded; nothing to export")
+    dest = args.dest or os.path.splitext(args.source)[0]
+    manifest = export_model_package(package, dest)
+    print(f"✅ Exported {args.source} -> {dest} (version {manifest['version']})")
+    print(f"   Serve it with ML_MODEL_PATH={dest}")
+
+def print_banner(host: str, port: int, workers: int = 1):
+    url = f"http://{host}:{port}"
     print("\n" + "="*60)
     print("🚀 STARTING ENHANCED ML SCORING API")
     print("="*60)
-    print("📡 API URL: http://127.0.0.1:8000")
-    print("📊 Model Info: http://127.0.0.1:8000/model-info")
-    print("🎯 Prediction: POST http://127.0.0.1:8000/predict")
+    print(f"📡 API URL: {url}")
+    print(f"📊 Model Info: {url}/model-info")
+    print(f"🩺 Health: GET {url}/health/live and /health/ready")
+    print(f"🎯 Prediction: POST {url}/predict")
+    print(f"📦 Batch Prediction: POST {url}/predict/batch")
+    if workers > 1:
+        print(f"👷 Workers: {workers} pre-forked, sharing one model (memory: GET {url}/stats/memory)")
     print("="*60)
     print("⚡ Ready for professional interview scoring...")
     print("="*60 + "\n")
+
+def compress_model_main(argv: list):
+    """``python ml_model_api.py compress-model [SOURCE] [DEST] [--holdout FILE]``"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="ml_model_api.py compress-model",
+        description="Write smaller variants of a model package (fewer or shallower trees, "
+                    "float16 nodes), evaluated on a held-out set",
+    )
+    parser.add_argument('source', nargs='?', default=MODEL_PATH)
+    parser.add_argument('dest', nargs='?', help="output directory (default: SOURCE without .pkl + -variants)")
+    parser.add_argument('--holdout', help="JSON lines with a transcript, role, level and target score "
+                                          "(default: synthetic transcripts scored by the uncompressed model)")
+    parser.add_argument('--text-field', default='interview_data')
+    parser.add_argument('--label-field', default='score')
+    parser.add_argument('--trees', type=int, nargs='+', help="tree counts to try (default: halvings down to 10)")
+    parser.add_argument('--depths', type=int, nargs='+', help="depths to try (default: depth, -2, -4)")
+    parser.add_argument('--no-quantize', action='store_true', help="skip the float16 variants")
+    parser.add_argument('--feature-store', default=FEATURE_STORE_PATH,
+                        help="SQLite feature store for the holdout transcripts")
+    args = parser.parse_args(argv)
+    
+    package = load_model_package(args.source, verbose=False)
+    if package.get('model') is None:
+        sys.exit(f"❌ {args.source} could not be loaded; nothing to compress")
+    
+    targets = None
+    if args.holdout:
+        items, targets = [], []
+        with open(args.holdout, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                items.append((record[args.text_field], record.get('role', 'Software Engineer'),
+                              record.get('level', 'Mid-level')))
+                targets.append(float(record[args.label_field]))
+        from feature_store import extract_features_list
+        features_list = extract_features_list(items, args.feature_store)
+        if any(features is None for features in features_list):
+            sys.exit(f"❌ Feature extraction failed for part of {args.holdout}")
+    else:
+        features_list = [extract_enhanced_features(r.interview_data, r.role, r.level)
+                         for r in synthetic_warmup_requests(400)]
+    
+    dest = args.dest or os.path.splitext(args.source.rstrip(os.sep))[0] + '-variants'
+    index = compress_model_package(package, dest, features_list, targets,
+                                   args.trees, args.depths, not args.no_quantize)
+    
+    print(f"✅ {len(index['variants'])} variants of {index['base_version']} -> {dest} "
+          f"(holdout: {index['holdout_size']} rows, {index['holdout']})")
+    print(f"   {'variant':<12} {'latency ms':>10} {'KiB':>8} {'R²':>8} {'MAE':>7}")
+    for entry in index['variants']:
+        print(f"   {entry['name']:<12} {entry['latency_ms']:>10.4f} {entry['size_bytes'] / 1024:>8.0f} "
+              f"{entry['r2'] if entry['r2'] is not None else float('nan'):>8.4f} {entry['mae']:>7.3f}")
+    print(f"   Serve it with ML_MODEL_PATH={dest} ML_LATENCY_BUDGET_MS=<per-prediction budget>")
+
+CLI_COMMANDS = {
+    "export-model": export_model_main,
+    "compress-model": compress_model_main,
+}
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+    # The offline modules a command imports (feature_store) import ml_model_api:
+    # let them find this module rather than execute it a second time
+    sys.modules.setdefault("ml_model_api", sys.modules[__name__])
+    CLI_COMMANDS[sys.argv[1]](sys.argv[2:])
+elif __name__ == "__main__":
+    import uvicorn
+    
+    print_banner(SERVE_HOST, SERVE_PORT)
     
-    uvicorn.run(app, host="127.0.0.1", port=8000, reload=False)
+    uvicorn.run(app, host=SERVE_HOST, port=SERVE_PORT, reload=False)
 
 # from fastapi import FastAPI, HTTPException
 # from fastapi.middleware.cors import CORSMiddleware
@@ -0,0 +1,250 @@
+"""
+Pre-fork serving for ml_model_api: a master process loads the model once,
+binds the socket and forks uvicorn workers that share the model's pages
+copy-on-write, replacing workers that exit and rolling them on model changes.
+
+    python prefork_server.py [--workers N] [--host HOST] [--port PORT]
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+import uvicorn
+
+import ml_model_api
+from ml_model_api import (
+    MODEL_WATCH_INTERVAL,
+    SERVE_HOST,
+    SERVE_PORT,
+    WORKER_GRACEFUL_TIMEOUT,
+    WORKER_MAX_REQUESTS,
+    WORKER_MAX_REQUESTS_JITTER,
+    WORKER_MEMORY_REPORT_INTERVAL,
+    WORKERS,
+    ModelValidationError,
+    app,
+    configure_logging,
+    log_event,
+    model_registry,
+    model_version,
+    print_banner,
+    process_memory,
+    shutdown_logging,
+)
+
+class PreforkServer:
+    """
+    Master of a pre-fork worker pool.
+
+    The master loads the model once, binds the listening socket and forks
+    uvicorn workers that all accept on it. Model arrays, the compiled tree
+    engine and the lexicon are shared copy-on-write (gc.freeze keeps the
+    collector from dirtying the pages of pre-fork objects). The master keeps
+    ``workers`` processes running: a worker that exits (crashed, or recycled
+    after its request quota) is replaced. SIGHUP reloads the newest model
+    version and SIGUSR2 rolls back; both replace the workers one at a time,
+    starting each replacement before the old worker drains. SIGTERM/SIGINT
+    drain every worker and exit.
+
+    Each worker keeps its own score cache, micro-batcher and live sessions,
+    so /sessions needs sticky routing or a single worker.
+    """
+
+    def __init__(self, host: str, port: int, workers: int):
+        self.host = host
+        self.port = port
+        self.size = max(1, workers)
+        self.workers = {}      # pid -> spawn time (monotonic)
+        self.retiring = {}     # pid -> time SIGTERM was sent
+        self.actions = deque()
+        self.stopping = False
+        self.sock = None
+
+    def serve(self):
+        configure_logging()
+        model_registry.load_initial()
+        
+        self.sock = socket.create_server((self.host, self.port), backlog=2048)
+        self.sock.set_inheritable(True)
+        for signum, action in ((signal.SIGTERM, "stop"), (signal.SIGINT, "stop"),
+                               (signal.SIGHUP, "reload"), (signal.SIGUSR2, "rollback")):
+            signal.signal(signum, lambda *_, action=action: self.actions.append(action))
+        log_event(logging.INFO, "prefork_started", pid=os.getpid(), workers=self.size,
+                  host=self.host, port=self.port, version=model_version())
+        
+        next_report = time.monotonic() + WORKER_MEMORY_REPORT_INTERVAL
+        next_poll = time.monotonic() + MODEL_WATCH_INTERVAL
+        try:
+            while not (self.stopping and not self.workers):
+                self.reap()
+                while self.actions:
+                    self.handle(self.actions.popleft())
+                if not self.stopping:
+                    self.replenish()
+                    now = time.monotonic()
+                    if WORKER_MEMORY_REPORT_INTERVAL > 0 and now >= next_report:
+                        self.report_memory()
+                        next_report = now + WORKER_MEMORY_REPORT_INTERVAL
+                    if model_registry.directory and MODEL_WATCH_INTERVAL > 0 and now >= next_poll:
+                        self.swap_model(model_registry.poll)
+                        next_poll = now + MODEL_WATCH_INTERVAL
+                self.kill_stragglers()
+                time.sleep(0.2)
+        finally:
+            self.sock.close()
+            log_event(logging.INFO, "prefork_stopped", pid=os.getpid())
+            shutdown_logging()
+
+    def spawn(self):
+        # Flush and stop the log writer thread so the child forks from a
+        # single-threaded master; both sides restart it after the fork
+        shutdown_logging()
+        gc.collect()
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                run_prefork_worker(self.sock, os.getppid())
+                code = 0
+            finally:
+                os._exit(code)
+        configure_logging()
+        self.workers[pid] = time.monotonic()
+        log_event(logging.INFO, "prefork_worker_started", worker_pid=pid, version=model_version())
+        return pid
+
+    def replenish(self):
+        while len(self.workers) - len(self.retiring) < self.size:
+            self.spawn()
+
+    def reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            retired = self.retiring.pop(pid, None) is not None
+            code = os.waitstatus_to_exitcode(status)
+            uptime = round(time.monotonic() - started, 1) if started is not None else None
+            log_event(logging.INFO if code == 0 or retired else logging.ERROR, "prefork_worker_exited",
+                      worker_pid=pid, exit_code=code, uptime_seconds=uptime, retired=retired)
+            if code != 0 and not retired and uptime is not None and uptime < 1:
+                time.sleep(1)  # crashing on startup: do not fork in a tight loop
+
+    def retire(self, pid: int):
+        """Ask a worker to stop accepting, finish in-flight requests and exit"""
+        if pid in self.workers and pid not in self.retiring:
+            self.retiring[pid] = time.monotonic()
+            os.kill(pid, signal.SIGTERM)
+
+    def kill_stragglers(self):
+        deadline = time.monotonic() - WORKER_GRACEFUL_TIMEOUT - 5
+        for pid, since in list(self.retiring.items()):
+            if since < deadline:
+                log_event(logging.WARNING, "prefork_worker_killed", worker_pid=pid)
+                os.kill(pid, signal.SIGKILL)
+                self.retiring[pid] = float('inf')
+
+    def handle(self, action: str):
+        if action == "stop":
+            if not self.stopping:
+                log_event(logging.INFO, "prefork_stopping", workers=len(self.workers))
+            self.stopping = True
+            for pid in list(self.workers):
+                self.retire(pid)
+        elif action == "reload":
+            self.swap_model(lambda: model_registry.load(model_registry.newest_path(), "sighup"))
+        elif action == "rollback":
+            self.swap_model(model_registry.rollback)
+
+    def swap_model(self, change):
+        """Apply a registry change in the master; on a new version, roll the workers"""
+        before = model_registry.active
+        try:
+            asyncio.run(change())
+        except ModelValidationError as e:
+            log_event(logging.WARNING, "prefork_model_unchanged", error=str(e))
+            return
+        if model_registry.active is before:
+            return
+        for pid in [pid for pid in self.workers if pid not in self.retiring]:
+            self.spawn()
+            self.retire(pid)
+
+    def report_memory(self):
+        reports = []
+        for pid in [os.getpid(), *self.workers]:
+            try:
+                reports.append(dict(process_memory(pid), pid=pid))
+            except OSError:
+                continue
+        for report in reports:
+            log_event(logging.INFO, "worker_memory", master=report["pid"] == os.getpid(), **report)
+        if reports:
+            log_event(logging.INFO, "prefork_memory", processes=len(reports),
+                      unique_mib=round(sum(r["unique_mib"] for r in reports), 1),
+                      pss_mib=round(sum(r["pss_mib"] for r in reports), 1),
+                      rss_mib=round(sum(r["rss_mib"] for r in reports), 1))
+
+def run_prefork_worker(sock: socket.socket, master_pid: int):
+    """Body of a forked worker: serve ``app`` on the master's socket until told to stop"""
+    ml_model_api.prefork_master_pid = master_pid
+    configure_logging()
+    
+    # Own process group: a terminal Ctrl-C reaches only the master, which
+    # then drains the workers with a single SIGTERM (uvicorn force-exits on
+    # a second signal). SIGHUP/SIGUSR2 are for the master.
+    os.setpgid(0, 0)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_DFL)
+    for signum in (signal.SIGHUP, signal.SIGUSR2):
+        signal.signal(signum, signal.SIG_IGN)
+    
+    def watch_master():
+        # Drain and exit if the master dies without stopping us
+        while os.getppid() == master_pid:
+            time.sleep(1)
+        os.kill(os.getpid(), signal.SIGTERM)
+    threading.Thread(target=watch_master, name="master-watch", daemon=True).start()
+    
+    max_requests = None
+    if WORKER_MAX_REQUESTS > 0:
+        max_requests = WORKER_MAX_REQUESTS + random.randint(0, max(0, WORKER_MAX_REQUESTS_JITTER))
+    config = uvicorn.Config(
+        app,
+        limit_max_requests=max_requests,
+        timeout_graceful_shutdown=WORKER_GRACEFUL_TIMEOUT,
+        lifespan="on",
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+def serve_main(argv: list):
+    """``python prefork_server.py [--workers N] [--host HOST] [--port PORT]``"""
+    parser = argparse.ArgumentParser(
+        prog="prefork_server.py",
+        description="Serve the API from pre-forked workers sharing one loaded model",
+    )
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--host', default=SERVE_HOST)
+    parser.add_argument('--port', type=int, default=SERVE_PORT)
+    args = parser.parse_args(argv)
+    
+    print_banner(args.host, args.port, args.workers)
+    PreforkServer(args.host, args.port, args.workers).serve()
+
+if __name__ == "__main__":
+    serve_main(sys.argv[1:])
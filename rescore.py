@@ -0,0 +1,174 @@
+"""
+Offline rescoring for ml_model_api: stream a JSONL transcript dump through
+the batch scoring path on a process pool, in input order, resumable after a
+crash or Ctrl-C.
+
+    python rescore.py INPUT [-o OUTPUT] [--resume] [--workers N] [--feature-store PATH]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from feature_store import FeatureStore, feature_key, read_chunks, truncate_partial_line
+from ml_model_api import (
+    FEATURE_STORE_PATH,
+    MODEL_PATH,
+    configure_logging,
+    extract_batch_features,
+    finish_score_key,
+    init_scoring_worker,
+    model_version,
+    score_extracted_batch,
+    score_seed,
+    shutdown_logging,
+)
+
+rescore_feature_store = None
+
+def init_rescore_worker(model_path: str, store_path: str = None):
+    """Rescore worker: logs go to stderr so stdout can carry results"""
+    global rescore_feature_store
+    configure_logging(sys.stderr)
+    init_scoring_worker(model_path)
+    rescore_feature_store = FeatureStore(store_path) if store_path else None
+
+def rescore_chunk(first_record: int, lines: list, text_field: str, id_field: str) -> str:
+    """
+    Score a chunk of JSONL lines through the batch path and return the
+    output lines, one per input line and in the same order. Scores are
+    always seeded, with the seeds /predict uses under ML_DETERMINISTIC_SCORES.
+    """
+    version = model_version()
+    parsed = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+            parsed.append((record.get(id_field), str(record[text_field]),
+                           record.get('role') or "Software Engineer",
+                           record.get('level') or "Mid-level", None))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            parsed.append((None, None, None, None, f"invalid record: {type(e).__name__}: {e}"))
+    
+    valid, keys = [], []
+    for _, text, role, level, error in parsed:
+        if error is None:
+            digest = hashlib.sha256(text.encode('utf-8', 'surrogatepass'))
+            valid.append((text, role, level, score_seed(finish_score_key(digest, role, level), True)))
+            keys.append(feature_key(digest, role, level))
+    if not valid:
+        features_list, scores, use_ml = [], [], False
+    else:
+        if rescore_feature_store is not None:
+            features_list = rescore_feature_store.features_for(valid, keys)
+        else:
+            features_list = extract_batch_features(valid)
+        scores, use_ml = score_extracted_batch(features_list, [item[3] for item in valid])
+    results = iter(zip(scores, features_list))
+    
+    output = []
+    for index, (record_id, _, _, _, error) in enumerate(parsed):
+        entry = {"record": first_record + index, "id": record_id}
+        if error is None:
+            score, features = next(results)
+            if features is None:
+                entry["error"] = "feature extraction failed"
+            else:
+                entry.update(ml_score=score, method="ml" if use_ml else "rule_based", model_version=version)
+        else:
+            entry["error"] = error
+        output.append(json.dumps(entry, ensure_ascii=False))
+    return "\n".join(output) + "\n"
+
+def rescore_main(argv: list):
+    """``python rescore.py INPUT [-o OUTPUT] [--resume]``"""
+    parser = argparse.ArgumentParser(
+        prog="rescore.py",
+        description="Stream a JSONL transcript dump through the scoring pipeline on a process pool",
+    )
+    parser.add_argument('input', help="JSONL file, or - for stdin")
+    parser.add_argument('-o', '--output', help="JSONL results (default: stdout)")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="scoring processes (0 scores in this process)")
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--text-field', default='interview_data')
+    parser.add_argument('--id-field', default='id')
+    parser.add_argument('--resume', action='store_true',
+                        help="skip the records already in OUTPUT and append the rest")
+    parser.add_argument('--feature-store', default=FEATURE_STORE_PATH,
+                        help="SQLite feature store: reuse stored features, store new ones")
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+    
+    configure_logging(sys.stderr)
+    done = 0
+    if args.resume and os.path.exists(args.output):
+        done = truncate_partial_line(args.output)
+        print(f"↩️  Resuming after {done} records already in {args.output}", file=sys.stderr)
+    
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    sink = open(args.output, 'a' if args.resume else 'w', encoding='utf-8') if args.output else sys.stdout
+    if args.workers > 0:
+        pool = ProcessPoolExecutor(max_workers=args.workers, initializer=init_rescore_worker,
+                                   initargs=(args.model, args.feature_store))
+    else:
+        pool = None
+        init_rescore_worker(args.model, args.feature_store)
+    
+    # Chunks in flight are bounded, and results are written strictly in input order
+    max_in_flight = max(2, 2 * args.workers)
+    pending = deque()
+    started = last_report = time.perf_counter()
+    records = n_bytes = 0
+    
+    def write_next():
+        nonlocal records, n_bytes, last_report
+        future, chunk_records, chunk_bytes = pending.popleft()
+        sink.write(future.result() if pool else future)
+        sink.flush()
+        records += chunk_records
+        n_bytes += chunk_bytes
+        now = time.perf_counter()
+        if now - last_report >= args.progress_interval:
+            last_report = now
+            elapsed = now - started
+            print(f"⏳ {done + records} records ({records / elapsed:.0f}/s, "
+                  f"{n_bytes / elapsed / 1e6:.2f} MB/s)", file=sys.stderr)
+    
+    try:
+        for first, lines, chunk_bytes in read_chunks(source, args.chunk_size, done):
+            job = (first, lines, args.text_field, args.id_field)
+            pending.append((pool.submit(rescore_chunk, *job) if pool else rescore_chunk(*job),
+                            len(lines), chunk_bytes))
+            while len(pending) >= max_in_flight:
+                write_next()
+        while pending:
+            write_next()
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Interrupted after {done + records} records; rerun with --resume to continue",
+              file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        shutdown_logging()
+    
+    elapsed = time.perf_counter() - started
+    print(f"✅ Rescored {records} records in {elapsed:.1f}s "
+          f"({records / max(elapsed, 1e-9):.0f}/s, {n_bytes / max(elapsed, 1e-9) / 1e6:.2f} MB/s)",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    rescore_main(sys.argv[1:])
@@ -0,0 +1,53 @@
+"""
+Shared setup for the regression tests. Run from the repository root:
+    python -m pytest -q tests
+
+The scoring modules sit at the repository root and read their configuration
+at import, so the environment is pinned here before any test imports them:
+no warmup traffic and no model package unless a test writes one.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("ML_MODEL_PATH", os.path.join(ROOT, "tests", "no-such-model.pkl"))
+os.environ.setdefault("ML_WARMUP_REQUESTS", "0")
+os.environ.setdefault("ML_LOG_LEVEL", "WARNING")
+
+import ml_model_api as api  # noqa: E402
+
+
+@pytest.fixture
+def restore_model(monkeypatch):
+    """Put the active model package back after a test swaps it"""
+    monkeypatch.setattr(api, "model_package", api.model_package)
+
+
+@pytest.fixture
+def write_model_package():
+    """
+    Factory writing a small trained package (5 shallow trees on synthetic
+    transcripts) to ``path``; different seeds give different versions
+    """
+    def write(path, seed: int = 0) -> str:
+        import joblib
+        import numpy as np
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+
+        features = [api.extract_enhanced_features(r.interview_data, r.role, r.level)
+                    for r in api.synthetic_warmup_requests(40)]
+        X = np.array([[f[column] for column in api.EXTRACTED_FEATURES] for f in features], dtype=float)
+        y = np.random.default_rng(seed).uniform(20, 90, len(X))
+        scaler = StandardScaler().fit(X)
+        model = RandomForestRegressor(n_estimators=5, max_depth=3, random_state=seed)
+        model.fit(scaler.transform(X), y)
+        joblib.dump({'model': model, 'scaler': scaler, 'feature_columns': list(api.EXTRACTED_FEATURES),
+                     'metadata': {'model_type': 'RandomForestRegressor', 'seed': seed}}, str(path))
+        return str(path)
+    return write
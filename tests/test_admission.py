@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import ml_model_api as api
+
+
+def test_rejects_when_full_and_when_the_deadline_cannot_be_met():
+    gate = api.AdmissionControl(max_inflight=2, degrade_inflight=0, parallelism=1)
+    gate.observe_service(0.5)
+    assert gate.admit(10.0) is False
+    with pytest.raises(HTTPException) as unreachable:
+        gate.admit(0.8)  # 0.5 s queued ahead + 0.5 s of its own
+    assert unreachable.value.status_code == 429
+    assert unreachable.value.headers["Retry-After"] == "1"
+    gate.admit(10.0)
+    with pytest.raises(HTTPException) as full:
+        gate.admit(10.0)
+    assert full.value.status_code == 503
+    assert gate.rejected == {"deadline_unreachable": 1, "queue_full": 1}
+    assert gate.inflight == 2
+
+
+def test_degrades_past_the_threshold_only_when_enabled():
+    gate = api.AdmissionControl(max_inflight=4, degrade_inflight=1, parallelism=1)
+    assert [gate.admit(10.0) for _ in range(3)] == [False, True, True]
+    assert gate.degraded == 2
+    off = api.AdmissionControl(max_inflight=4, degrade_inflight=0, parallelism=1)
+    assert [off.admit(10.0) for _ in range(3)] == [False, False, False]
+
+
+def test_timed_out_request_keeps_its_slot_until_scoring_ends(monkeypatch):
+    gate = api.AdmissionControl(max_inflight=4, degrade_inflight=0, parallelism=1)
+    monkeypatch.setattr(api, "admission", gate)
+    monkeypatch.setattr(api, "score_cache", None)
+    monkeypatch.setattr(api, "micro_batcher", None)
+    monkeypatch.setattr(api, "scoring_executor", None)
+
+    async def slow_scoring(func, *args, admitted=0):
+        await asyncio.sleep(0.2)
+        return func(*args)
+    monkeypatch.setattr(api, "run_scoring", slow_scoring)
+
+    async def run():
+        request = api.PredictionRequest(interview_data="I profiled the service and fixed the hot loop.")
+        started = time.perf_counter()
+        with pytest.raises(HTTPException) as timed_out:
+            await api.serve_prediction(request, "/predict", deadline=0.05)
+        assert timed_out.value.status_code == 503
+        assert time.perf_counter() - started < 0.15
+        assert gate.inflight == 1  # still being scored
+        await asyncio.sleep(0.3)
+        assert gate.inflight == 0
+
+    asyncio.run(run())
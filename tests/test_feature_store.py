@@ -0,0 +1,57 @@
+import ml_model_api as api
+from feature_store import FeatureStore
+
+ITEMS = [
+    ("I wrote the ingestion service in Go and cut costs by 30%.", "Software Engineer", "Senior"),
+    ("We ran user interviews and prioritized the roadmap.", "Product Manager", "Mid-level"),
+]
+
+
+def test_features_are_stored_then_read_back(tmp_path):
+    path = str(tmp_path / "features.sqlite")
+    store = FeatureStore(path)
+    first = store.features_for(ITEMS)
+    assert (store.hits, store.misses) == (0, 2)
+    store.close()
+
+    store = FeatureStore(path)
+    second = store.features_for(ITEMS)
+    assert (store.hits, store.misses) == (2, 0)
+    store.close()
+    for extracted, stored, (text, role, level) in zip(first, second, ITEMS):
+        assert dict(stored) == dict(extracted) == dict(api.extract_enhanced_features(text, role, level))
+
+
+def test_another_extractor_version_recomputes_and_prune_drops_stale_rows(tmp_path):
+    path = str(tmp_path / "features.sqlite")
+    old = FeatureStore(path, version="0-stale")
+    old.features_for(ITEMS)
+    old.close()
+
+    store = FeatureStore(path)
+    assert store.version == api.extractor_version() != "0-stale"
+    store.features_for(ITEMS)
+    assert (store.hits, store.misses) == (0, 2)
+    assert store.snapshot()["stale_rows"] == 2
+    assert store.prune() == 2
+    assert store.snapshot()["stale_rows"] == 0
+    store.close()
+
+
+def test_extractor_version_tracks_the_windowed_code_without_source(monkeypatch):
+    def no_source(obj):
+        raise OSError("could not get source code")  # a .pyc-only deployment
+    monkeypatch.setattr(api.inspect, "getsource", no_source)
+    api.extractor_version.cache_clear()
+    try:
+        version = api.extractor_version()
+        assert api.extractor_version.__wrapped__() == version
+        with monkeypatch.context() as patch:
+            patch.setattr(api.FeatureAccumulator, "append", lambda self, text, separator=" ": None)
+            assert api.extractor_version.__wrapped__() != version
+        with monkeypatch.context() as patch:
+            patch.setattr(api, "text_windows", lambda text, window_chars: iter([text]))
+            assert api.extractor_version.__wrapped__() != version
+    finally:
+        monkeypatch.undo()
+        api.extractor_version.cache_clear()
@@ -0,0 +1,57 @@
+import asyncio
+
+import ml_model_api as api
+
+
+def transcript(i: int) -> str:
+    return f"Interview {i}: I built a data pipeline in Python" + " and tested it" * i
+
+
+def test_batched_results_come_back_in_submission_order(monkeypatch):
+    monkeypatch.setattr(api, "scoring_executor", None)
+    monkeypatch.setattr(api, "admission", None)
+
+    async def run():
+        batcher = api.MicroBatcher(window_ms=50, max_size=8)
+        batcher._gap_ewma = 0.0  # dense traffic: wait out the window and coalesce
+        batcher.start()
+        try:
+            return await asyncio.gather(*(
+                batcher.submit(transcript(i), "Software Engineer", "Mid-level", seed=i) for i in range(12)
+            )), batcher.stats.snapshot()
+        finally:
+            await batcher.stop()
+
+    results, stats = asyncio.run(run())
+    for i, (score, features, _) in enumerate(results):
+        expected_score, expected_features, _ = api.score_interview(
+            transcript(i), "Software Engineer", "Mid-level", i)
+        assert score == expected_score
+        assert features['word_count'] == expected_features['word_count']
+    assert stats["requests"] == 12
+    assert stats["batches"] < 12
+
+
+def test_cancelled_request_is_skipped_before_dispatch(monkeypatch):
+    monkeypatch.setattr(api, "scoring_executor", None)
+    monkeypatch.setattr(api, "admission", None)
+    scored = []
+    real = api.score_interview_batch
+    monkeypatch.setattr(api, "score_interview_batch",
+                        lambda items: (scored.extend(item[0] for item in items), real(items))[1])
+
+    async def run():
+        batcher = api.MicroBatcher(window_ms=50, max_size=8)
+        batcher._gap_ewma = 0.0
+        batcher.start()
+        try:
+            kept = batcher.enqueue(transcript(1), "Software Engineer", "Mid-level")
+            dropped = batcher.enqueue(transcript(2), "Software Engineer", "Mid-level")
+            assert batcher.cancel(dropped)
+            await kept
+            assert not batcher.cancel(kept)
+        finally:
+            await batcher.stop()
+
+    asyncio.run(run())
+    assert scored == [transcript(1)]
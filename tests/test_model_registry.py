@@ -0,0 +1,61 @@
+import asyncio
+import os
+
+import pytest
+
+import ml_model_api as api
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch, restore_model):
+    monkeypatch.setattr(api, "scoring_executor", None)
+    return api.ModelRegistry(str(tmp_path / "models"))
+
+
+def test_reload_and_rollback(registry, write_model_package):
+    os.makedirs(registry.directory)
+    first = write_model_package(os.path.join(registry.directory, "a.pkl"), seed=1)
+    assert registry.load_initial() == first
+    first_version = registry.active["version"]
+
+    second = write_model_package(os.path.join(registry.directory, "b.pkl"), seed=2)
+    os.utime(second, (os.path.getmtime(first) + 10,) * 2)
+    asyncio.run(registry.load(registry.resolve(), "test"))
+    assert registry.active["path"] == second
+    assert api.model_version() == registry.active["version"] != first_version
+
+    asyncio.run(registry.rollback())
+    assert api.model_version() == first_version
+    assert [entry["reason"] for entry in registry.history] == ["startup", "test", "rollback"]
+
+
+def test_startup_skips_a_version_that_does_not_load(registry, write_model_package):
+    os.makedirs(registry.directory)
+    good = write_model_package(os.path.join(registry.directory, "a.pkl"))
+    broken = os.path.join(registry.directory, "b.pkl")
+    with open(broken, "wb") as f:
+        f.write(b"not a pickle")
+    os.utime(broken, (os.path.getmtime(good) + 10,) * 2)
+    assert registry.load_initial() == good
+    assert api.scoring_engine() != "rule-based"
+
+
+def test_invalid_version_is_rejected_and_the_live_one_keeps_serving(registry, write_model_package):
+    os.makedirs(registry.directory)
+    write_model_package(os.path.join(registry.directory, "a.pkl"))
+    registry.load_initial()
+    live = registry.active["version"]
+    broken = os.path.join(registry.directory, "b.pkl")
+    with open(broken, "wb") as f:
+        f.write(b"not a pickle")
+    with pytest.raises(api.ModelValidationError):
+        asyncio.run(registry.load(broken, "test"))
+    assert api.model_version() == live
+
+
+@pytest.mark.parametrize("path", ["../outside.pkl", "/etc/passwd", "nested/../../outside.pkl", "missing.pkl"])
+def test_reload_path_must_be_a_version_in_the_registry(registry, write_model_package, path):
+    os.makedirs(registry.directory)
+    write_model_package(os.path.join(os.path.dirname(registry.directory), "outside.pkl"))
+    with pytest.raises(api.ModelValidationError):
+        registry.resolve(path)
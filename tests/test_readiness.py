@@ -0,0 +1,49 @@
+import asyncio
+
+import ml_model_api as api
+
+PATHS = ("model", "rule_based", "cache", "fallback", "degraded", "rejected")
+
+
+def counters() -> dict:
+    return {
+        **{path: api.PREDICT_PATHS.value(path) for path in PATHS},
+        **{method: api.SCORING_METHOD.value(method) for method in ("ml", "rule_based")},
+        "fallback_scores": api.FALLBACK_SCORES.value(),
+    }
+
+
+def test_warmup_stays_out_of_predict_metrics_and_cache(monkeypatch, restore_model):
+    api.activate_model_package(api.create_advanced_fallback_model())
+    cache = api.ScoreCache(max_entries=64, ttl_seconds=60)
+    gate = api.AdmissionControl(max_inflight=64, degrade_inflight=0, parallelism=1)
+    monkeypatch.setattr(api, "score_cache", cache)
+    monkeypatch.setattr(api, "admission", gate)
+    monkeypatch.setattr(api, "scoring_executor", None)
+    monkeypatch.setattr(api, "micro_batcher", None)
+    monkeypatch.setattr(api, "WARMUP_REQUESTS", 6)
+    monkeypatch.setattr(api, "readiness", api.Readiness())
+    api.readiness.model_loaded = True
+    before = counters()
+
+    asyncio.run(api.warm_up())
+    assert (api.readiness.warmup_state, api.readiness.warmup_requests) == ("passed", 6)
+    assert counters() == before
+    assert len(cache) == 0 and cache.hits + cache.misses == 0
+    assert gate.admitted == 0
+
+    request = api.PredictionRequest(interview_data="I led the migration to Kubernetes.")
+    asyncio.run(api.serve_prediction(request, "/predict"))
+    assert api.PREDICT_PATHS.value("rule_based") == before["rule_based"] + 1
+    assert len(cache) == 1 and gate.admitted == 1 and gate.inflight == 0
+
+
+def test_rule_based_fallback_is_not_ready_by_default(monkeypatch, restore_model):
+    api.activate_model_package(api.create_advanced_fallback_model())
+    readiness = api.Readiness()
+    readiness.model_loaded = True
+    readiness.warmup_state = "passed"
+    assert not api.READY_ON_FALLBACK
+    assert readiness.reasons() == ["trained model unavailable, serving the rule-based fallback"]
+    monkeypatch.setattr(api, "READY_ON_FALLBACK", True)
+    assert readiness.reasons() == []
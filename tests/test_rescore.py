@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import rescore
+
+ROLES = ["Software Engineer", "Data Scientist", "Product Manager"]
+
+
+@pytest.fixture
+def dump(tmp_path):
+    path = tmp_path / "dump.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(25):
+            f.write(json.dumps({"id": f"r{i}", "role": ROLES[i % 3],
+                                "interview_data": f"Answer {i}: I shipped the feature" + " and tested it" * i}) + "\n")
+        f.write("not json\n")
+    return str(path)
+
+
+def run(dump, output, *extra):
+    rescore.rescore_main([dump, "-o", str(output), "--workers", "0", "--chunk-size", "4",
+                          "--model", "no-such-model.pkl", "--feature-store", "", *extra])
+    with open(output, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_results_are_in_input_order_and_seeded(dump, tmp_path, restore_model):
+    first = run(dump, tmp_path / "a.jsonl")
+    records = [json.loads(line) for line in first.splitlines()]
+    assert [r["record"] for r in records] == list(range(1, 27))
+    assert [r["id"] for r in records[:25]] == [f"r{i}" for i in range(25)]
+    assert "invalid record" in records[25]["error"]
+    assert run(dump, tmp_path / "b.jsonl") == first
+
+
+def test_resume_after_a_partial_write_matches_a_full_run(dump, tmp_path, restore_model):
+    full = run(dump, tmp_path / "full.jsonl")
+    partial = tmp_path / "partial.jsonl"
+    lines = full.splitlines(keepends=True)
+    partial.write_text("".join(lines[:9]) + lines[9][:20], encoding="utf-8")  # crashed mid-line
+    assert run(dump, partial, "--resume") == full
@@ -0,0 +1,40 @@
+import ml_model_api as api
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = api.ScoreCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == 1.0  # "b" is now the least recently used
+    cache.put("c", 3.0)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1.0, 3.0)
+    assert cache.evictions == 1
+
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(api.time, "monotonic", lambda: now[0])
+    cache = api.ScoreCache(max_entries=4, ttl_seconds=10)
+    cache.put("a", 1.0)
+    now[0] += 9
+    assert cache.get("a") == 1.0
+    now[0] += 2
+    assert cache.get("a") is None
+    assert (cache.expirations, cache.hits, cache.misses, len(cache)) == (1, 1, 1, 0)
+
+
+def test_score_key_and_seed_follow_the_model_version():
+    key = api.score_key("transcript", "Software Engineer", "Senior", "v1")
+    assert key == api.score_key("transcript", "Software Engineer", "Senior", "v1")
+    assert key != api.score_key("transcript", "Software Engineer", "Senior", "v2")
+    assert api.score_seed(key, True) == api.score_seed(key, True)
+    assert api.score_seed(key, False) is None
+
+
+def test_activating_a_model_clears_the_cache(monkeypatch, restore_model):
+    cache = api.ScoreCache(max_entries=4, ttl_seconds=60)
+    cache.put("a", 1.0)
+    monkeypatch.setattr(api, "score_cache", cache)
+    api.activate_model_package(api.create_advanced_fallback_model())
+    assert len(cache) == 0 and cache.invalidations == 1
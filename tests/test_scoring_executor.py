@@ -0,0 +1,25 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import ml_model_api as api
+
+TRANSCRIPT = "I designed the caching layer in Python and cut p99 latency by 40 percent."
+
+
+def test_executor_scores_match_inline_scores(monkeypatch):
+    inline = api.score_interview(TRANSCRIPT, "Software Engineer", "Senior", 7)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        monkeypatch.setattr(api, "scoring_executor", executor)
+        pooled = asyncio.run(api.run_scoring(api.score_interview, TRANSCRIPT, "Software Engineer", "Senior", 7))
+    assert pooled[0] == inline[0]
+    assert dict(pooled[1]) == dict(inline[1])
+
+
+def test_stage_timings_come_back_from_the_executor(monkeypatch):
+    observed = []
+    monkeypatch.setattr(api, "observe_stage_timings", observed.extend)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        monkeypatch.setattr(api, "scoring_executor", executor)
+        asyncio.run(api.run_scoring(api.score_interview, TRANSCRIPT, "Software Engineer", "Mid-level", 1))
+    stages = [stage for stage, _ in observed]
+    assert "extract" in stages and stages[-1] == "scoring"
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+
+import train_model
+
+WORDS = ["python", "api", "tested", "team", "latency", "users", "deployed", "because", "um", "maybe"]
+
+
+@pytest.fixture
+def data(tmp_path):
+    rng = np.random.default_rng(0)
+    path = tmp_path / "train.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(90):
+            words = rng.choice(WORDS, size=int(rng.integers(5, 60)))
+            score = 30 + 40 * np.mean(np.isin(words, WORDS[:7])) + rng.normal(0, 2)
+            f.write(json.dumps({"interview_data": " ".join(words), "score": round(float(score), 2)}) + "\n")
+    return str(path)
+
+
+def train(data, output, *extra):
+    train_model.train_main([data, "-o", str(output), "--workers", "0", "--max-candidates", "2",
+                            "--cv", "2", "--min-samples", "30", "--feature-store", "", *extra])
+
+
+def test_interrupted_run_resumes_from_its_checkpoint(data, tmp_path, monkeypatch):
+    output = tmp_path / "model.pkl"
+    fit = train_model.fit_candidate_fold
+    calls = []
+
+    def interrupted(*args):
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return fit(*args)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(train_model, "fit_candidate_fold", interrupted)
+        with pytest.raises(SystemExit) as stopped:
+            train(data, output)
+    assert stopped.value.code == 130
+    assert not output.exists()
+
+    train(data, output)
+    with open(tmp_path / "model_metadata.json") as f:
+        metadata = json.load(f)
+    assert metadata["training"]["fold_fits_resumed"] == 3
+    assert metadata["training"]["fold_fits"] > 3
+
+
+def test_existing_output_is_only_replaced_with_force(data, tmp_path):
+    output = tmp_path / "model.pkl"
+    sidecar = tmp_path / "model_metadata.json"
+    sidecar.write_text('{"tracked": true}')
+    with pytest.raises(SystemExit) as refused:
+        train(data, output)
+    assert "--force" in str(refused.value.code)
+    assert sidecar.read_text() == '{"tracked": true}' and not output.exists()
+
+    train(data, output, "--force")
+    assert output.exists() and "train_date" in json.loads(sidecar.read_text())
+
+
+def test_output_is_required(data):
+    with pytest.raises(SystemExit) as missing:
+        train_model.train_main([data])
+    assert missing.value.code == 2
@@ -0,0 +1,456 @@
+"""
+Model training for ml_model_api: successive-halving hyperparameter search over
+the serving feature extractor, fold fits on a process pool, resumable from a
+checkpoint directory.
+
+    python train_model.py DATA -o OUTPUT.pkl [--workers N] [--restart] [--force]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from feature_store import extract_features_list, truncate_partial_line
+from ml_model_api import (
+    EXTRACTED_FEATURES,
+    FEATURE_STORE_PATH,
+    FeatureSchema,
+    ModelValidationError,
+    configure_logging,
+    extractor_version,
+    file_version,
+    prediction_accuracy,
+    shutdown_logging,
+    validate_model_package,
+)
+
+# Search space of the hyperparameter search recorded in
+# feedback_scoring_model_metadata.json (its best_params are one of the candidates)
+TRAIN_PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [5, 10, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+}
+
+# Training rows (X, y) in each training worker, set once by the pool initializer
+training_data = None
+
+def init_training_worker(X: np.ndarray, y: np.ndarray):
+    global training_data
+    configure_logging(sys.stderr)
+    training_data = (X, y)
+
+def fit_candidate_fold(params: dict, train_index: np.ndarray, test_index: np.ndarray, seed: int) -> dict:
+    """Fit one candidate on one cross-validation fold; returns its held-out R² and fit cost"""
+    from sklearn.ensemble import RandomForestRegressor
+    X, y = training_data
+    model = RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+    started = time.perf_counter()
+    model.fit(X[train_index], y[train_index])
+    fit_seconds = time.perf_counter() - started
+    residual = y[test_index] - model.predict(X[test_index])
+    spread = float(np.sum((y[test_index] - np.mean(y[test_index])) ** 2))
+    return {
+        'r2': 1 - float(np.sum(residual ** 2)) / spread if spread > 0 else 0.0,
+        'fit_seconds': fit_seconds,
+    }
+
+def halving_sample_sizes(n_candidates: int, n_train: int, factor: int, min_samples: int) -> list:
+    """
+    Training rows per successive-halving rung: the last rung uses all of them,
+    each earlier one ``factor`` times fewer, never below ``min_samples``
+    """
+    rungs = math.ceil(math.log(n_candidates, factor)) if n_candidates > 1 else 0
+    if n_train > min_samples:
+        rungs = min(rungs, int(math.log(n_train / min_samples, factor)))
+    else:
+        rungs = 0
+    return [n_train // factor ** (rungs - rung) for rung in range(rungs + 1)]
+
+def parameter_candidates(grid: dict, limit: int = None, seed: int = 0) -> list:
+    """Every combination of ``grid`` (a seeded sample of ``limit`` of them)"""
+    names = sorted(grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    if limit and limit < len(candidates):
+        candidates = random.Random(seed).sample(candidates, limit)
+    return candidates
+
+class TrainingCheckpoint:
+    """
+    Checkpoint directory of one training run: run.json (the configuration it
+    belongs to), dataset.npz (extracted feature matrix and split) and
+    fits.jsonl (one line per finished fold fit, appended as fits complete).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.run_path = os.path.join(directory, 'run.json')
+        self.dataset_path = os.path.join(directory, 'dataset.npz')
+        self.fits_path = os.path.join(directory, 'fits.jsonl')
+        self._fits = None
+
+    def open(self, config: dict, restart: bool = False) -> bool:
+        """Start or resume the run for ``config``; returns True when resuming"""
+        if restart:
+            for path in (self.run_path, self.dataset_path, self.fits_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        os.makedirs(self.directory, exist_ok=True)
+        resuming = os.path.exists(self.run_path)
+        if resuming:
+            with open(self.run_path) as f:
+                previous = json.load(f)
+            if previous != config:
+                changed = sorted(key for key in set(config) | set(previous)
+                                 if config.get(key) != previous.get(key))
+                raise ValueError(f"checkpoint in {self.directory} belongs to a different run "
+                                 f"(changed: {', '.join(changed)}); pass --restart to discard it")
+        else:
+            with open(self.run_path, 'w') as f:
+                json.dump(config, f, indent=2)
+        if os.path.exists(self.fits_path):
+            truncate_partial_line(self.fits_path)
+        self._fits = open(self.fits_path, 'a', encoding='utf-8')
+        return resuming
+
+    def close(self):
+        if self._fits is not None:
+            self._fits.close()
+            self._fits = None
+
+    def load_dataset(self):
+        """(X, y, train_index, val_index), or None if extraction has not finished"""
+        if not os.path.exists(self.dataset_path):
+            return None
+        with np.load(self.dataset_path) as data:
+            return data['X'], data['y'], data['train_index'], data['val_index']
+
+    def save_dataset(self, X, y, train_index, val_index):
+        temporary = self.dataset_path + '.tmp.npz'
+        np.savez(temporary, X=X, y=y, train_index=train_index, val_index=val_index)
+        os.replace(temporary, self.dataset_path)
+
+    def completed_fits(self) -> dict:
+        """{(rung, candidate, fold): result} of the fits already recorded"""
+        done = {}
+        if os.path.exists(self.fits_path):
+            with open(self.fits_path, encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    done[(record['rung'], record['candidate'], record['fold'])] = record
+        return done
+
+    def record_fit(self, record: dict):
+        self._fits.write(json.dumps(record) + "\n")
+        self._fits.flush()
+
+def read_training_records(path: str, text_field: str, label_field: str) -> tuple:
+    """
+    (records, items, targets, digest, invalid) from a JSONL file of labelled
+    transcripts; ``digest`` identifies the usable records for checkpoints
+    """
+    records, items, targets = [], [], []
+    digest = hashlib.sha256()
+    invalid = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                item = (str(record[text_field]), record.get('role') or "Software Engineer",
+                        record.get('level') or "Mid-level")
+                target = float(record[label_field])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                invalid += 1
+                continue
+            if not math.isfinite(target):
+                invalid += 1
+                continue
+            records.append(record)
+            items.append(item)
+            targets.append(target)
+            digest.update(line.strip().encode('utf-8', 'surrogatepass') + b'\n')
+    return records, items, targets, digest.hexdigest()[:16], invalid
+
+def run_halving_search(checkpoint: TrainingCheckpoint, X: np.ndarray, y: np.ndarray, candidates: list,
+                       factor: int, cv: int, min_samples: int, seed: int, workers: int) -> tuple:
+    """
+    Successive halving: every candidate is cross-validated on a small sample
+    of the training rows, the best 1/``factor`` go on to ``factor`` times as
+    many rows, until the last rung uses all of them. Fold fits run on
+    ``workers`` processes (0: in this one) and are checkpointed as they
+    finish; fits already in the checkpoint are not repeated.
+    Returns (best candidate index, rung summaries, candidate summaries,
+    number of fits resumed from the checkpoint).
+    """
+    from sklearn.model_selection import KFold
+    
+    done = checkpoint.completed_fits()
+    resumed = len(done)
+    order = np.random.default_rng(seed).permutation(len(y))
+    sizes = halving_sample_sizes(len(candidates), len(y), factor, min_samples)
+    survivors = list(range(len(candidates)))
+    rung_summaries, candidate_summaries = [], []
+    
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_training_worker, initargs=(X, y))
+    else:
+        init_training_worker(X, y)
+    try:
+        for rung, n_samples in enumerate(sizes):
+            subset = np.sort(order[:n_samples])
+            folds = list(KFold(n_splits=cv, shuffle=True, random_state=seed + rung).split(subset))
+            tasks = [(candidate, fold) for candidate in survivors for fold in range(cv)
+                     if (rung, candidate, fold) not in done]
+            print(f"🔎 Rung {rung + 1}/{len(sizes)}: {len(survivors)} candidates x {cv} folds "
+                  f"on {n_samples} rows ({len(survivors) * cv - len(tasks)} fits checkpointed)")
+            started = time.perf_counter()
+            
+            def finish(candidate, fold, result):
+                record = dict(rung=rung, candidate=candidate, fold=fold, n_samples=int(n_samples),
+                              r2=result['r2'], fit_seconds=round(result['fit_seconds'], 4))
+                checkpoint.record_fit(record)
+                done[(rung, candidate, fold)] = record
+            
+            if pool is None:
+                for candidate, fold in tasks:
+                    train_index, test_index = folds[fold]
+                    finish(candidate, fold, fit_candidate_fold(
+                        candidates[candidate], subset[train_index], subset[test_index], seed))
+            else:
+                futures = {}
+                for candidate, fold in tasks:
+                    train_index, test_index = folds[fold]
+                    futures[pool.submit(fit_candidate_fold, candidates[candidate], subset[train_index],
+                                        subset[test_index], seed)] = (candidate, fold)
+                for future in as_completed(futures):
+                    finish(*futures[future], future.result())
+            
+            scores, costs = {}, {}
+            for candidate in survivors:
+                fits = [done[(rung, candidate, fold)] for fold in range(cv)]
+                scores[candidate] = float(np.mean([fit['r2'] for fit in fits]))
+                costs[candidate] = sum(fit['fit_seconds'] for fit in fits)
+                candidate_summaries.append({
+                    'rung': rung, 'candidate': candidate, 'params': candidates[candidate],
+                    'n_samples': int(n_samples), 'cv_r2': round(scores[candidate], 5),
+                    'fit_seconds': round(costs[candidate], 4),
+                })
+            ranked = sorted(survivors, key=lambda candidate: (-scores[candidate], candidate))
+            rung_summaries.append({
+                'rung': rung, 'n_samples': int(n_samples), 'candidates': len(survivors),
+                'fits': len(survivors) * cv, 'best_cv_r2': round(scores[ranked[0]], 5),
+                'fit_seconds': round(sum(costs.values()), 4),
+                'wall_seconds': round(time.perf_counter() - started, 3),
+            })
+            print(f"   best CV R² {scores[ranked[0]]:.4f} {candidates[ranked[0]]} "
+                  f"({time.perf_counter() - started:.1f}s)")
+            survivors = ranked[:max(1, math.ceil(len(ranked) / factor))]
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    return ranked[0], rung_summaries, candidate_summaries, resumed
+
+def train_main(argv: list):
+    """``python train_model.py DATA -o OUTPUT [--workers N] [--restart] [--force]``"""
+    parser = argparse.ArgumentParser(
+        prog="train_model.py",
+        description="Train the scoring model from labelled transcripts: successive-halving "
+                    "hyperparameter search on a process pool, resumable from checkpoints",
+    )
+    parser.add_argument('data', help="JSON lines with a transcript, role, level and target score")
+    parser.add_argument('-o', '--output', required=True, help="model package to write")
+    parser.add_argument('--force', action='store_true',
+                        help="overwrite an existing OUTPUT and its _metadata.json sidecar")
+    parser.add_argument('--checkpoint-dir', help="default: OUTPUT without .pkl + .train")
+    parser.add_argument('--restart', action='store_true', help="discard the checkpoint and start over")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="training processes (0 trains in this process)")
+    parser.add_argument('--text-field', default='interview_data')
+    parser.add_argument('--label-field', default='score')
+    parser.add_argument('--feature-columns', nargs='+', default=list(EXTRACTED_FEATURES),
+                        help="model columns; each must be an extractor feature or alias")
+    parser.add_argument('--feature-store', default=FEATURE_STORE_PATH,
+                        help="SQLite feature store for the transcripts")
+    parser.add_argument('--val-fraction', type=float, default=0.1)
+    parser.add_argument('--cv', type=int, default=3, help="cross-validation folds per candidate")
+    parser.add_argument('--factor', type=int, default=3, help="successive-halving reduction factor")
+    parser.add_argument('--min-samples', type=int, default=60, help="training rows in the first rung")
+    parser.add_argument('--max-candidates', type=int, help="seeded sample of the parameter grid")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--holdout-output', help="also write the validation records as JSONL "
+                                                 "(usable as compress-model --holdout)")
+    args = parser.parse_args(argv)
+    
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+    import joblib
+    
+    configure_logging(sys.stderr)
+    wall_started = time.perf_counter()
+    metadata_path = os.path.splitext(args.output)[0] + '_metadata.json'
+    existing = [path for path in (args.output, metadata_path) if os.path.exists(path)]
+    if existing and not args.force:
+        sys.exit(f"❌ {' and '.join(existing)} already exist; pass --force to overwrite")
+    try:
+        schema = FeatureSchema(tuple(args.feature_columns), strict=True)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    
+    records, items, targets, data_digest, invalid = read_training_records(
+        args.data, args.text_field, args.label_field)
+    if invalid:
+        print(f"⚠️  Skipped {invalid} records without a transcript or a numeric {args.label_field!r}")
+    candidates = parameter_candidates(TRAIN_PARAM_GRID, args.max_candidates, args.seed)
+    config = {
+        'data': data_digest, 'records': len(records), 'extractor_version': extractor_version(),
+        'feature_columns': list(schema.columns), 'candidates': candidates,
+        'val_fraction': args.val_fraction, 'cv': args.cv, 'factor': args.factor,
+        'min_samples': args.min_samples, 'seed': args.seed,
+    }
+    checkpoint = TrainingCheckpoint(args.checkpoint_dir or os.path.splitext(args.output)[0] + '.train')
+    try:
+        resuming = checkpoint.open(config, args.restart)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    if resuming:
+        print(f"↩️  Resuming from {checkpoint.directory}")
+    
+    try:
+        # 1. Features from the serving extractor (cached in the checkpoint)
+        extract_started = time.perf_counter()
+        dataset = checkpoint.load_dataset()
+        if dataset is None:
+            features_list = extract_features_list(items, args.feature_store)
+            kept = np.array([i for i, features in enumerate(features_list) if features is not None], dtype=np.intp)
+            X = schema.matrix([features_list[i] for i in kept])
+            y = np.asarray(targets, dtype=np.float64)[kept]
+            order = kept[np.random.default_rng(args.seed).permutation(len(kept))]
+            n_val = int(round(len(order) * args.val_fraction))
+            position = {record: row for row, record in enumerate(kept)}
+            val_index = np.sort([position[i] for i in order[:n_val]]).astype(np.intp)
+            train_index = np.sort([position[i] for i in order[n_val:]]).astype(np.intp)
+            checkpoint.save_dataset(X, y, train_index, val_index)
+            print(f"🧮 Extracted features for {len(kept)} transcripts "
+                  f"({len(records) - len(kept)} failed) in {time.perf_counter() - extract_started:.1f}s")
+            kept_records = [records[i] for i in kept]
+        else:
+            X, y, train_index, val_index = dataset
+            kept_records = None
+        extract_seconds = time.perf_counter() - extract_started
+        if len(train_index) < args.cv * 2:
+            sys.exit(f"❌ {len(train_index)} training rows are too few for {args.cv}-fold cross-validation")
+        
+        # 2. Successive-halving search over the grid
+        search_started = time.perf_counter()
+        best, rungs, fits, resumed_fits = run_halving_search(
+            checkpoint, X[train_index], y[train_index], candidates, args.factor, args.cv,
+            args.min_samples, args.seed, args.workers)
+        search_seconds = time.perf_counter() - search_started
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Interrupted; rerun the same command to resume from {checkpoint.directory}")
+        sys.exit(130)
+    finally:
+        checkpoint.close()
+    
+    # 3. Refit the winner on every training row, evaluate on the validation rows
+    best_params = candidates[best]
+    print(f"🏁 Refitting {best_params} on {len(train_index)} rows")
+    final_started = time.perf_counter()
+    scaler = StandardScaler().fit(X[train_index])
+    model = RandomForestRegressor(random_state=args.seed, n_jobs=max(1, args.workers), **best_params)
+    model.fit(scaler.transform(X[train_index]), y[train_index])
+    model.set_params(n_jobs=None)
+    final_fit_seconds = time.perf_counter() - final_started
+    
+    def evaluate(index):
+        if not len(index):
+            return {'r2': None, 'mae': None, 'rmse': None}
+        predictions = model.predict(scaler.transform(X[index]))
+        metrics = prediction_accuracy(predictions, y[index])
+        metrics['rmse'] = round(float(np.sqrt(np.mean((y[index] - predictions) ** 2))), 4)
+        return metrics
+    train_metrics, val_metrics = evaluate(train_index), evaluate(val_index)
+    
+    fit_costs = [fit['fit_seconds'] for fit in fits]
+    package = {
+        'model': model,
+        'scaler': scaler,
+        'feature_columns': list(schema.columns),
+        'metadata': {
+            'train_date': datetime.now().isoformat(),
+            'model_type': 'RandomForestRegressor',
+            'train_samples': len(train_index),
+            'val_samples': len(val_index),
+            'best_params': best_params,
+            **{f'train_{name}': value for name, value in train_metrics.items()},
+            **{f'val_{name}': value for name, value in val_metrics.items()},
+            'feature_importance': sorted(
+                ({'feature': column, 'importance': float(importance)}
+                 for column, importance in zip(schema.columns, model.feature_importances_)),
+                key=lambda entry: -entry['importance']),
+            'extractor_version': extractor_version(),
+            'data_digest': data_digest,
+            'search': {
+                'method': 'successive_halving',
+                'factor': args.factor,
+                'cv_folds': args.cv,
+                'candidates': len(candidates),
+                'rungs': rungs,
+                'fits': fits,
+            },
+            'training': {
+                'wall_seconds': round(time.perf_counter() - wall_started, 3),
+                'extract_seconds': round(extract_seconds, 3),
+                'search_seconds': round(search_seconds, 3),
+                'final_fit_seconds': round(final_fit_seconds, 3),
+                'fold_fits': len(fit_costs) * args.cv,
+                'fold_fits_resumed': resumed_fits,
+                'fit_seconds_total': round(sum(fit_costs), 3),
+                'fit_seconds_per_candidate_mean': round(float(np.mean(fit_costs)), 4),
+                'workers': args.workers,
+            },
+        },
+    }
+    try:
+        validation = validate_model_package(package)
+    except ModelValidationError as e:
+        sys.exit(f"❌ Trained package failed validation: {e}")
+    
+    # 4. Write atomically (a registry watcher never sees a partial .pkl)
+    temporary = args.output + '.tmp'
+    joblib.dump(package, temporary)
+    os.replace(temporary, args.output)
+    with open(metadata_path, 'w') as f:
+        json.dump(package['metadata'], f, indent=2)
+    if args.holdout_output:
+        if kept_records is None:
+            print("⚠️  --holdout-output needs the records from extraction; rerun with --restart to write it")
+        else:
+            with open(args.holdout_output, 'w', encoding='utf-8') as f:
+                for index in val_index:
+                    f.write(json.dumps(kept_records[index], ensure_ascii=False) + "\n")
+    
+    print(f"✅ {args.output} (version {file_version(args.output)}): val R² {val_metrics['r2']}, "
+          f"MAE {val_metrics['mae']}, RMSE {val_metrics['rmse']}; "
+          f"{len(fit_costs) * args.cv} fold fits, {sum(fit_costs):.1f}s fitting, "
+          f"{time.perf_counter() - wall_started:.1f}s wall")
+    print(f"   Metadata: {metadata_path}; probe mean {validation['probe_mean']}")
+    shutdown_logging()
+
+if __name__ == "__main__":
+    train_main(sys.argv[1:])